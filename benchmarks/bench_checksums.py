@@ -0,0 +1,92 @@
+"""
+Compare the per-candidate Luhn and Verhoeff checks the detectors used to
+run with the table-driven checks and the batch API, with and without NumPy.
+
+    python benchmarks/bench_checksums.py [--candidates 1000000]
+
+Candidates look like the long numeric IDs of a CSV export: mostly 12 and
+13-19 digit numbers, about a tenth of them valid.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import measure
+from corpus import verhoeff_digit
+from dlp_agent.utils import checksums
+from dlp_agent.utils.checksums import (VERHOEFF_D, VERHOEFF_P, luhn_check, luhn_check_many, verhoeff_check,
+                                       verhoeff_check_many)
+
+def legacy_luhn_check(number: str) -> bool:
+    """luhn_check as it was."""
+    if not number.isdigit():
+        return False
+    digits = [int(d) for d in number]
+    checksum = 0
+    reverse_digits = digits[::-1]
+    for i, digit in enumerate(reverse_digits):
+        if i % 2 == 1:
+            doubled = digit * 2
+            if doubled > 9:
+                doubled -= 9
+            checksum += doubled
+        else:
+            checksum += digit
+    return checksum % 10 == 0
+
+def legacy_verhoeff_check(number: str) -> bool:
+    """verhoeff_check as it was."""
+    if not number.isdigit():
+        return False
+    c = 0
+    reversed_number = number[::-1]
+    for i, char in enumerate(reversed_number):
+        c = VERHOEFF_D[c][VERHOEFF_P[i % 8][int(char)]]
+    return c == 0
+
+def make_candidates(count: int, lengths: range, seed: int = 3) -> list[str]:
+    rng = random.Random(seed)
+    return [''.join(rng.choice('0123456789') for _ in range(rng.choice(lengths))) for _ in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cards = make_candidates(args.candidates, range(13, 20))
+    ids = make_candidates(args.candidates, range(11, 12))
+    ids = [number + verhoeff_digit(number) if i % 10 == 0 else number + '7' for i, number in enumerate(ids)]
+    numpy = checksums._numpy()
+
+    for name, candidates, legacy, scalar, many in (
+        ("luhn", cards, legacy_luhn_check, luhn_check, luhn_check_many),
+        ("verhoeff", ids, legacy_verhoeff_check, verhoeff_check, verhoeff_check_many),
+    ):
+        legacy_time, expected = measure(lambda: [legacy(number) for number in candidates], args.repeat)
+        scalar_time, scalar_results = measure(lambda: [scalar(number) for number in candidates], args.repeat)
+        checksums.np = False
+        python_time, python_results = measure(lambda: many(candidates), args.repeat)
+        checksums.np = numpy
+        print(f"{name:8s} legacy:        {args.candidates / legacy_time:12.0f} candidates/s")
+        print(f"{name:8s} table-driven:  {args.candidates / scalar_time:12.0f} candidates/s  "
+              f"({legacy_time / scalar_time:.2f}x)")
+        print(f"{name:8s} batch, Python: {args.candidates / python_time:12.0f} candidates/s  "
+              f"({legacy_time / python_time:.2f}x)")
+        results = [scalar_results, python_results]
+        if numpy:
+            numpy_time, numpy_results = measure(lambda: many(candidates), args.repeat)
+            print(f"{name:8s} batch, NumPy:  {args.candidates / numpy_time:12.0f} candidates/s  "
+                  f"({legacy_time / numpy_time:.2f}x)")
+            results.append(numpy_results)
+        else:
+            print(f"{name:8s} batch, NumPy:  not installed")
+        if any(result != expected for result in results):
+            print("WARNING: results differ")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare line-by-line and chunked scanning of a plain-text file through
+StreamProcessor.process_file.
+
+    python benchmarks/bench_chunked.py [--lines 500000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import make_lines, measure
+from dlp_agent.config import DEFAULT_POLICY
+from dlp_agent.scanner import StreamProcessor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=500000)
+    parser.add_argument('--pii-ratio', type=float, default=0.01)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'corpus.log')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(make_lines(args.lines, args.pii_ratio)) + '\n')
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        def run(chunked):
+            policy = {**DEFAULT_POLICY, 'scan': {**DEFAULT_POLICY['scan'], 'chunkedText': chunked}}
+            return StreamProcessor(policy).process_file(path)
+
+        line_time, line_found = measure(lambda: run(False), args.repeat)
+        chunk_time, chunk_found = measure(lambda: run(True), args.repeat)
+
+    print(f"corpus: {args.lines} lines, {size_mb:.1f} MB, pii ratio {args.pii_ratio}")
+    print(f"line-by-line: {size_mb / line_time:8.1f} MB/s  ({line_found} findings)")
+    print(f"chunked:      {size_mb / chunk_time:8.1f} MB/s  ({chunk_found} findings)")
+    print(f"speedup: {line_time / chunk_time:.2f}x")
+    if line_found != chunk_found:
+        print("WARNING: finding counts differ")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare the single-pass DetectionEngine with the per-detector loop
+StreamProcessor used to run on every line.
+
+    python benchmarks/bench_engine.py [--lines 200000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dlp_agent.config import DEFAULT_POLICY
+from dlp_agent.detectors import DetectionEngine, detect_aadhaar, detect_credit_cards, detect_pan
+
+LOG_TEMPLATES = [
+    "2024-05-01T12:{m:02d}:{s:02d}Z INFO request served in {n} ms path=/api/v1/orders",
+    "2024-05-01T12:{m:02d}:{s:02d}Z DEBUG cache hit ratio={n}% for tenant acme",
+    "user logged in from 10.0.{m}.{s} session={n}",
+    "processing batch of records for customer onboarding",
+    "WARN retrying upstream call, attempt {n}",
+]
+PII_SAMPLES = [
+    "payment card 4532 0151 1283 0368 charged",
+    "card=378282246310005 approved",
+    "aadhaar 9999 9999 0019 verified",
+    "pan ABCDE1234F linked",
+]
+
+def make_lines(count: int, pii_ratio: float, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        if rng.random() < pii_ratio:
+            lines.append(rng.choice(PII_SAMPLES))
+        else:
+            lines.append(rng.choice(LOG_TEMPLATES).format(
+                m=rng.randrange(60), s=rng.randrange(60), n=rng.randrange(100000)))
+    return lines
+
+def per_detector(lines):
+    detectors = [detect_credit_cards, detect_aadhaar, detect_pan]
+    found = 0
+    for line in lines:
+        for detector in detectors:
+            found += len(detector(line))
+    return found
+
+def single_pass(lines, engine):
+    found = 0
+    for line in lines:
+        found += len(engine.detect(line))
+    return found
+
+def measure(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--pii-ratio', type=float, default=0.01)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines, args.pii_ratio)
+    size_mb = sum(len(line) + 1 for line in lines) / (1024 * 1024)
+    engine = DetectionEngine.from_policy(DEFAULT_POLICY)
+
+    old_time, old_found = measure(lambda: per_detector(lines), args.repeat)
+    new_time, new_found = measure(lambda: single_pass(lines, engine), args.repeat)
+
+    print(f"corpus: {args.lines} lines, {size_mb:.1f} MB, pii ratio {args.pii_ratio}")
+    print(f"per-detector loop: {size_mb / old_time:8.1f} MB/s  ({old_found} findings)")
+    print(f"single-pass engine: {size_mb / new_time:8.1f} MB/s  ({new_found} findings)")
+    print(f"speedup: {old_time / new_time:.2f}x")
+    if old_found != new_found:
+        print("WARNING: finding counts differ")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Compare the eager DetectionEvent the detectors used to build for every
+match with the Hit record and lazily materialized DetectionEvent.
+
+    python benchmarks/bench_events.py [--events 200000] [--dup-ratio 0.5]
+
+Reports events per second through detection -> dedup -> sink, with and
+without JSON serialization, and bytes per record held in memory.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tracemalloc
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import measure
+from dlp_agent.events.model import DetectionEvent, Hit, digest_value
+
+@dataclass
+class EagerEvent:
+    """DetectionEvent as it was: every field built up front."""
+    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    agent_id: str = "node-001"
+    rule: str = "UNKNOWN"
+    severity: str = "medium"
+    masked_value: str = ""
+    hash: str = ""
+    source: dict = field(default_factory=dict)
+    context: Optional[dict] = None
+
+    @staticmethod
+    def create(rule, severity, raw_value, masked_value, source, context_snippet=None):
+        return EagerEvent(rule=rule, severity=severity, masked_value=masked_value,
+                          hash=hashlib.sha256(raw_value.encode('utf-8')).hexdigest(), source=source)
+
+def make_matches(count: int, dup_ratio: float, seed: int = 5) -> list[tuple[str, int]]:
+    """(raw value, line) pairs; dup_ratio of them repeat an earlier pair."""
+    rng = random.Random(seed)
+    matches = []
+    for i in range(count):
+        if matches and rng.random() < dup_ratio:
+            matches.append(rng.choice(matches))
+        else:
+            matches.append((f"4532{rng.randrange(10 ** 12):012d}", i))
+    return matches
+
+def eager(matches, serialize):
+    seen = set()
+    emitted = 0
+    for raw, line in matches:
+        event = EagerEvent.create("Credit Card", "Medium", raw, "************" + raw[-4:], {})
+        event.source = {"type": "file", "path": "/data/app.log", "line": line}
+        key = f"{event.hash}:{event.rule}:/data/app.log:{line}"
+        if key in seen:
+            continue
+        seen.add(key)
+        emitted += 1
+        if serialize:
+            json.dumps(asdict(event))
+    return emitted
+
+def lazy(matches, serialize):
+    seen = set()
+    emitted = 0
+    for raw, line in matches:
+        hit = Hit("Credit Card", "Medium", "************" + raw[-4:], digest_value(raw))
+        key = (hit.digest, hit.rule, "/data/app.log", line)
+        if key in seen:
+            continue
+        seen.add(key)
+        emitted += 1
+        event = DetectionEvent.from_hit(hit, {"type": "file", "path": "/data/app.log", "line": line})
+        if serialize:
+            event.to_json()
+    return emitted
+
+def bytes_per_record(build, count: int = 20000) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return (after - before) / count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--dup-ratio', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    matches = make_matches(args.events, args.dup_ratio)
+    print(f"{args.events} matches, {args.dup_ratio:.0%} duplicates")
+    for serialize in (False, True):
+        eager_time, eager_emitted = measure(lambda: eager(matches, serialize), args.repeat)
+        lazy_time, lazy_emitted = measure(lambda: lazy(matches, serialize), args.repeat)
+        label = "with JSON" if serialize else "no JSON  "
+        print(f"{label}  eager: {args.events / eager_time:10.0f} events/s   "
+              f"lazy: {args.events / lazy_time:10.0f} events/s   ({eager_time / lazy_time:.2f}x)")
+        if eager_emitted != lazy_emitted:
+            print("WARNING: emitted counts differ")
+            sys.exit(1)
+
+    raw = "4532015112830368"
+    eager_bytes = bytes_per_record(lambda i: EagerEvent.create("Credit Card", "Medium", raw, "x" * 16, {}))
+    hit_bytes = bytes_per_record(lambda i: Hit("Credit Card", "Medium", "x" * 16, digest_value(raw)))
+    event_bytes = bytes_per_record(lambda i: DetectionEvent.from_hit(Hit("Credit Card", "Medium", "x" * 16,
+                                                                         digest_value(raw))))
+    print(f"bytes/record  eager event: {eager_bytes:.0f}   hit: {hit_bytes:.0f}   lazy event: {event_bytes:.0f}")
+
+if __name__ == '__main__':
+    main()
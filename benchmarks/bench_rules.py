@@ -0,0 +1,81 @@
+"""
+Measure what custom rules from the policy cost: engine throughput with
+the built-in rules alone and with 10, 50 (or --counts) custom rules added,
+against running each custom rule as a regex pass of its own over every
+line.
+
+    python benchmarks/bench_rules.py [--lines 200000] [--counts 0,10,50] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import make_lines, measure
+from dlp_agent.config import DEFAULT_POLICY
+from dlp_agent.detectors import DetectionEngine
+
+# Custom rules of the usual kinds, cycled through with a numbered prefix
+# so each rule has literals of its own
+RULE_KINDS = [
+    lambda i: {"pattern": rf"\bE{i:02d}-(?P<value>\d{{6}})\b"},
+    lambda i: {"pattern": rf"\b\d{{10}}\b", "keywords": [f"acct{i:02d}"], "validator": "luhn"},
+    lambda i: {"pattern": rf"\bsk{i:02d}_live_[A-Za-z0-9]{{24}}\b", "mask": "edges"},
+    lambda i: {"pattern": rf"\bINV{i:02d}/\d{{4}}/\d{{5}}\b", "anchors": [f"inv{i:02d}/"]},
+]
+
+def custom_policy(count: int) -> dict:
+    rules = dict(DEFAULT_POLICY["rules"])
+    for i in range(count):
+        rules[f"custom{i}"] = {"enabled": True, **RULE_KINDS[i % len(RULE_KINDS)](i)}
+    return {**DEFAULT_POLICY, "rules": rules}
+
+def with_custom_hits(lines: list[str], count: int, every: int = 500) -> list[str]:
+    """lines with a match of one of count custom rules appended to every every-th line."""
+    samples = [f"E{i:02d}-123456" if i % 4 == 0 else f"acct{i:02d} 4532015114" if i % 4 == 1 else
+               f"sk{i:02d}_live_{'a' * 24}" if i % 4 == 2 else f"INV{i:02d}/2024/00001" for i in range(count)]
+    if not samples:
+        return lines
+    return [f"{line} {samples[n // every % len(samples)]}" if n % every == 0 else line
+            for n, line in enumerate(lines)]
+
+def per_rule_passes(lines, engine, patterns):
+    """The built-in engine, plus one finditer per custom rule per line."""
+    found = 0
+    for line in lines:
+        found += len(engine.detect(line))
+        for pattern in patterns:
+            found += sum(1 for _ in pattern.finditer(line))
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--pii-ratio', type=float, default=0.01)
+    parser.add_argument('--counts', default='0,10,50')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.counts.split(',')]
+    builtin = DetectionEngine.from_policy(DEFAULT_POLICY)
+    print(f"corpus: {args.lines} lines, pii ratio {args.pii_ratio}, custom hits on 1 line in 500")
+    print(f"{'rules':>6} {'block MB/s':>11} {'buffer MB/s':>12} {'per-rule MB/s':>14} {'findings':>9}")
+    base = None
+    for count in counts:
+        lines = with_custom_hits(make_lines(args.lines, args.pii_ratio), count)
+        text = '\n'.join(lines)
+        data = text.encode('utf-8')
+        size_mb = len(data) / (1024 * 1024)
+        engine = DetectionEngine.from_policy(custom_policy(count))
+        patterns = [rule.pattern for rule in engine.rules[len(builtin.rules):]]
+
+        block_time, found = measure(lambda: len(engine.detect_block(data)), args.repeat)
+        buffer_time, _ = measure(lambda: len(engine.detect_buffer(text)), args.repeat)
+        naive_time, _ = measure(lambda: per_rule_passes(lines, builtin, patterns), 1)
+        base = base or block_time
+        print(f"{count:>6} {size_mb / block_time:>11.1f} {size_mb / buffer_time:>12.1f} "
+              f"{size_mb / naive_time:>14.1f} {found:>9}  ({block_time / base:.2f}x the built-in block time)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Time how long the agent takes to start up and scan a single small log file.
+
+    python benchmarks/bench_startup.py [--repeat 10] [--binary dist/entry_point]
+
+Runs `python -m dlp_agent.main`, the `dlp-agent` console script when it
+is installed, and with --binary a PyInstaller build of entry_point.py
+(entry_point.spec or DLPScanner.spec), each as a fresh process. Then
+lists the slowest top-level imports of the Python run, from -X importtime,
+to show what a plain-text scan still pays for.
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import measure
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(command: list[str]):
+    subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+def slowest_imports(command: list[str], count: int) -> list[tuple[int, str]]:
+    """(cumulative microseconds, module) of the slowest top-level imports."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    imports = []
+    for line in stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nesting shown by indenting the name
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S.*)', line)
+        if match:
+            imports.append((int(match.group(1)), match.group(2)))
+    return sorted(imports, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--binary', help='Frozen executable built from entry_point.py')
+    parser.add_argument('--imports', type=int, default=10, help='Number of slowest imports to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scan_dir = os.path.join(tmp, 'scan')
+        os.mkdir(scan_dir)
+        with open(os.path.join(scan_dir, 'app.log'), 'w') as f:
+            f.write("user=alice card=4532 0151 1283 0366\n" * 10)
+        scan_args = ['--scan-dir', scan_dir, '--policy', os.path.join(tmp, 'default-policy.json')]
+
+        commands = {"python -m dlp_agent.main": [sys.executable, '-m', 'dlp_agent.main'] + scan_args}
+        console_script = shutil.which('dlp-agent')
+        if console_script:
+            commands["dlp-agent"] = [console_script] + scan_args
+        if args.binary:
+            commands[os.path.basename(args.binary)] = [os.path.abspath(args.binary)] + scan_args
+
+        for name, command in commands.items():
+            run(command)  # warm the OS cache and, for --onefile builds, nothing else
+            seconds, _ = measure(lambda: run(command), args.repeat)
+            print(f"{name:28s} {seconds * 1000:8.1f} ms")
+
+        print(f"slowest imports ({commands['python -m dlp_agent.main'][0]} -X importtime):")
+        for micros, module in slowest_imports(commands["python -m dlp_agent.main"], args.imports):
+            print(f"  {micros / 1000:8.1f} ms  {module}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Run the benchmark suite over a synthetic corpus and save the results as JSON.
+
+    python benchmarks/bench_suite.py [--corpus DIR] [--size-mb 20] [--pii-density 0.01] [--out results.json]
+
+Measures throughput (MB/s, files/s, findings/s) of FileWalker, each
+_get_content_iterator branch, each detector and the engine, and the whole
+CLI end to end. Without --corpus, a corpus is generated in a temporary
+directory with benchmarks/corpus.py. Compare two result files with
+benchmarks/compare.py.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import measure
+from click.testing import CliRunner
+from corpus import DATA_DIR, FORMATS, MANIFEST, make_corpus
+from dlp_agent.config import DEFAULT_POLICY
+from dlp_agent.detectors import DetectionEngine, detect_aadhaar, detect_credit_cards, detect_pan
+from dlp_agent.main import main as cli_main
+from dlp_agent.scanner import FileWalker, StreamProcessor
+
+RESULTS_VERSION = 1
+
+def result(seconds: float, size: int, files: int = None, findings: int = None) -> dict:
+    entry = {"seconds": seconds, "bytes": size, "mb_per_s": size / (1024 * 1024) / seconds}
+    if files is not None:
+        entry.update(files=files, files_per_s=files / seconds)
+    if findings is not None:
+        entry.update(findings=findings, findings_per_s=findings / seconds)
+    return entry
+
+def bench_walker(data_dir: str, repeat: int) -> dict:
+    walker = FileWalker(DEFAULT_POLICY)
+    seconds, paths = measure(lambda: list(walker.walk(data_dir)), repeat)
+    return {"walker": result(seconds, sum(os.path.getsize(path) for path in paths), files=len(paths))}
+
+def bench_extractors(data_dir: str, formats: list[str], repeat: int) -> dict:
+    """Drain _get_content_iterator for every file of each format."""
+    processor = StreamProcessor(DEFAULT_POLICY)
+    results = {}
+    for fmt in formats:
+        paths = sorted(glob.glob(os.path.join(data_dir, fmt, '*', f'*.{fmt}')))
+
+        def extract():
+            return sum(1 for path in paths for _ in processor._get_content_iterator(path))
+
+        seconds, _ = measure(extract, repeat)
+        results[f"extract.{fmt}"] = result(seconds, sum(os.path.getsize(path) for path in paths), files=len(paths))
+    return results
+
+def bench_detectors(lines: list[str], repeat: int) -> dict:
+    """Each detector, and the engine running all of them, line by line."""
+    size = sum(len(line.encode('utf-8')) + 1 for line in lines)
+    engine = DetectionEngine.from_policy(DEFAULT_POLICY)
+    detectors = {
+        "detect.credit_card": detect_credit_cards,
+        "detect.aadhaar": detect_aadhaar,
+        "detect.pan": detect_pan,
+        "detect.engine": engine.detect,
+    }
+    results = {}
+    for name, detect in detectors.items():
+        seconds, found = measure(lambda: sum(len(detect(line)) for line in lines), repeat)
+        results[name] = result(seconds, size, findings=found)
+    return results
+
+def bench_end_to_end(data_dir: str, workers: int, repeat: int) -> dict:
+    """The CLI, as run by users, writing findings to a JSON log."""
+    with tempfile.TemporaryDirectory() as tmp:
+        policy = os.path.join(tmp, 'policy.json')
+        with open(policy, 'w', encoding='utf-8') as f:
+            json.dump(DEFAULT_POLICY, f)
+        json_out = os.path.join(tmp, 'findings.jsonl')
+        args = ['--scan-dir', data_dir, '--policy', policy, '--json-out', json_out, '--workers', str(workers)]
+
+        def run():
+            if os.path.exists(json_out):
+                os.remove(json_out)
+            outcome = CliRunner().invoke(cli_main, args)
+            if outcome.exit_code != 0:
+                raise RuntimeError(f"dlp-agent failed: {outcome.output}")
+            with open(json_out, encoding='utf-8') as f:
+                return sum(1 for _ in f)
+
+        seconds, found = measure(run, repeat)
+    paths = list(FileWalker(DEFAULT_POLICY).walk(data_dir))
+    return {"end_to_end": result(seconds, sum(os.path.getsize(path) for path in paths),
+                                 files=len(paths), findings=found)}
+
+def run_suite(root: str, repeat: int = 3, workers: int = 1) -> dict:
+    with open(os.path.join(root, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    data_dir = os.path.join(root, DATA_DIR)
+    formats = [fmt for fmt in FORMATS if fmt in manifest["formats"]]
+    lines = []
+    for fmt in ('txt', 'log'):
+        for path in sorted(glob.glob(os.path.join(data_dir, fmt, '*', f'*.{fmt}'))):
+            with open(path, encoding='utf-8') as f:
+                lines.extend(line.rstrip('\n') for line in f)
+
+    results = {}
+    results.update(bench_walker(data_dir, repeat))
+    results.update(bench_extractors(data_dir, formats, repeat))
+    if lines:
+        results.update(bench_detectors(lines, repeat))
+    results.update(bench_end_to_end(data_dir, workers, repeat))
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "workers": workers,
+        "corpus": manifest,
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', help='Corpus made by benchmarks/corpus.py (default: generate one)')
+    parser.add_argument('--size-mb', type=float, default=20)
+    parser.add_argument('--pii-density', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=1, help='--workers for the end-to-end run')
+    parser.add_argument('--out', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    if args.corpus:
+        suite = run_suite(args.corpus, args.repeat, args.workers)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            make_corpus(tmp, args.size_mb, args.pii_density, seed=args.seed)
+            suite = run_suite(tmp, args.repeat, args.workers)
+
+    for name, entry in suite["results"].items():
+        line = f"{name:20s} {entry['mb_per_s']:9.1f} MB/s"
+        if "files_per_s" in entry:
+            line += f" {entry['files_per_s']:10.1f} files/s"
+        if "findings_per_s" in entry:
+            line += f" {entry['findings_per_s']:10.0f} findings/s"
+        print(line)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(suite, f, indent=2)
+        print(f"results written to {args.out}")
+
+if __name__ == '__main__':
+    main()
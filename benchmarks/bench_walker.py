@@ -0,0 +1,83 @@
+"""
+Compare the os.walk based FileWalker with the scandir walker, serial and
+threaded, on a synthetic tree.
+
+    python benchmarks/bench_walker.py [--files 1000000] [--threads 8] [--dir /path/to/tmp]
+
+Point --dir at a network filesystem to see the effect of --threads.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import measure
+from dlp_agent.config import DEFAULT_POLICY
+from dlp_agent.scanner import FileWalker
+
+FILES_PER_DIR = 100
+SUBDIRS_PER_DIR = 10
+# Roughly what a source/app-server tree looks like: most files aren't scanned
+EXTENSIONS = ['.py', '.js', '.o', '.png', '.so', '.class', '.html', '.log', '.txt', '.json', '.csv', '.md']
+EXCLUDED_DIRS = ['node_modules', '.git']
+
+def make_tree(root: str, files: int, seed: int = 11) -> int:
+    """Create empty files spread over nested directories. Returns the number of directories."""
+    rng = random.Random(seed)
+    pending = [root]
+    created = 0
+    dirs = 0
+    while created < files:
+        directory = pending.pop(0)
+        dirs += 1
+        for i in range(min(FILES_PER_DIR, files - created)):
+            with open(os.path.join(directory, f"file{i}{rng.choice(EXTENSIONS)}"), 'w'):
+                pass
+            created += 1
+        for i in range(SUBDIRS_PER_DIR):
+            name = EXCLUDED_DIRS[i] if rng.random() < 0.02 and i < len(EXCLUDED_DIRS) else f"dir{i}"
+            os.mkdir(os.path.join(directory, name))
+            pending.append(os.path.join(directory, name))
+    return dirs
+
+def legacy_walk(walker: FileWalker, root_dir: str):
+    """The walk FileWalker used before: os.walk, a substring test per excluded path, getsize per file."""
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = sorted(d for d in dirs if not any(
+            excluded in os.path.join(root, d).replace('\\', '/') for excluded in walker.excluded_paths))
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            if walker.should_scan_file(file_path):
+                yield file_path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=1000000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--dir', help='Where to build the tree (default: system temp dir)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        dirs = make_tree(tmp, args.files)
+        walker = FileWalker(DEFAULT_POLICY)
+        threaded = FileWalker({**DEFAULT_POLICY, 'scan': {**DEFAULT_POLICY['scan'], 'walkerThreads': args.threads}})
+
+        legacy_time, legacy_paths = measure(lambda: list(legacy_walk(walker, tmp)), args.repeat)
+        serial_time, serial_paths = measure(lambda: list(walker.walk(tmp)), args.repeat)
+        threaded_time, threaded_paths = measure(lambda: list(threaded.walk(tmp)), args.repeat)
+
+    print(f"tree: {args.files} files in {dirs} directories, {len(legacy_paths)} to scan")
+    print(f"os.walk:           {args.files / legacy_time:10.0f} files/s")
+    print(f"scandir:           {args.files / serial_time:10.0f} files/s  ({legacy_time / serial_time:.2f}x)")
+    print(f"scandir {args.threads:2d} threads: {args.files / threaded_time:10.0f} files/s  "
+          f"({legacy_time / threaded_time:.2f}x)")
+    if not legacy_paths == serial_paths == threaded_paths:
+        print("WARNING: walk results differ")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
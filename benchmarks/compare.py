@@ -0,0 +1,72 @@
+"""
+Compare benchmark suite results against a saved baseline.
+
+    python benchmarks/compare.py BASELINE.json CURRENT.json [--threshold 10]
+
+Prints every throughput metric side by side and flags those that dropped
+by more than --threshold percent. Exits with status 1 if any did, so it
+can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("mb_per_s", "files_per_s", "findings_per_s")
+# Corpus parameters that must match for throughputs to be comparable
+CORPUS_KEYS = ("size_mb", "pii_density", "file_kb", "seed")
+
+def compare(baseline: dict, current: dict, threshold: float) -> tuple[list[tuple], list[str]]:
+    """
+    Returns (rows, notes): a (benchmark, metric, baseline, current, change,
+    regressed) row per metric both runs measured, and notes on anything
+    that couldn't be compared.
+    """
+    notes = []
+    for key in CORPUS_KEYS:
+        if baseline["corpus"].get(key) != current["corpus"].get(key):
+            notes.append(f"corpus {key} differs: {baseline['corpus'].get(key)} vs {current['corpus'].get(key)}")
+    if baseline.get("workers") != current.get("workers"):
+        notes.append(f"workers differ: {baseline.get('workers')} vs {current.get('workers')}")
+
+    rows = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            notes.append(f"{name} is missing from the current results")
+            continue
+        for metric in METRICS:
+            if not base.get(metric) or metric not in now:
+                continue
+            change = (now[metric] - base[metric]) / base[metric] * 100
+            rows.append((name, metric, base[metric], now[metric], change, change < -threshold))
+    for name in current["results"]:
+        if name not in baseline["results"]:
+            notes.append(f"{name} is new, no baseline")
+    return rows, notes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10, help='Percent drop that counts as a regression')
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    rows, notes = compare(baseline, current, args.threshold)
+
+    for name, metric, base, now, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:20s} {metric:15s} {base:12.1f} -> {now:12.1f} {change:+7.1f}%{flag}")
+    for note in notes:
+        print(f"note: {note}")
+    regressions = sum(1 for row in rows if row[-1])
+    if regressions:
+        print(f"{regressions} metric(s) regressed by more than {args.threshold:g}%")
+        sys.exit(1)
+    print(f"no regressions beyond {args.threshold:g}%")
+
+if __name__ == '__main__':
+    main()
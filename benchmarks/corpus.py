@@ -0,0 +1,218 @@
+"""
+Generate a synthetic corpus with planted PII for the benchmark suite.
+
+    python benchmarks/corpus.py OUT_DIR [--size-mb 20] [--pii-density 0.01] [--formats txt,log,csv]
+
+Writes files of every format under OUT_DIR/data/<format>/, spread over
+nested directories, and OUT_DIR/manifest.json describing what was
+generated: file and byte counts per format and how many values of each
+rule were planted. Planted values are unique and valid (Luhn/Verhoeff
+checked), so each one is a finding; a few more turn up where planted
+digits also fit another rule. The same seed always produces the same
+corpus.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_engine import LOG_TEMPLATES
+from dlp_agent.utils.checksums import VERHOEFF_D, VERHOEFF_INV, VERHOEFF_P
+
+FORMATS = ['txt', 'log', 'csv', 'json', 'docx', 'xlsx', 'pptx', 'pdf']
+DATA_DIR = 'data'
+MANIFEST = 'manifest.json'
+FILES_PER_DIR = 25
+LINES_PER_PAGE = 60     # pdf pages and pptx slides hold this many lines
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def luhn_digit(number: str) -> str:
+    """The check digit that makes number + digit pass luhn_check."""
+    total = 0
+    for i, char in enumerate(reversed(number)):
+        digit = int(char)
+        if i % 2 == 0:
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return str(-total % 10)
+
+def verhoeff_digit(number: str) -> str:
+    """The check digit that makes number + digit pass verhoeff_check."""
+    c = 0
+    for i, char in enumerate(reversed(number)):
+        c = VERHOEFF_D[c][VERHOEFF_P[(i + 1) % 8][int(char)]]
+    return str(VERHOEFF_INV[c])
+
+class PiiFactory:
+    """Unique, valid PII values with their rule names."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.seen = set()
+        self.planted = {"Credit Card": 0, "Aadhaar": 0, "PAN": 0}
+
+    def make(self) -> str:
+        while True:
+            rule, value = self._value()
+            if value not in self.seen:
+                self.seen.add(value)
+                self.planted[rule] += 1
+                return value
+
+    def _value(self) -> tuple[str, str]:
+        rng = self.rng
+        kind = rng.randrange(3)
+        if kind == 0:
+            # 15 digit numbers need a valid Luhn digit, 16 digit ones are always reported
+            number = rng.choice('3456') + ''.join(rng.choice('0123456789') for _ in range(13))
+            number += luhn_digit(number)
+            return "Credit Card", ' '.join(number[i:i + 4] for i in range(0, 15, 4)) if rng.random() < 0.5 else number
+        if kind == 1:
+            number = rng.choice('23456789') + ''.join(rng.choice('0123456789') for _ in range(10))
+            number += verhoeff_digit(number)
+            return "Aadhaar", f"{number[:4]} {number[4:8]} {number[8:]}"
+        return "PAN", (''.join(rng.choice(LETTERS) for _ in range(5)) +
+                       ''.join(rng.choice('0123456789') for _ in range(4)) + rng.choice(LETTERS))
+
+def make_lines(rng: random.Random, pii: PiiFactory, size: int, density: float) -> list[str]:
+    """Log-like lines adding up to about size characters; density of them carry one PII value."""
+    lines = []
+    total = 0
+    while total < size:
+        line = rng.choice(LOG_TEMPLATES).format(m=rng.randrange(60), s=rng.randrange(60), n=rng.randrange(100000))
+        if rng.random() < density:
+            line = f"{line} ref {pii.make()}"
+        lines.append(line)
+        total += len(line) + 1
+    return lines
+
+def _write_text(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def _write_csv(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('id,amount,status,note\n')
+        for i, line in enumerate(lines):
+            f.write(f'{i},{i * 37 % 10000}.{i % 100:02d},{"ok" if i % 7 else "retry"},"{line}"\n')
+
+def _write_json(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n' + ',\n'.join(json.dumps({"id": i, "message": line}) for i, line in enumerate(lines)) + '\n]\n')
+
+def _write_docx(path, lines):
+    import docx
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+def _write_xlsx(path, lines):
+    import openpyxl
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('data')
+    for i, line in enumerate(lines):
+        sheet.append([i, line])
+    workbook.save(path)
+
+def _write_pptx(path, lines):
+    from pptx import Presentation
+    from pptx.util import Inches
+    presentation = Presentation()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+        for i, line in enumerate(lines[start:start + LINES_PER_PAGE]):
+            box = slide.shapes.add_textbox(Inches(0.2), Inches(0.1 * i), Inches(9), Inches(0.1))
+            box.text_frame.text = line
+    presentation.save(path)
+
+def _write_pdf(path, lines):
+    """A minimal PDF: one Helvetica text object per page."""
+    def escape(line):
+        return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)').encode('latin-1', 'replace')
+
+    bodies = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    page_ids = []
+    next_id = 4
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        text = b" ".join(b"(" + escape(line) + b") Tj T*" for line in lines[start:start + LINES_PER_PAGE])
+        stream = b"BT /F1 8 Tf 12 TL 20 800 Td " + text + b" ET"
+        bodies[next_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        bodies[next_id + 1] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 842 842] "
+                               b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % next_id)
+        page_ids.append(next_id + 1)
+        next_id += 2
+    bodies[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i in range(1, next_id):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, bodies[i])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % next_id
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+WRITERS = {
+    'txt': _write_text,
+    'log': _write_text,
+    'csv': _write_csv,
+    'json': _write_json,
+    'docx': _write_docx,
+    'xlsx': _write_xlsx,
+    'pptx': _write_pptx,
+    'pdf': _write_pdf,
+}
+
+def make_corpus(root: str, size_mb: float = 20, pii_density: float = 0.01, formats: list[str] = FORMATS,
+                file_kb: int = 256, seed: int = 0) -> dict:
+    """
+    Write the corpus under root/data: size_mb of text split evenly between
+    the formats, in files holding about file_kb of text each.
+    Returns the manifest, which is also saved as root/manifest.json.
+    """
+    rng = random.Random(seed)
+    pii = PiiFactory(rng)
+    per_format = size_mb * 1024 * 1024 / len(formats)
+    files_per_format = max(1, round(per_format / (file_kb * 1024)))
+    manifest = {
+        "size_mb": size_mb, "pii_density": pii_density, "file_kb": file_kb, "seed": seed,
+        "formats": {}, "planted": pii.planted,
+    }
+    for fmt in formats:
+        paths = []
+        for i in range(files_per_format):
+            directory = os.path.join(root, DATA_DIR, fmt, f"d{i // FILES_PER_DIR:03d}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"f{i:05d}.{fmt}")
+            WRITERS[fmt](path, make_lines(rng, pii, per_format / files_per_format, pii_density))
+            paths.append(path)
+        manifest["formats"][fmt] = {"files": len(paths), "bytes": sum(os.path.getsize(path) for path in paths)}
+    with open(os.path.join(root, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('out_dir')
+    parser.add_argument('--size-mb', type=float, default=20)
+    parser.add_argument('--pii-density', type=float, default=0.01, help='Fraction of lines carrying a PII value')
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    parser.add_argument('--file-kb', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = make_corpus(args.out_dir, args.size_mb, args.pii_density, args.formats.split(','),
+                           args.file_kb, args.seed)
+    for fmt, info in manifest["formats"].items():
+        print(f"{fmt:5s} {info['files']:6d} files {info['bytes'] / (1024 * 1024):8.1f} MB")
+    print("planted: " + ", ".join(f"{count} {rule}" for rule, count in manifest["planted"].items()))
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
 from .credit_card import detect_credit_cards
 from .aadhaar import detect_aadhaar
 from .pan import detect_pan
+from .engine import DetectionEngine
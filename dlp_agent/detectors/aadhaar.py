@@ -1,6 +1,7 @@
 import re
-from dlp_agent.utils.checksums import verhoeff_check
-from dlp_agent.events.model import DetectionEvent
+from typing import Optional
+from dlp_agent.utils.checksums import verhoeff_check_many
+from dlp_agent.events.model import DetectionEvent, Hit, digest_value
 
 # Aadhaar: 12 digits, optional spaces used as separators.
 # Configurable to prevent picking up standard large numbers if needed.
@@ -12,31 +13,36 @@ def detect_aadhaar(text: str) -> list[DetectionEvent]:
     Scan text for Aadhaar numbers.
     Returns a list of DetectionEvent objects.
     """
-    findings = []
-    
-    for match in AADHAAR_PATTERN.finditer(text):
-        raw_match = match.group()
-        clean_number = raw_match.replace(' ', '')
-        
-        if len(clean_number) != 12:
-            continue
+    raw_matches = [match.group() for match in AADHAAR_PATTERN.finditer(text)]
+    return [DetectionEvent.from_hit(hit) for hit in hits_for_matches(raw_matches) if hit is not None]
 
-        # Exclusion: Repeated digits (e.g., 1111 1111 1111) are often test data or not valid
-        if len(set(clean_number)) == 1:
-            continue
-            
-        if verhoeff_check(clean_number):
-            event = DetectionEvent.create(
+def hit_for_match(raw_match: str) -> Optional[Hit]:
+    """
+    Validate a single AADHAAR_PATTERN match.
+    Returns a Hit, or None if the candidate is rejected.
+    """
+    return hits_for_matches([raw_match])[0]
+
+def hits_for_matches(raw_matches: list[str]) -> list[Optional[Hit]]:
+    """
+    Validate a batch of AADHAAR_PATTERN matches with a single Verhoeff call.
+    Returns a Hit or None for each match, in order.
+    """
+    numbers = [raw_match.replace(' ', '') for raw_match in raw_matches]
+
+    # Exclusion: Repeated digits (e.g., 1111 1111 1111) are often test data or not valid
+    to_check = [i for i, number in enumerate(numbers) if len(number) == 12 and len(set(number)) != 1]
+
+    hits = [None] * len(numbers)
+    for i, valid in zip(to_check, verhoeff_check_many([numbers[i] for i in to_check])):
+        if valid:
+            hits[i] = Hit(
                 rule="Aadhaar",
                 severity="Critical",
-                raw_value=clean_number,
-                masked_value=mask_aadhaar(clean_number),
-                source={},
-                context_snippet=None
+                masked_value=mask_aadhaar(numbers[i]),
+                digest=digest_value(numbers[i])
             )
-            findings.append(event)
-            
-    return findings
+    return hits
 
 def mask_aadhaar(number: str) -> str:
     """Masks Aadhaar number: XXXX XXXX 9012"""
@@ -0,0 +1,163 @@
+"""
+Rules defined in the policy rather than in code.
+
+Any key under "rules" other than the built-in ones is a custom rule:
+
+    "employee_id": {
+        "enabled": true,
+        "name": "Employee ID",
+        "pattern": "\\\\bEMP-(?P<value>\\\\d{7})\\\\b",
+        "validator": "luhn",
+        "mask": "last4",
+        "severity": "Medium",
+        "anchors": ["EMP-"],
+        "keywords": ["employee", "staff"]
+    }
+
+A match's value is its "value" group if the pattern has one, else the
+whole match, with spaces and hyphens removed; it is what gets validated,
+masked and hashed. Patterns are matched line by line, ^ and $ matching
+at the start and end of each line. A line must contain one of the anchors (literals every
+match contains) and, if given, one of the keywords, both compared
+case-insensitively. A rule without anchors is anchored on the longest
+literal its pattern always matches, and one with neither anchors,
+keywords nor such a literal is rejected: the engine finds the literals of
+all custom rules in one pass, so only lines holding them reach a rule's
+regex, however many rules there are.
+"""
+import re
+from typing import Callable, Optional
+from dlp_agent.detectors.engine import BUILTIN_RULES, Rule
+from dlp_agent.events.model import Hit, digest_value
+from dlp_agent.utils.checksums import luhn_check_many, verhoeff_check_many
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Shortest pattern literal worth anchoring a rule on
+MIN_ANCHOR_LENGTH = 3
+
+_SEPARATORS = str.maketrans('', '', ' -')
+_NON_DIGITS = re.compile(r'\D')
+
+def _digits_checked(check_many: Callable[[list[str]], list[bool]]) -> Callable[[list[str]], list[bool]]:
+    """A validator running a checksum over the digits of each value."""
+    def validate(values: list[str]) -> list[bool]:
+        numbers = [_NON_DIGITS.sub('', value) for value in values]
+        valid = [len(number) > 1 for number in numbers]
+        to_check = [i for i, ok in enumerate(valid) if ok]
+        for i, ok in zip(to_check, check_many([numbers[i] for i in to_check])):
+            valid[i] = ok
+        return valid
+    return validate
+
+# Validator name -> function taking a batch of values, returning a bool for each
+VALIDATORS = {
+    'none': lambda values: [True] * len(values),
+    'luhn': _digits_checked(luhn_check_many),
+    'verhoeff': _digits_checked(verhoeff_check_many),
+}
+
+def _keep(first: int, last: int) -> Callable[[str], str]:
+    def mask(value: str) -> str:
+        hidden = len(value) - first - last
+        if hidden < 1:
+            return '*' * len(value)
+        return value[:first] + '*' * hidden + value[len(value) - last:]
+    return mask
+
+# Mask style -> function masking a value
+MASKS = {
+    'last4': _keep(0, 4),
+    'first4': _keep(4, 0),
+    'edges': _keep(2, 2),
+    'full': _keep(0, 0),
+}
+
+def register_validator(name: str, validate: Callable[[list[str]], list[bool]]):
+    """Make validate available to custom rules as "validator": name."""
+    VALIDATORS[name] = validate
+
+def register_mask(name: str, mask: Callable[[str], str]):
+    """Make mask available to custom rules as "mask": name."""
+    MASKS[name] = mask
+
+def pattern_literal(pattern: re.Pattern) -> Optional[str]:
+    """
+    The longest run of literal characters every match of pattern contains,
+    lowercased, or None if there is none of MIN_ANCHOR_LENGTH or more.
+    Only the top-level sequence and plain groups in it are looked at.
+    """
+    runs = ['']
+
+    def walk(items):
+        for op, arg in items:
+            if op is sre_parse.LITERAL:
+                runs[-1] += chr(arg)
+            elif op is sre_parse.SUBPATTERN and not arg[1] and not arg[2]:
+                walk(arg[3])  # (group, add_flags, del_flags, items)
+            elif op is sre_parse.AT:
+                continue  # \b, ^ and $ match no characters
+            else:
+                runs.append('')
+
+    walk(sre_parse.parse(pattern.pattern, pattern.flags))
+    longest = max(runs, key=len)
+    return longest.lower() if len(longest) >= MIN_ANCHOR_LENGTH else None
+
+def custom_rule(key: str, spec: dict) -> Rule:
+    """
+    Compile one custom rule's policy entry into an engine Rule.
+    Raises ValueError if the entry can't be used.
+    """
+    if 'pattern' not in spec:
+        raise ValueError(f"Rule {key!r} has no pattern")
+    try:
+        # Lines are matched inside multi-line buffers, so ^ and $ must see their breaks
+        pattern = re.compile(spec['pattern'], re.MULTILINE)
+    except re.error as e:
+        raise ValueError(f"Rule {key!r} has an invalid pattern: {e}") from None
+    validate = VALIDATORS.get(spec.get('validator', 'none'))
+    if validate is None:
+        raise ValueError(f"Rule {key!r} has an unknown validator {spec['validator']!r} (known: {', '.join(VALIDATORS)})")
+    mask = MASKS.get(spec.get('mask', 'last4'))
+    if mask is None:
+        raise ValueError(f"Rule {key!r} has an unknown mask {spec['mask']!r} (known: {', '.join(MASKS)})")
+
+    keywords = frozenset(keyword.lower() for keyword in spec.get('keywords', ()))
+    anchors = frozenset(anchor.lower() for anchor in spec.get('anchors', ()))
+    if not anchors:
+        literal = pattern_literal(pattern)
+        anchors = frozenset([literal]) if literal else frozenset()
+    literals = tuple(literal_set for literal_set in (anchors, keywords) if literal_set)
+    if not literals:
+        raise ValueError(f"Rule {key!r} needs anchors or keywords: its pattern has no literal to prefilter on")
+
+    name = spec.get('name', key)
+    severity = spec.get('severity', 'Medium')
+    group = 'value' if 'value' in pattern.groupindex else 0
+
+    def find(text: str, pos: int, endpos: int) -> list[str]:
+        return [match.group(group) or '' for match in pattern.finditer(text, pos, endpos)]
+
+    def to_hits(raw_matches: list[str]) -> list[Optional[Hit]]:
+        values = [raw_match.translate(_SEPARATORS) for raw_match in raw_matches]
+        return [Hit(name, severity, mask(value), digest_value(value)) if valid and value else None
+                for value, valid in zip(values, validate(values))]
+
+    return Rule(key, pattern, '|'.join(map(re.escape, literals[0])), to_hits, finder=find, literals=literals)
+
+def _custom_specs(config: dict) -> list[tuple[str, dict]]:
+    builtin = {rule.key for rule in BUILTIN_RULES}
+    return [(key, spec) for key, spec in config.get('rules', {}).items()
+            if key not in builtin and spec.get('enabled', False)]
+
+def has_custom_rules(config: dict) -> bool:
+    """Whether the policy enables any custom rule."""
+    return bool(_custom_specs(config))
+
+def custom_rules(config: dict) -> list[Rule]:
+    """Engine Rules for the enabled custom rules in the policy, in policy order."""
+    return [custom_rule(key, spec) for key, spec in _custom_specs(config)]
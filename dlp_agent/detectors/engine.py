@@ -0,0 +1,342 @@
+import re
+from typing import Callable, NamedTuple, Optional
+from dlp_agent.detectors import aadhaar, credit_card, pan
+from dlp_agent.events.model import Hit
+
+class Rule(NamedTuple):
+    key: str                 # Policy key under "rules"
+    pattern: re.Pattern      # Candidate pattern, identical to the detector's own
+    anchor: str              # Regex every candidate must contain (used by the prefilter)
+    to_hits: Callable[[list[str]], list[Optional[Hit]]]  # Validates a batch of candidates
+    shape: Optional[tuple[str, bytes]] = None  # (view, needle) for the byte-level prefilter
+    # Linear-time stand-in for pattern.finditer(text, pos, endpos); such
+    # rules are left out of the combined pattern
+    finder: Optional[Callable[[str, int, int], list[str]]] = None
+    # Sets of lowercase literals a line must contain one of each of for the
+    # rule to run on it. The literals of all such rules are found in a
+    # single pass, and the rules are left out of the combined pattern
+    literals: tuple[frozenset, ...] = ()
+
+def _view_table(letters: bytes, deleted: bytes) -> tuple[bytes, bytes]:
+    table = bytearray(b'.' * 256)
+    table[ord('\n')] = ord('\n')
+    for byte in b'0123456789':
+        table[byte] = ord('0')
+    # Any non-ASCII byte may be part of a Unicode digit (\d is Unicode-aware)
+    # or an invalid byte that decoding drops from between two digits
+    for byte in range(0x80, 0x100):
+        table[byte] = ord('0')
+    for byte in letters:
+        table[byte] = ord('a')
+    return bytes(table), deleted
+
+# Byte-level views of raw UTF-8 text used to find candidate lines without
+# decoding. Both keep newlines and map ASCII digits to '0'. "digits" drops
+# separators and ASCII whitespace so grouped numbers collapse into one run;
+# "text" maps ASCII letters to 'a' and drops non-ASCII bytes, which can only
+# ever be invalid UTF-8 that decoding would discard as far as [A-Za-z0-9]
+# patterns are concerned.
+SHAPE_VIEWS = {
+    "digits": _view_table(b'', b' -\t\x0b\x0c\x1c\x1d\x1e\x1f'),
+    "text": _view_table(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz', bytes(range(0x80, 0x100))),
+}
+
+# Raw UTF-8 with ASCII letters lowercased and non-ASCII bytes dropped, for
+# finding custom rules' literals
+_LOWERCASE_VIEW = (bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'abcdefghijklmnopqrstuvwxyz'),
+                   bytes(range(0x80, 0x100)))
+
+# Built-in rules in the order StreamProcessor has always run them.
+# Anchors and shapes are necessary conditions only: a line without
+# them can't produce a candidate for that rule.
+BUILTIN_RULES = (
+    Rule("card", credit_card.CC_PATTERN, r'\d(?:[ -]*\d){12}', credit_card.hits_for_matches,
+         ("digits", b'0' * 13), credit_card.find_candidates),
+    Rule("aadhaar", aadhaar.AADHAAR_PATTERN, r'[2-9]\d{3}\s?\d{4}', aadhaar.hits_for_matches,
+         ("digits", b'0' * 12)),
+    Rule("pan", pan.PAN_PATTERN, r'[A-Za-z]{5}[0-9]{4}', pan.hits_for_matches,
+         ("text", b'aaaaa0000')),
+)
+
+def _combine(rules: list[Rule]) -> re.Pattern:
+    """
+    Join rule patterns into one alternation of named lookaheads.
+    A leading \\b shared by every rule is hoisted out of the alternation so
+    the regex engine rejects most positions before trying any rule.
+    """
+    sources = [rule.pattern.pattern for rule in rules]
+    prefix = ''
+    if all(source.startswith(r'\b') for source in sources):
+        prefix = r'\b'
+        sources = [source[2:] for source in sources]
+    return re.compile(prefix + '(?:' + '|'.join(
+        f"(?=(?P<{rule.key}>{source}))" for rule, source in zip(rules, sources)
+    ) + ')')
+
+def _literal_pattern(literals) -> str:
+    """
+    A regex matching any of literals, as a trie of alternations, so that
+    it costs about the same however many literals there are. At each
+    position it prefers the longest literal.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+def _shape_needles(rules: list[Rule]) -> Optional[dict[str, list[bytes]]]:
+    """
+    Group rule shapes by view, dropping needles that contain a shorter
+    needle of the same view. Returns None if any rule has no shape.
+    """
+    if any(rule.shape is None for rule in rules):
+        return None
+    needles = {}
+    for view, needle in sorted({rule.shape for rule in rules}, key=lambda s: len(s[1])):
+        kept = needles.setdefault(view, [])
+        if not any(shorter in needle for shorter in kept):
+            kept.append(needle)
+    return needles
+
+class DetectionEngine:
+    """
+    Runs every enabled rule over a line in a single regex pass.
+
+    Each rule's pattern is wrapped in a lookahead with a named group and the
+    lookaheads are joined into one alternation, so a single finditer visits
+    every position where *any* rule matches without consuming text. At a hit
+    the remaining rules are tried at the same position, and each rule keeps
+    its own resume offset, which reproduces the non-overlapping matches a
+    separate finditer per rule would have produced. Rules with a finder
+    produce their candidates with it instead.
+
+    Rules with literals, such as custom rules from the policy, only run on
+    lines where one lookahead over a trie of all their literals (ignoring
+    ASCII case) finds what each of them needs, so a line without any of
+    them costs one scan however many rules there are.
+    """
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = list(rules)
+        self._index = {rule.key: i for i, rule in enumerate(self.rules)}
+        ungated = [rule for rule in self.rules if not rule.literals]
+        self._finders = [(i, rule.finder) for i, rule in enumerate(self.rules)
+                         if rule.finder is not None and not rule.literals]
+        pattern_rules = [rule for rule in ungated if rule.finder is None]
+        anchors = [rule.anchor for rule in ungated]
+        self._shapes = _shape_needles(ungated) if self.rules else None
+
+        self._gated = [(i, rule.literals) for i, rule in enumerate(self.rules) if rule.literals]
+        self._literal_gate = self._byte_gate = None
+        if self._gated:
+            literals = set().union(*(literal_set for _, sets in self._gated for literal_set in sets))
+            trie = _literal_pattern(literals)
+            anchors.append(f'(?ai:{trie})')
+            self._literal_gate = re.compile(f'(?=({trie}))', re.ASCII | re.IGNORECASE)
+            # The gate reports the longest literal at a position; the ones it's a prefix of are there too
+            self._covers = {literal: {prefix for prefix in literals if literal.startswith(prefix)}
+                            for literal in literals}
+            if all(literal.isascii() for literal in literals):
+                # Searched on a lowercased view: IGNORECASE costs sre its fast first-byte skip
+                self._byte_gate = re.compile(trie.encode('ascii'))
+            else:
+                self._shapes = None
+
+        self._prefilter = re.compile('|'.join(anchors)) if self.rules else None
+        self._combined = _combine(pattern_rules) if pattern_rules else None
+
+    @classmethod
+    def from_policy(cls, config: dict) -> 'DetectionEngine':
+        """
+        The enabled built-in rules, then the enabled custom ones (see
+        dlp_agent.detectors.custom). Raises ValueError for a custom rule
+        that can't be compiled.
+        """
+        from dlp_agent.detectors.custom import custom_rules
+
+        rules = config.get('rules', {})
+        builtin = [rule for rule in BUILTIN_RULES if rules.get(rule.key, {}).get('enabled', False)]
+        return cls(builtin + custom_rules(config))
+
+    def detect(self, text: str) -> list[Hit]:
+        """
+        Scan text with all enabled rules.
+        Returns Hits in the same order as calling each detector in
+        turn: grouped by rule, then by position.
+        """
+        if self._prefilter is None or not self._prefilter.search(text):
+            return []
+        candidates = [(0, i, raw_match) for i, raw_match in self._scan(text, 0, len(text))]
+        return [hit for _, hit in self._validate(candidates)]
+
+    def detect_buffer(self, text: str) -> list[tuple[int, Hit]]:
+        r"""
+        Scan a block of '\n'-separated lines.
+        Returns (line_index, hit) pairs, where line_index counts the
+        newlines before the line, in the order detect() would produce
+        them line by line.
+
+        The prefilter runs over the whole block, and the combined pattern
+        only over lines that contain an anchor. Lines are bounded with
+        pos/endpos, so \b and \s behave exactly as on a standalone line.
+        Candidates of the whole block are validated together.
+        """
+        if self._prefilter is None:
+            return []
+
+        candidates = []
+        line_index = 0
+        counted = 0
+        pos = 0
+        search = self._prefilter.search
+        while True:
+            candidate = search(text, pos)
+            if candidate is None:
+                break
+            start = text.rfind('\n', 0, candidate.start()) + 1
+            end = text.find('\n', candidate.start())
+            if end == -1:
+                end = len(text)
+            found = self._scan(text, start, end)
+            if found:
+                # Line numbers are only worked out for lines with candidates
+                line_index += text.count('\n', counted, start)
+                counted = start
+                candidates.extend((line_index, i, raw_match) for i, raw_match in found)
+            pos = end + 1
+        return self._validate(candidates)
+
+    def detect_block(self, data: bytes) -> list[tuple[int, Hit]]:
+        r"""
+        Scan a block of raw UTF-8 bytes holding '\n'-separated lines.
+        Returns the same (line_index, hit) pairs as decoding each line
+        with errors='ignore' and calling detect() on it.
+
+        Candidate lines are found on translated byte views with bytes.find,
+        so only lines that could hold a match are ever decoded or reach a
+        regex. Falls back to detect_buffer() if a rule has no shape.
+        """
+        if self._shapes is None:
+            return self.detect_buffer(data.decode('utf-8', errors='ignore'))
+
+        candidates = set()
+        for view_name, needles in self._shapes.items():
+            view = data.translate(*SHAPE_VIEWS[view_name])
+            for needle in needles:
+                line_index = 0
+                counted = 0
+                pos = view.find(needle)
+                while pos != -1:
+                    line_index += view.count(b'\n', counted, pos)
+                    counted = pos
+                    candidates.add(line_index)
+                    end = view.find(b'\n', pos)
+                    if end == -1:
+                        break
+                    pos = view.find(needle, end + 1)
+
+        if self._byte_gate is not None:
+            # Dropping non-ASCII bytes keeps every literal decoding could leave on a line
+            view = data.translate(*_LOWERCASE_VIEW)
+            search = self._byte_gate.search
+            line_index = 0
+            counted = 0
+            found = search(view)
+            while found is not None:
+                pos = found.start()
+                line_index += view.count(b'\n', counted, pos)
+                counted = pos
+                candidates.add(line_index)
+                end = view.find(b'\n', pos)
+                if end == -1:
+                    break
+                found = search(view, end + 1)
+
+        if not candidates:
+            return []
+
+        lines = data.split(b'\n')
+        found = []
+        prefilter = self._prefilter.search
+        for line_index in sorted(candidates):
+            line = lines[line_index].decode('utf-8', errors='ignore')
+            if prefilter(line):
+                found.extend((line_index, i, raw_match) for i, raw_match in self._scan(line, 0, len(line)))
+        return self._validate(found)
+
+    def _scan(self, text: str, pos: int, endpos: int) -> list[tuple[int, str]]:
+        """
+        Run the finders and the combined pattern over text[pos:endpos].
+        Returns (rule index, raw match) candidates grouped by rule, then by
+        position, for _validate().
+        """
+        rules = self.rules
+        index = self._index
+        per_rule = [[] for _ in rules]
+        next_pos = [0] * len(rules)
+
+        for i, finder in self._finders:
+            per_rule[i] = [(i, raw_match) for raw_match in finder(text, pos, endpos)]
+        if self._gated:
+            found = set()
+            for literal in self._literal_gate.finditer(text, pos, endpos):
+                found |= self._covers.get(literal.group(1).lower(), set())
+            if found:
+                for i, literal_sets in self._gated:
+                    if all(not found.isdisjoint(literal_set) for literal_set in literal_sets):
+                        rule = rules[i]
+                        raw_matches = (rule.finder(text, pos, endpos) if rule.finder is not None else
+                                       [match.group() for match in rule.pattern.finditer(text, pos, endpos)])
+                        per_rule[i] = [(i, raw_match) for raw_match in raw_matches]
+        if self._combined is not None:
+            for hit in self._combined.finditer(text, pos, endpos):
+                start = hit.start()
+                first = index[hit.lastgroup]
+                for i in range(first, len(rules)):
+                    if start < next_pos[i] or rules[i].finder is not None or rules[i].literals:
+                        continue
+                    if i == first:
+                        raw_match = hit.group(hit.lastgroup)
+                    else:
+                        match = rules[i].pattern.match(text, start, endpos)
+                        if match is None:
+                            continue
+                        raw_match = match.group()
+                    next_pos[i] = start + len(raw_match)
+                    per_rule[i].append((i, raw_match))
+
+        if len(rules) == 1:
+            return per_rule[0]
+        return [candidate for candidates in per_rule for candidate in candidates]
+
+    def _validate(self, candidates: list[tuple[int, int, str]]) -> list[tuple[int, Hit]]:
+        """
+        Validate (line_index, rule index, raw match) candidates with one
+        to_hits() call per rule, so checksums run over whole batches.
+        Returns (line_index, hit) for the accepted ones, in order.
+        """
+        if not candidates:
+            return []
+        by_rule = [[] for _ in self.rules]
+        for _, i, raw_match in candidates:
+            by_rule[i].append(raw_match)
+        validated = [iter(rule.to_hits(raw_matches)) if raw_matches else None
+                     for rule, raw_matches in zip(self.rules, by_rule)]
+
+        results = []
+        for line_index, i, _ in candidates:
+            hit = next(validated[i])
+            if hit is not None:
+                results.append((line_index, hit))
+        return results
@@ -1,5 +1,6 @@
 import re
-from dlp_agent.events.model import DetectionEvent
+from typing import Optional
+from dlp_agent.events.model import DetectionEvent, Hit, digest_value
 
 # PAN: 5 letters, 4 digits, 1 letter. Case insensitive usually, but official PAN is uppercase.
 # We will match case-insensitively as per requirements.
@@ -13,24 +14,30 @@ def detect_pan(text: str) -> list[DetectionEvent]:
     findings = []
     
     for match in PAN_PATTERN.finditer(text):
-        raw_match = match.group()
-        # No checksum available for PAN publicly (it exists but is proprietary/complex).
-        # Regex is strong enough for this context as per spec.
-        
-        event = DetectionEvent.create(
-            rule="PAN",
-            severity="High",
-            raw_value=raw_match,  # PAN is often alphanumeric, so keep case? Raw match has dashes? 
-                                  # Regex doesn't match dashes here. 
-                                  # Let's keep raw match as is.
-            masked_value=mask_pan(raw_match),
-            source={},
-            context_snippet=None
-        )
-        findings.append(event)
+        findings.append(DetectionEvent.from_hit(hit_for_match(match.group())))
             
     return findings
 
+def hit_for_match(raw_match: str) -> Optional[Hit]:
+    """
+    Build the Hit for a single PAN_PATTERN match.
+    PAN has no public checksum, so every match is accepted.
+    """
+    # No checksum available for PAN publicly (it exists but is proprietary/complex).
+    # Regex is strong enough for this context as per spec.
+    return Hit(
+        rule="PAN",
+        severity="High",
+        masked_value=mask_pan(raw_match),
+        digest=digest_value(raw_match)  # PAN is often alphanumeric, so keep case? Raw match has dashes? 
+                                        # Regex doesn't match dashes here. 
+                                        # Let's keep raw match as is.
+    )
+
+def hits_for_matches(raw_matches: list[str]) -> list[Optional[Hit]]:
+    """Build the Hits for a batch of PAN_PATTERN matches, in order."""
+    return [hit_for_match(raw_match) for raw_match in raw_matches]
+
 def mask_pan(number: str) -> str:
     """Masks PAN number: ABCDE****F"""
     # Keep first 5 chars, mask 4 digits, keep last char
@@ -1,26 +1,115 @@
 import uuid
 import hashlib
 import json
-from datetime import datetime
-from dataclasses import dataclass, field, asdict
-from typing import Optional
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional, Union
 
-@dataclass
+# Whether the file a detection came from was read in full or only sampled
+FULL_COVERAGE = "full"
+SAMPLED_COVERAGE = "sampled"
+
+class Finding(NamedTuple):
+    """Compact, picklable record of one detection, without its file path."""
+    line: Union[int, str]  # Line number or extractor locator such as "p2:l7"
+    rule: str
+    severity: str
+    masked_value: str
+    hash: str
+    coverage: str = FULL_COVERAGE
+
+class Hit(NamedTuple):
+    """
+    One detection as the detectors produce it, before it has a location.
+    Only the raw SHA-256 digest is computed; everything else an event
+    carries is added once it survives deduplication.
+    """
+    rule: str
+    severity: str
+    masked_value: str
+    digest: bytes  # SHA-256 of the raw value
+
+    @property
+    def hash(self) -> str:
+        return self.digest.hex()
+
+def digest_value(raw_value: str) -> bytes:
+    return hashlib.sha256(raw_value.encode('utf-8')).digest()
+
+PARTIAL_SCAN_RULE = "Partial Scan"
+
+class PartialScan(NamedTuple):
+    """
+    Yielded by an extractor in place of text when it stops before the end
+    of a file, e.g. on a time or page budget. It is reported as a
+    PARTIAL_SCAN_RULE finding carrying the reason, and the scan counts as
+    incomplete, so the index and the content cache don't keep the file as
+    done. The digest is the reason's alone; the location is in the source.
+    """
+    reason: str
+
+    def to_hit(self) -> Hit:
+        return Hit(PARTIAL_SCAN_RULE, "INFO", self.reason, digest_value(self.reason))
+
+@dataclass(init=False)
 class DetectionEvent:
-    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
-    agent_id: str = "node-001"  # Default agent ID, could be configured
-    rule: str = "UNKNOWN"
-    severity: str = "medium"
-    masked_value: str = ""
-    hash: str = ""
-    source: dict = field(default_factory=dict)
-    context: Optional[dict] = None
+    """
+    A detection as the sinks see it.
+
+    event_id and timestamp are generated on first access (the timestamp
+    from the creation time), and the hex hash from the digest, so events
+    that are never serialized never pay for them. They are still
+    dataclass fields: asdict(), replace(), fields() and == generate them
+    as any other access does.
+    """
+    __slots__ = ('event_id', 'timestamp', 'agent_id', 'rule', 'severity', 'masked_value', 'hash',
+                 'source', 'context', '_created', '_digest')
+    # No class-level defaults, which would shadow the slots; __init__ has them
+    event_id: str
+    timestamp: str
+    agent_id: str
+    rule: str
+    severity: str
+    masked_value: str
+    hash: str
+    source: dict
+    context: Optional[dict]
+
+    def __init__(self, event_id: str = None, timestamp: str = None, agent_id: str = "node-001",
+                 rule: str = "UNKNOWN", severity: str = "medium", masked_value: str = "", hash: str = "",
+                 source: dict = None, context: Optional[dict] = None, *, digest: bytes = None):
+        # Slots left unset here are filled in by __getattr__ on first access
+        if event_id is not None:
+            self.event_id = event_id
+        if timestamp is not None:
+            self.timestamp = timestamp
+        self._created = time.time()
+        self.agent_id = agent_id  # Default agent ID, could be configured
+        self.rule = rule
+        self.severity = severity
+        self.masked_value = masked_value
+        if digest is None:
+            self.hash = hash
+        self._digest = digest
+        self.source = source if source is not None else {}
+        self.context = context
+
+    def __getattr__(self, name: str):
+        if name == 'event_id':
+            value = str(uuid.uuid4())
+        elif name == 'timestamp':
+            created = datetime.fromtimestamp(self._created, timezone.utc).replace(tzinfo=None)
+            value = created.isoformat() + "Z"
+        elif name == 'hash':
+            value = self._digest.hex()
+        else:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        setattr(self, name, value)
+        return value
 
     @staticmethod
     def create(rule: str, severity: str, raw_value: str, masked_value: str, source: dict, context_snippet: str = None) -> 'DetectionEvent':
-        raw_hash = hashlib.sha256(raw_value.encode('utf-8')).hexdigest()
-        
         context = None
         if context_snippet:
              context = {"snippet": context_snippet[:120]} # Max 120 chars constraint
@@ -29,10 +118,29 @@ class DetectionEvent:
             rule=rule,
             severity=severity,
             masked_value=masked_value,
-            hash=raw_hash,
             source=source,
-            context=context
+            context=context,
+            digest=digest_value(raw_value)
         )
 
+    @staticmethod
+    def from_hit(hit: Hit, source: dict = None) -> 'DetectionEvent':
+        return DetectionEvent(rule=hit.rule, severity=hit.severity, masked_value=hit.masked_value,
+                              source=source, digest=hit.digest)
+
+    def to_dict(self) -> dict:
+        """Same result as dataclasses.asdict(), without its recursive deep copy."""
+        return {
+            "event_id": self.event_id,
+            "timestamp": self.timestamp,
+            "agent_id": self.agent_id,
+            "rule": self.rule,
+            "severity": self.severity,
+            "masked_value": self.masked_value,
+            "hash": self.hash,
+            "source": dict(self.source),
+            "context": dict(self.context) if self.context is not None else None,
+        }
+
     def to_json(self) -> str:
-        return json.dumps(asdict(self))
+        return json.dumps(self.to_dict())
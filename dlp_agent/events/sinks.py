@@ -1,11 +1,26 @@
 from abc import ABC, abstractmethod
 import click
+import gzip
+import itertools
 import json
 import logging
-from dataclasses import asdict
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
 from dlp_agent.events.model import DetectionEvent
 
+# Bytes of JSON lines JsonSink collects before writing them out
+JSON_BUFFER_SIZE = 1024 * 1024
+JSON_GZIP_LEVEL = 6
+
 class EventSink(ABC):
+    # False if events, once emitted, can't be taken back by rewind()
+    rewindable = True
+
     @abstractmethod
     def emit(self, event: DetectionEvent):
         pass
@@ -13,6 +28,17 @@ class EventSink(ABC):
     def flush(self):
         pass
 
+    def position(self):
+        """
+        Durable, JSON-serializable marker of what has been emitted so far,
+        or None if the sink doesn't track it. Used for scan checkpoints.
+        """
+        return None
+
+    def rewind(self, position):
+        """Drop anything emitted after position, as returned by position()."""
+        pass
+
 class CliSink(EventSink):
     """Prints human-readable messages to stdout (using click)."""
     def emit(self, event: DetectionEvent):
@@ -24,32 +50,223 @@ class CliSink(EventSink):
         click.echo(msg)
 
 class JsonSink(EventSink):
-    """Writes JSON lines to a file (or stdout if file is None)."""
-    def __init__(self, file_path: str = None):
+    """
+    Writes JSON lines to a file (or stdout if file is None).
+
+    Lines are collected into one write of about buffer_size bytes. The file
+    is rotated once it reaches rotate_bytes on disk or was opened
+    rotate_seconds ago: it is renamed to <name>.<n><ext>, numbered up from
+    the oldest, and a new file is started under the original name.
+    compress='gzip', or 'zstd' with the zstandard package, compresses the
+    output as a stream of gzip members/zstd frames.
+
+    Durability: by default lines reach the OS when the buffer fills and on
+    flush(), and the OS decides when they reach the disk. With
+    fsync_interval set, the buffer is written and fsynced whenever that
+    many seconds have passed at an emit() (0 means after every event).
+    position() always writes and fsyncs everything emitted so far.
+    """
+
+    def __init__(self, file_path: str = None, buffer_size: int = JSON_BUFFER_SIZE, rotate_bytes: int = None,
+                 rotate_seconds: float = None, compress: str = None, fsync_interval: float = None):
+        if compress not in (None, 'gzip', 'zstd'):
+            raise ValueError(f"Unsupported compression: {compress}")
+        if compress == 'zstd':
+            try:
+                import zstandard as _zstandard
+                self._zstandard = _zstandard
+            except ImportError:
+                raise ImportError(
+                    "The 'zstandard' library is required for zstd compression. "
+                    "Install it with: pip install zstandard"
+                )
         self.file_path = file_path
-        self.file_handle = None
+        self.buffer_size = buffer_size
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.fsync_interval = fsync_interval
+        self._buffer = []
+        self._buffered = 0
+        self._raw = None
+        self._stream = None
+        self._opened = time.monotonic()
+        self._last_sync = time.monotonic()
         if self.file_path:
-            self.file_handle = open(self.file_path, 'a', encoding='utf-8')
+            self._next_segment = self._find_next_segment()
+            self._open_file()
 
     def emit(self, event: DetectionEvent):
-        json_str = event.to_json()
-        if self.file_handle:
-            self.file_handle.write(json_str + '\n')
-        else:
-            click.echo(json_str)
+        line = event.to_json() + '\n'
+        self._buffer.append(line)
+        self._buffered += len(line)
+        if self._buffered >= self.buffer_size:
+            self._write_buffer()
+        if self._raw is not None:
+            now = time.monotonic()
+            if self.rotate_seconds and now - self._opened >= self.rotate_seconds:
+                self._write_buffer()
+                if now - self._opened >= self.rotate_seconds:  # Not just rotated by size
+                    self._rotate()
+            if self.fsync_interval is not None and now - self._last_sync >= self.fsync_interval:
+                self._sync()
 
     def flush(self):
-        if self.file_handle:
-            self.file_handle.flush()
-            
+        self._write_buffer()
+        if self._raw is None:
+            sys.stdout.flush()
+            return
+        if self._stream is not None and self._stream is not self._raw:
+            self._stream.flush()
+        self._raw.flush()
+
+    def position(self):
+        if self._raw is None:
+            return None
+        self._write_buffer()
+        # A truncated file must end on a complete gzip member/zstd frame
+        self._end_stream()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._last_sync = time.monotonic()
+        return {"segment": self._next_segment, "offset": self._raw.tell()}
+
+    def rewind(self, position):
+        if self._raw is None or position is None:
+            return
+        segment, offset = position["segment"], position["offset"]
+        self._write_buffer()
+        self._close_file()
+        try:
+            if segment > self._next_segment:
+                logging.warning(f"[JsonSink] Rotated files of {self.file_path} are missing, not rewinding")
+                return
+            if segment < self._next_segment:
+                # Rotated since the checkpoint: drop the newer files and make
+                # the checkpointed one the current file again
+                for newer in range(segment + 1, self._next_segment):
+                    if os.path.exists(self._segment_path(newer)):
+                        os.remove(self._segment_path(newer))
+                os.replace(self._segment_path(segment), self.file_path)
+                self._next_segment = segment
+            if offset > os.path.getsize(self.file_path):
+                logging.warning(f"[JsonSink] {self.file_path} is shorter than its checkpoint, not rewinding")
+                return
+            # Events after the checkpoint will be emitted again
+            os.truncate(self.file_path, offset)
+        finally:
+            self._open_file()
+
     def close(self):
-        if self.file_handle:
-            self.file_handle.close()
+        self._write_buffer()
+        if self._raw is None:
+            sys.stdout.flush()
+            return
+        self._close_file()
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        data = ''.join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        if self._raw is None:
+            sys.stdout.write(data)
+            return
+        if self._stream is None:
+            self._stream = self._new_stream()
+        self._stream.write(data.encode('utf-8'))
+        if self.rotate_bytes and self._raw.tell() >= self.rotate_bytes:
+            self._rotate()
+
+    def _sync(self):
+        self.flush()
+        os.fsync(self._raw.fileno())
+        self._last_sync = time.monotonic()
+
+    def _new_stream(self):
+        if self.compress == 'gzip':
+            return gzip.GzipFile(fileobj=self._raw, mode='ab', compresslevel=JSON_GZIP_LEVEL)
+        if self.compress == 'zstd':
+            return self._zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        return self._raw
+
+    def _end_stream(self):
+        # Completes the current gzip member/zstd frame; the next write starts another
+        if self._stream is not None and self._stream is not self._raw:
+            self._stream.close()
+        self._stream = None
+
+    def _open_file(self):
+        self._raw = open(self.file_path, 'ab')
+        self._opened = time.monotonic()
+
+    def _close_file(self):
+        self._end_stream()
+        self._raw.close()
+
+    def _rotate(self):
+        self._close_file()
+        os.replace(self.file_path, self._segment_path(self._next_segment))
+        self._next_segment += 1
+        self._open_file()
+
+    def _split_name(self) -> tuple[str, str]:
+        """Split file_path into (stem, extensions) around which segment numbers go."""
+        stem, compressed = self.file_path, ''
+        for suffix in ('.gz', '.zst'):
+            if stem.endswith(suffix):
+                stem, compressed = stem[:-len(suffix)], suffix
+                break
+        stem, ext = os.path.splitext(stem)
+        return stem, ext + compressed
+
+    def _segment_path(self, segment: int) -> str:
+        stem, ext = self._split_name()
+        return f"{stem}.{segment}{ext}"
+
+    def _find_next_segment(self) -> int:
+        stem, ext = self._split_name()
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        pattern = re.compile(re.escape(os.path.basename(stem)) + r'\.(\d+)' + re.escape(ext))
+        segments = [int(match.group(1)) for match in map(pattern.fullmatch, os.listdir(directory)) if match]
+        return max(segments, default=0) + 1
+
+class _FlushRequest:
+    """Queue marker: the worker sends what it holds, then sets done."""
+    def __init__(self):
+        self.done = threading.Event()
+
+_STOP = object()
+
+# How often a blocked emit() checks that the worker is still there
+EMIT_POLL_SECONDS = 1.0
 
 class WebSink(EventSink):
-    """POSTs each detection event as JSON to a remote dashboard endpoint."""
+    """
+    Sends detection events to a remote dashboard endpoint in the background.
+
+    emit() only puts the event on a bounded queue, blocking when it is full,
+    so a slow dashboard slows the scan down instead of growing memory. A
+    worker thread POSTs gzip-compressed JSON arrays of up to batch_size
+    events, or whatever arrived within batch_interval seconds, over one
+    pooled session. Failed batches are retried with exponential backoff;
+    once retries run out the endpoint is treated as down and batches are
+    appended to the journal file instead, which is replayed, oldest first,
+    when the endpoint answers again or the next WebSink starts.
+
+    An error in the worker costs the batch it was handling, which is
+    counted as dropped, not the worker; should the worker die anyway,
+    emit() journals events itself rather than waiting on a queue no one
+    empties.
+    """
+
+    rewindable = False
 
-    def __init__(self, url: str = "https://dlp.gtis.ai/dashboard/logs"):
+    def __init__(self, url: str = "https://dlp.gtis.ai/dashboard/logs", journal_path: str = None,
+                 batch_size: int = 100, batch_interval: float = 1.0, queue_size: int = 10000,
+                 max_retries: int = 4, backoff: float = 0.5, probe_interval: float = 30.0,
+                 timeout: float = 5.0, drain_timeout: float = 30.0):
         try:
             import requests as _requests
             self._requests = _requests
@@ -59,20 +276,226 @@ class WebSink(EventSink):
                 "Install it with: pip install requests"
             )
         self.url = url
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.probe_interval = probe_interval
+        self.timeout = timeout
+        self.drain_timeout = drain_timeout
+        self.sent = 0           # Events handed to emit()
+        self.delivered = 0      # Events the endpoint accepted
+        self.spilled = 0        # Events written to the journal
+        self.dropped = 0        # Events lost: rejected, or down without a journal
+        self._settled = 0       # Events of sent no longer queued: delivered, journaled or dropped
         self._session = self._requests.Session()
-        self._session.headers.update({"Content-Type": "application/json"})
+        self._session.headers.update({"Content-Type": "application/json", "Content-Encoding": "gzip"})
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._journal_lock = threading.Lock()
+        self._down_until = 0.0
+        self._closing = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="WebSink", daemon=True)
+        self._worker.start()
 
     def emit(self, event: DetectionEvent):
-        payload = asdict(event)
+        self.sent += 1
+        item = event.to_dict()
+        if not self._put(item):
+            logging.error("[WebSink] Worker stopped, journaling events directly")
+            self._spill_or_drop([item])
+            self._settled += 1
+
+    def _put(self, item) -> bool:
+        """Queue item, waiting while the queue is full. Returns False if the worker is gone."""
+        while self._worker.is_alive():
+            try:
+                self._queue.put(item, timeout=EMIT_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until everything emitted so far was sent or journaled, for at
+        most timeout seconds. Returns False if that didn't happen in time.
+        """
+        request = _FlushRequest()
+        if not self._put(request):
+            return self._settled == self.sent
+        if not request.done.wait(self.drain_timeout if timeout is None else timeout):
+            logging.warning("[WebSink] Timed out flushing events to the dashboard")
+            return False
+        return True
+
+    def close(self, timeout: float = None):
+        """
+        Drain the queue and stop the worker, waiting at most timeout seconds.
+        Events still queued after that go to the journal.
+        """
+        deadline = time.monotonic() + (self.drain_timeout if timeout is None else timeout)
+        if self._put(_STOP):
+            self._worker.join(max(0.0, deadline - time.monotonic()))
+        if self._worker.is_alive():
+            # Stop retrying; whatever the worker holds is journaled
+            self._closing.set()
+            self._worker.join(self.timeout)
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, dict):
+                leftover.append(item)
+        if leftover:
+            self._spill_or_drop(leftover)
+            self._settled += len(leftover)
+        self._session.close()
+
+    def position(self):
+        """Events emitted and since delivered, journaled or dropped; not those still queued."""
+        return self._settled
+
+    def _run(self):
+        batch = []
+        started = 0.0
+        stopping = False
+        if self._journal_size():
+            # Events an earlier run could not deliver go first
+            try:
+                self._replay_journal()
+            except Exception as exc:
+                logging.error(f"[WebSink] Failed to replay the journal: {exc}")
+        while not stopping:
+            timeout = None
+            if batch:
+                timeout = max(0.0, started + self.batch_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            flush_request = None
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, _FlushRequest):
+                flush_request = item
+            elif item is not None:
+                if not batch:
+                    started = time.monotonic()
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                try:
+                    self._deliver(batch)
+                except Exception as exc:
+                    logging.error(f"[WebSink] Dropping {len(batch)} events: {exc}")
+                    self.dropped += len(batch)
+                self._settled += len(batch)
+                batch = []
+            if flush_request is not None:
+                flush_request.done.set()
+
+    def _deliver(self, batch: list[dict]):
+        if time.monotonic() < self._down_until or self._closing.is_set():
+            self._spill(batch)
+            return
+        if self._journal_size() and not self._replay_journal():
+            self._spill(batch)
+            return
+        if self._post(batch):
+            return
+        logging.warning(f"[WebSink] Dashboard unreachable, journaling events for {self.probe_interval:.0f}s")
+        self._down_until = time.monotonic() + self.probe_interval
+        self._spill(batch)
+
+    def _post(self, batch: list[dict]) -> bool:
+        """
+        POST one batch, retrying with exponential backoff.
+        Returns False if the endpoint could not be reached.
+        """
+        body = gzip.compress(json.dumps(batch).encode('utf-8'), compresslevel=5)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                if self._closing.wait(self.backoff * 2 ** (attempt - 1)):
+                    return False
+            try:
+                response = self._session.post(self.url, data=body, timeout=self.timeout)
+            except Exception as exc:
+                logging.warning(f"[WebSink] Failed to send events to dashboard: {exc}")
+                continue
+            if response.ok:
+                self.delivered += len(batch)
+                return True
+            if response.status_code < 500 and response.status_code not in (408, 429):
+                # The dashboard refused the batch; sending it again won't help
+                logging.warning(f"[WebSink] Dashboard returned {response.status_code} for {len(batch)} events")
+                self.dropped += len(batch)
+                return True
+            logging.warning(f"[WebSink] Dashboard returned {response.status_code}, retrying")
+        return False
+
+    def _spill(self, batch: list[dict]):
+        if not batch:
+            return
+        if not self.journal_path:
+            logging.warning(f"[WebSink] Dropping {len(batch)} events, no journal configured")
+            self.dropped += len(batch)
+            return
+        with self._journal_lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(event) + '\n' for event in batch))
+        self.spilled += len(batch)
+
+    def _spill_or_drop(self, batch: list[dict]):
+        """_spill() outside the worker, where nothing would catch its errors."""
         try:
-            response = self._session.post(self.url, json=payload, timeout=5)
-            if not response.ok:
-                logging.warning(
-                    f"[WebSink] Dashboard returned {response.status_code} for event {event.event_id}"
-                )
-        except Exception as exc:
-            logging.warning(f"[WebSink] Failed to send event to dashboard: {exc}")
+            self._spill(batch)
+        except OSError as exc:
+            logging.error(f"[WebSink] Dropping {len(batch)} events: {exc}")
+            self.dropped += len(batch)
 
-    def flush(self):
-        pass
+    def _journal_size(self) -> int:
+        if not self.journal_path:
+            return 0
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    def _replay_journal(self) -> bool:
+        """
+        Send the journal in batches. Returns True once it is empty; on
+        failure, the part not yet delivered is kept and the endpoint is
+        marked down.
+        """
+        with self._journal_lock:
+            with open(self.journal_path, 'rb') as f:
+                while True:
+                    offset = f.tell()
+                    lines = list(itertools.islice(f, self.batch_size))
+                    if lines and not lines[-1].endswith(b'\n'):
+                        # Only the last line can be cut short, by a crash while it was spilled
+                        partial = lines.pop()
+                        logging.warning(f"[WebSink] Discarding {len(partial)} bytes of a partly written event "
+                                        f"at the end of {self.journal_path}")
+                    batch = [json.loads(line) for line in lines]
+                    if not batch:
+                        break
+                    if not self._post(batch):
+                        self._down_until = time.monotonic() + self.probe_interval
+                        self._keep_journal_from(f, offset)
+                        return False
+            os.remove(self.journal_path)
+        return True
 
+    def _keep_journal_from(self, f, offset: int):
+        f.seek(offset)
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(f, out)
+        os.replace(tmp_path, self.journal_path)
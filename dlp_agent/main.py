@@ -9,10 +9,58 @@ from dlp_agent.config import load_policy
 @click.option('--policy', help='Path to policy file', default='config/policy.json')
 @click.option('--debug', is_flag=True, help='Enable debug logging')
 @click.option('--json-out', help='Path to output JSON logs', required=False)
+@click.option('--json-rotate-mb', type=float, help='Rotate the JSON log once it reaches this size', required=False)
+@click.option('--json-rotate-hours', type=float, help='Rotate the JSON log after this many hours', required=False)
+@click.option('--json-compress', type=click.Choice(['gzip', 'zstd']), help='Compress the JSON log', required=False)
+@click.option('--json-fsync-interval', type=float, required=False,
+              help='Seconds between fsyncs of the JSON log (0 = every event; default: left to the OS)')
 @click.option('--web', is_flag=True, help='Send logs to the dashboard page in real time')
 @click.option('--web-url', default='https://dlp.gtis.ai/dashboard/logs', show_default=True,
               help='Dashboard endpoint URL to POST logs to (used with --web)')
-def main(scan_dir, policy, debug, json_out, web, web_url):
+@click.option('--web-journal', help='File to keep events in while the dashboard is unreachable (used with --web)',
+              required=False)
+@click.option('--workers', type=int, default=1, show_default=True,
+              help='Number of scanner processes (0 = one per CPU)')
+@click.option('--pdf-workers', type=int, required=False,
+              help='Processes to open PDFs and split the pages of large ones across, enforcing the PDF time '
+                   'budget (default: scan.pdf.workers in the policy, or 1; not used with --workers or --scheduled)')
+@click.option('--state-dir', help='Directory for the incremental scan index (enables skipping unchanged files)',
+              required=False)
+@click.option('--unchanged', type=click.Choice(['suppress', 'replay']), default='suppress', show_default=True,
+              help='What to do with stored findings of unchanged files (used with --state-dir)')
+@click.option('--checkpoint', 'checkpoint_path', help='File to periodically save scan progress to', required=False)
+@click.option('--checkpoint-interval', type=float, default=5.0, show_default=True,
+              help='Seconds between checkpoint saves (used with --checkpoint)')
+@click.option('--resume', is_flag=True, help='Continue the scan recorded in --checkpoint')
+@click.option('--watch', is_flag=True,
+              help='Keep running and rescan files as they change (Linux inotify; ignores --workers/--state-dir/--checkpoint)')
+@click.option('--debounce', type=float, default=1.0, show_default=True,
+              help='Seconds a file must stay quiet before it is rescanned (used with --watch)')
+@click.option('--stats', 'stats_path', required=False,
+              help='Write per-stage timings, latency histograms and the slowest files to this JSON file '
+                   '(with --workers, extraction and detection are only broken down for files scanned here)')
+@click.option('--stats-top', type=int, default=20, show_default=True,
+              help='Number of slowest files to list (used with --stats)')
+@click.option('--stats-profile', help='Run files matching this glob under cProfile (used with --stats)',
+              required=False)
+@click.option('--stats-profile-every', type=int, default=0, show_default=True,
+              help='Also run every Nth file under cProfile, 0 = none (used with --stats)')
+@click.option('--scheduled', is_flag=True,
+              help='Run as a low-priority background scan: most likely files first, within CPU, read-rate and '
+                   'load limits (scan.schedule in the policy; one process, no --checkpoint)')
+@click.option('--cpu-percent', type=float, required=False,
+              help='CPU share to keep to (used with --scheduled; default: scan.schedule.cpuPercent, or 25)')
+@click.option('--read-mbps', type=float, required=False,
+              help='MB/s of files to read at most (used with --scheduled; default: scan.schedule.readMBps, or 10)')
+@click.option('--max-load', type=float, required=False,
+              help='Pause while the load average is above this (used with --scheduled; '
+                   'default: scan.schedule.maxLoad, or the CPU count)')
+@click.option('--window-minutes', type=float, required=False,
+              help='Stop after this long, rerun with the same --state-dir to continue (used with --scheduled)')
+def main(scan_dir, policy, debug, json_out, json_rotate_mb, json_rotate_hours, json_compress,
+         json_fsync_interval, web, web_url, web_journal, workers, pdf_workers, state_dir, unchanged,
+         checkpoint_path, checkpoint_interval, resume, watch, debounce, stats_path, stats_top,
+         stats_profile, stats_profile_every, scheduled, cpu_percent, read_mbps, max_load, window_minutes):
     """DLP Agent - Detect Sensitive Data."""
     try:
         policy_config = load_policy(policy)
@@ -20,39 +68,227 @@ def main(scan_dir, policy, debug, json_out, web, web_url):
         if not scan_dir:
             click.echo("No scan directory provided. Use --scan-dir <path>")
             return
+        if resume and not checkpoint_path:
+            click.echo("--resume needs the --checkpoint file to resume from")
+            return
+        if scheduled and checkpoint_path:
+            click.echo("--scheduled scans out of walk order; use --state-dir to continue it in the next window")
+            return
 
         click.echo(f"Scanning directory: {scan_dir}")
         if debug:
             click.echo("Debug mode enabled")
 
-        from dlp_agent.scanner import FileWalker, StreamProcessor
+        from dlp_agent.scanner import FileWalker, ParallelScanner, Resolved, StreamProcessor
         from dlp_agent.events.sinks import CliSink, JsonSink, WebSink
         
         # Initialize sinks
         sinks = [CliSink()]
         if json_out:
-            sinks.append(JsonSink(json_out))
+            sinks.append(JsonSink(
+                json_out,
+                rotate_bytes=int(json_rotate_mb * 1024 * 1024) if json_rotate_mb else None,
+                rotate_seconds=json_rotate_hours * 3600 if json_rotate_hours else None,
+                compress=json_compress,
+                fsync_interval=json_fsync_interval
+            ))
         if web:
             click.echo(f"[WebSink] Sending logs to dashboard -> {web_url}")
-            sinks.append(WebSink(url=web_url))
+            sinks.append(WebSink(url=web_url, journal_path=web_journal))
+        
+        if scheduled:
+            # The schedule can't see the CPU time of a PDF pool's workers
+            pdf_workers = 0
         
         walker = FileWalker(policy_config, debug=debug)
-        processor = StreamProcessor(policy_config, sinks=sinks)
+        processor = StreamProcessor(policy_config, sinks=sinks, pdf_workers=pdf_workers)
+        
+        # Timing wrappers are only installed when asked for, so plain scans pay nothing
+        stats = None
+        if stats_path:
+            from dlp_agent.scanner.stats import ScanStats
+            stats = ScanStats(top_n=stats_top, profile_pattern=stats_profile, profile_every=stats_profile_every)
+            stats.instrument_walker(walker)
+            stats.instrument_processor(processor)
+            stats.instrument_sinks(sinks)
         
         scanned_files = 0
         total_findings = 0
+        root = os.path.abspath(scan_dir)
+        
+        def report_skipped():
+            if processor.skipped:
+                reasons = ", ".join(f"{count} {reason}" for reason, count in processor.skipped.most_common())
+                click.echo(f"Skipped {sum(processor.skipped.values())} files: {reasons}.", err=True)
+        
+        if watch:
+            from dlp_agent.scanner.watcher import Watcher
+            watcher = Watcher(walker, processor, debounce=debounce)
+            click.echo("Watching for changes, press Ctrl+C to stop.", err=True)
+            try:
+                watcher.run(root)
+            except KeyboardInterrupt:
+                pass
+            click.echo(f"\nWatch stopped. Scanned {watcher.scanned_files} files "
+                       f"({watcher.scanned_bytes / (1024 * 1024):.1f} MB, {watcher.full_rescans} full rescans, "
+                       f"{watcher.failed_files} cut short). "
+                       f"Found {watcher.total_findings} issues.", err=True)
+            report_skipped()
+            if stats is not None:
+                stats.write(stats_path)
+                click.echo(f"Stats written to {stats_path}", err=True)
+            processor.close()
+            for sink in sinks:
+                sink.flush()
+                if hasattr(sink, 'close'):
+                    sink.close()
+            return
+        
+        schedule = None
+        if scheduled:
+            from dlp_agent.scanner.schedule import ScanSchedule
+            schedule = ScanSchedule.from_policy(
+                policy_config, cpu_percent=cpu_percent, read_mbps=read_mbps, max_load=max_load,
+                window_seconds=window_minutes * 60 if window_minutes else None)
+            lowered = schedule.lower_priority()
+            click.echo(f"Scheduled scan ({', '.join(lowered) or 'priority unchanged'}).", err=True)
+            if schedule.window_seconds and not state_dir:
+                click.echo("Warning: without --state-dir, a scan cut short by its window starts over next time.",
+                           err=True)
+            # Budgets are kept between files of a single process
+            workers = 1
+        
+        index = None
+        if state_dir:
+            from dlp_agent.scanner.scan_index import INDEX_FILE, ScanIndex
+            index = ScanIndex(os.path.join(state_dir, INDEX_FILE), policy_config)
+        
+        # Findings of byte-identical files are reused instead of rescanned
+        cache = None
+        cache_entries = policy_config.get('scan', {}).get('contentCacheEntries', 4096)
+        if cache_entries:
+            from dlp_agent.scanner.content_cache import ContentCache
+            cache = ContentCache(max_entries=cache_entries)
         
-        for file_path in walker.walk(os.path.abspath(scan_dir)):
-            if debug:
-                click.echo(f"Scanning file: {file_path}")
+        checkpoint = None
+        start_after = None
+        if checkpoint_path:
+            from dlp_agent.scanner.checkpoint import Checkpoint
+            checkpoint = Checkpoint(checkpoint_path, root, policy_config, sinks, interval=checkpoint_interval)
+            if resume and checkpoint.resume():
+                start_after = checkpoint.frontier
+                scanned_files = checkpoint.scanned_files
+                total_findings = checkpoint.total_findings
+                click.echo(f"Resuming after {start_after} ({scanned_files} files already scanned).", err=True)
+        
+        def file_done(file_path):
+            if checkpoint is not None:
+                checkpoint.completed(file_path, scanned_files, total_findings)
+        
+        def files_to_scan():
+            """Paths to scan, and a Resolved in place of each file whose findings are already known."""
+            paths = walker.walk(root, start_after=start_after)
+            if schedule is not None:
+                paths = schedule.order(paths)
+            for file_path in paths:
+                if checkpoint is not None:
+                    if checkpoint.is_completed(file_path):
+                        continue
+                    checkpoint.started(file_path)
+                if index is not None:
+                    stored = index.lookup(file_path)
+                    if stored is not None:
+                        # Unchanged since the last indexed scan
+                        yield Resolved(file_path, stored, cached=False)
+                        continue
+                if cache is not None:
+                    cached = cache.lookup(file_path)
+                    if cached is not None:
+                        # Same content as a file scanned earlier in this run
+                        yield Resolved(file_path, cached, cached=True)
+                        continue
+                if schedule is not None and not schedule.before_file(file_path):
+                    return
+                if debug:
+                    click.echo(f"Scanning file: {file_path}")
+                yield file_path
+        
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        
+        if workers > 1:
+            if '.pdf' in walker.allowed_extensions and '.pdf' in processor.extractor_specs:
+                click.echo("With --workers, the PDF time budget is only checked between pages.", err=True)
+            # Workers scan, the processor here deduplicates and emits in walk order
+            results = ParallelScanner(processor, workers, stats=stats).scan(files_to_scan())
+        else:
+            results = (item if isinstance(item, Resolved) else (item, *processor.scan_file(item))
+                       for item in files_to_scan())
+        
+        for result in results:
+            # Known findings are emitted in walk order too, as a serial scan would
+            if isinstance(result, Resolved):
+                if result.cached:
+                    scanned_files += 1
+                    total_findings += processor.emit_findings(result.file_path, result.findings)
+                    if index is not None:
+                        index.record(result.file_path, result.findings)
+                elif unchanged == 'replay':
+                    total_findings += processor.emit_findings(result.file_path, result.findings)
+                file_done(result.file_path)
+                continue
+            file_path, findings, complete = result
             scanned_files += 1
-            
-            # Processor now handles emission to sinks
-            findings_count = processor.process_file(file_path)
-            total_findings += findings_count
-                    
+            total_findings += processor.emit_findings(file_path, findings)
+            # A file the scan failed on is scanned again, next run or next copy
+            if index is not None and complete:
+                index.record(file_path, findings)
+            if cache is not None and complete:
+                cache.store(file_path, findings)
+            file_done(file_path)
+        
+        if checkpoint is not None:
+            checkpoint.finish()
+        if cache is not None:
+            click.echo(f"Content cache: {cache.hits} hits, {cache.misses} misses, "
+                       f"{cache.hashed_files} files hashed, {cache.evictions} evictions.", err=True)
+        if index is not None:
+            pruned = index.prune(root)
+            index.close()
+            click.echo(f"Incremental: skipped {index.skipped_files} unchanged files "
+                       f"({index.skipped_bytes / (1024 * 1024):.1f} MB), "
+                       f"dropped {pruned} deleted files from the index.", err=True)
+        dedup = processor.dedup.metrics()
+        click.echo(f"Dedup ({dedup['scope']}, {dedup['filter']}): {dedup['duplicates']} of {dedup['lookups']} "
+                   f"hits suppressed ({dedup['hit_rate']:.1%}), {dedup['keys']} keys in "
+                   f"{dedup['memory_bytes'] / (1024 * 1024):.1f} MB, {dedup['evictions']} evicted, "
+                   f"est. false positives {dedup['false_positive_rate']:.2g}.", err=True)
+        report_skipped()
+        if schedule is not None:
+            usage = schedule.report()
+            cpu_budget = usage['cpu_budget_percent']
+            read_budget = usage['read_budget_mbps']
+            click.echo(f"Schedule: {usage['cpu_seconds']:.1f}s CPU ({usage['cpu_percent']:.0f}% of "
+                       f"{usage['elapsed_seconds']:.1f}s, budget {f'{cpu_budget:g}%' if cpu_budget else 'none'}), "
+                       f"{usage['read_mb']:.1f} MB read ({usage['read_mbps']:.1f} MB/s, "
+                       f"budget {f'{read_budget:g} MB/s' if read_budget else 'none'}), "
+                       f"throttled {usage['throttled_seconds']:.1f}s, paused {usage['paused_seconds']:.1f}s for load.",
+                       err=True)
+            if usage['window_closed']:
+                if state_dir:
+                    click.echo("Window over before the scan finished; run again with the same --state-dir to continue.",
+                               err=True)
+                else:
+                    click.echo("Window over before the scan finished; it was run without --state-dir, "
+                               "so the next run starts over.", err=True)
+
+        if stats is not None:
+            stats.write(stats_path)
+            click.echo(f"Stats written to {stats_path}", err=True)
+
         click.echo(f"\nScan Complete. Scanned {scanned_files} files. Found {total_findings} issues.", err=True)
         
+        processor.close()
         # Flush/Close sinks
         for sink in sinks:
             sink.flush()
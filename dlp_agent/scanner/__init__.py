@@ -1,2 +1,3 @@
 from .file_walker import FileWalker
 from .stream_processor import StreamProcessor
+from .parallel import ParallelScanner, Resolved
@@ -0,0 +1,145 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from dlp_agent.events.sinks import EventSink
+from dlp_agent.scanner.file_walker import walk_order_key
+from dlp_agent.scanner.scan_index import policy_fingerprint
+
+# 2: JsonSink positions became {"segment", "offset"}
+CHECKPOINT_VERSION = 2
+
+class Checkpoint:
+    """
+    Periodically persisted progress of a scan, for --resume.
+
+    Files complete out of walk order when some are answered from the
+    content cache or scanned in parallel, so progress is kept as a frontier
+    (every file up to it, in walk order, is done) plus the set of completed
+    files beyond it, which stays as small as the set of files in flight.
+    Along with them go the running totals and each sink's position().
+
+    On resume, rewindable sinks are rewound to the saved positions, so
+    events emitted after the last checkpoint are not written twice; the
+    files that produced them are simply scanned again. A sink that can't
+    rewind (WebSink) is flushed before every save, so no file is recorded
+    as completed while its events are still queued in memory, and forces
+    a checkpoint whenever it has handled more events, which narrows
+    re-sent events to the files in progress when the scan was killed.
+    """
+
+    def __init__(self, path: str, root: str, config: dict, sinks: list[EventSink], interval: float = 5.0):
+        self.path = path
+        self.root = root
+        self.policy = policy_fingerprint(config)
+        self.sinks = sinks
+        self.interval = interval
+        self.frontier = None
+        self.scanned_files = 0
+        self.total_findings = 0
+        self.saves = 0
+        self._resumed = set()         # Completed beyond the frontier by an earlier run
+        self._started = OrderedDict()  # path -> completed, in walk order
+        self._positions = [None] * len(sinks)
+        self._last_save = time.monotonic()
+
+    def resume(self) -> bool:
+        """
+        Load the checkpoint file, if there is one, and rewind the sinks to it.
+        Returns True if there was progress to resume from.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {self.path} has an unsupported format")
+        if state['root'] != self.root or state['policy'] != self.policy:
+            raise ValueError(f"Checkpoint {self.path} was written for a different scan root or policy")
+        sinks = state['sinks']
+        if [sink['type'] for sink in sinks] != [type(sink).__name__ for sink in self.sinks]:
+            raise ValueError(f"Checkpoint {self.path} was written with different outputs")
+
+        for sink, saved in zip(self.sinks, sinks):
+            sink.rewind(saved['position'])
+        self.frontier = state['frontier']
+        self.scanned_files = state['scanned_files']
+        self.total_findings = state['total_findings']
+        self._resumed = set(state['completed'])
+        self._positions = [saved['position'] for saved in sinks]
+        return True
+
+    def is_completed(self, file_path: str) -> bool:
+        """True for files an earlier run completed beyond the frontier."""
+        return file_path in self._resumed
+
+    def started(self, file_path: str):
+        """Register a file, in walk order, before it is scanned."""
+        self._started[file_path] = False
+
+    def completed(self, file_path: str, scanned_files: int, total_findings: int):
+        """
+        Mark a file done once its findings were emitted, passing the
+        running totals; saves the checkpoint when one is due.
+        """
+        self._started[file_path] = True
+        while self._started:
+            oldest, done = next(iter(self._started.items()))
+            if not done:
+                break
+            del self._started[oldest]
+            self.frontier = oldest
+        self.scanned_files = scanned_files
+        self.total_findings = total_findings
+
+        if time.monotonic() - self._last_save >= self.interval or self._unrewindable_sent():
+            self.save()
+
+    def _unrewindable_sent(self) -> bool:
+        return any(not sink.rewindable and sink.position() != saved
+                   for sink, saved in zip(self.sinks, self._positions))
+
+    def save(self):
+        """
+        Atomically replace the checkpoint file with the current progress,
+        unless a sink that can't rewind fails to flush; the next save
+        tries again.
+        """
+        for sink in self.sinks:
+            if not sink.rewindable and sink.flush() is False:
+                return
+        positions = [sink.position() for sink in self.sinks]
+        completed = [path for path, done in self._started.items() if done]
+        if self._resumed and self.frontier is not None:
+            frontier_key = walk_order_key(self.root, self.frontier)
+            self._resumed = {path for path in self._resumed if walk_order_key(self.root, path) > frontier_key}
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'root': self.root,
+            'policy': self.policy,
+            'frontier': self.frontier,
+            'completed': completed + sorted(self._resumed),
+            'scanned_files': self.scanned_files,
+            'total_findings': self.total_findings,
+            'sinks': [{'type': type(sink).__name__, 'position': position}
+                      for sink, position in zip(self.sinks, positions)],
+        }
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._positions = positions
+        self._last_save = time.monotonic()
+        self.saves += 1
+
+    def finish(self):
+        """The scan ran to completion; there is nothing left to resume."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,49 @@
+"""
+Single-file compressed logs, such as logrotate's app.log.3.gz, read as
+they are decompressed without writing anything to disk.
+
+A file qualifies by the extension it had before compression, with any
+rotation number or date suffix dropped. Multi-file archives (tarballs,
+and .zip/.rar/.7z, which have no entry here) are never opened, per the
+Phase 0 design.
+"""
+import importlib
+import os
+from typing import Optional
+
+# Compression extension -> module whose open() streams the decompressed bytes
+COMPRESSED_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'lzma'}
+
+# Inner extensions of multi-file archives
+ARCHIVE_EXTENSIONS = {'.tar'}
+
+def inner_extension(name: str) -> Optional[str]:
+    """
+    The lowercase extension a compressed file had before compression:
+    '.log' for app.log.gz, app.log.3.gz and app.log-20240101.gz. None if
+    name has no compression extension, '' if there was no inner one.
+    """
+    stem, ext = os.path.splitext(name)
+    if ext.lower() not in COMPRESSED_EXTENSIONS:
+        return None
+    stem, inner = os.path.splitext(stem)
+    while inner[1:].isdigit():
+        stem, inner = os.path.splitext(stem)
+    base, dash, date = inner.rpartition('-')
+    if dash and date.isdigit():
+        inner = base
+    return inner.lower()
+
+def is_compressed_log(name: str, allowed_extensions) -> bool:
+    """Whether name is a compressed single file whose inner extension is allowed."""
+    inner = inner_extension(name)
+    return inner is not None and inner in allowed_extensions and inner not in ARCHIVE_EXTENSIONS
+
+def open_decompressed(file_path: str):
+    """
+    A binary file object of the decompressed contents, read in blocks.
+    Raises ImportError if Python was built without the decoder (lzma is
+    sometimes left out).
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    return importlib.import_module(COMPRESSED_EXTENSIONS[ext]).open(file_path, 'rb')
@@ -0,0 +1,135 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional
+from dlp_agent.events.model import Finding
+
+# Files with more findings than this are scanned again rather than cached
+MAX_FINDINGS_PER_ENTRY = 1000
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Marks a size whose first file is still being scanned
+_PENDING = object()
+
+def content_digest(file_path: str) -> str:
+    """Fast 128-bit BLAKE2b digest of a file's bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ContentCache:
+    """
+    In-memory cache of findings for byte-identical files.
+
+    Entries are keyed on (extension, size, content digest), since the
+    extension picks the extractor. A file is only hashed when another file
+    with the same extension and size has been seen: the first file of each
+    size is kept unhashed and is hashed lazily on the first collision.
+    Findings are location-independent Finding records, re-emitted under the
+    new path on a hit. Both maps are LRU-bounded to max_entries.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.hashed_files = 0
+        self.evictions = 0
+        self._by_size = OrderedDict()    # (ext, size) -> _PENDING, None or unhashed (path, stat_key, findings)
+        self._by_digest = OrderedDict()  # (ext, size, digest) -> findings
+        self._pending = {}               # path -> (ext, size, digest or None, stat_key)
+
+    def lookup(self, file_path: str) -> Optional[list[Finding]]:
+        """
+        Returns cached findings for a byte-identical file seen earlier,
+        or None; on None, scan the file and pass the result to store().
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        ext = os.path.splitext(file_path)[1].lower()
+        size_key = (ext, st.st_size)
+        stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+        if size_key not in self._by_size:
+            # Size-first pre-check: no other file of this size, nothing to hash
+            self._by_size[size_key] = _PENDING
+            self._evict()
+            self._pending[file_path] = (ext, st.st_size, None, stat_key)
+            self.misses += 1
+            return None
+
+        self._by_size.move_to_end(size_key)
+        self._promote(size_key)
+        try:
+            digest = self._hash(file_path)
+        except OSError:
+            return None
+
+        key = (ext, st.st_size, digest)
+        findings = self._by_digest.get(key)
+        if findings is not None:
+            self._by_digest.move_to_end(key)
+            self.hits += 1
+            return findings
+
+        self._pending[file_path] = (ext, st.st_size, digest, stat_key)
+        self.misses += 1
+        return None
+
+    def store(self, file_path: str, findings: list[Finding]):
+        """Cache the findings of a file that missed in lookup()."""
+        pending = self._pending.pop(file_path, None)
+        if pending is None or len(findings) > MAX_FINDINGS_PER_ENTRY:
+            return
+        ext, size, digest, stat_key = pending
+        size_key = (ext, size)
+
+        if digest is None:
+            if self._by_size.get(size_key, _PENDING) is _PENDING:
+                self._by_size[size_key] = (file_path, stat_key, findings)
+                self._evict()
+                return
+            # Another file of this size got hashed meanwhile; hash this one too
+            try:
+                digest = self._hash(file_path)
+            except OSError:
+                return
+
+        self._by_digest[(ext, size, digest)] = findings
+        self._by_digest.move_to_end((ext, size, digest))
+        self._evict()
+
+    def _promote(self, size_key):
+        """Hash the unhashed first file of a size once another file collides with it."""
+        entry = self._by_size[size_key]
+        if entry is None or entry is _PENDING:
+            return
+        self._by_size[size_key] = None
+        path, stat_key, findings = entry
+        try:
+            st = os.stat(path)
+            # Only trust the stored findings if the file hasn't changed since
+            if (st.st_ino, st.st_size, st.st_mtime_ns) != stat_key:
+                return
+            digest = self._hash(path)
+        except OSError:
+            return
+        self._by_digest[(size_key[0], size_key[1], digest)] = findings
+        self._evict()
+
+    def _hash(self, file_path: str) -> str:
+        self.hashed_files += 1
+        return content_digest(file_path)
+
+    def _evict(self):
+        while len(self._by_digest) > self.max_entries:
+            self._by_digest.popitem(last=False)
+            self.evictions += 1
+        while len(self._by_size) > self.max_entries:
+            self._by_size.popitem(last=False)
+            self.evictions += 1
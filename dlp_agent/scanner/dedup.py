@@ -0,0 +1,159 @@
+import hashlib
+import math
+
+# Approximate memory of one 64-bit key in a Python set (int object plus table slot)
+BYTES_PER_KEY = 72
+
+SCOPES = ('location', 'file', 'secret')
+
+class DedupStore:
+    """
+    Remembers which findings were already reported, within a memory ceiling.
+
+    scope decides what counts as the same finding:
+      - "location": same secret, rule, file and line (the default)
+      - "file": same secret, rule and line within the file being emitted;
+        everything is forgotten when the next file starts
+      - "secret": same secret and rule anywhere, so each secret is
+        reported once per scan
+
+    Keys are 64-bit BLAKE2b digests of those fields; two different findings
+    share a key with probability ~n^2 / 2^65 (about 3e-8 at a million keys).
+
+    The default "exact" filter keeps keys in two generations of sets. When
+    the newer one fills half of max_memory_mb, the older one is dropped, so
+    a duplicate of something forgotten is reported again rather than a new
+    finding ever being lost.
+
+    The "bloom" filter instead spends max_memory_mb on a Bloom filter sized
+    for bloom_capacity keys. It never forgets, but it can suppress a new
+    finding: the false-positive rate with n keys is (1 - e^(-kn/m))^k,
+    about bloom_error_rate at bloom_capacity keys and more beyond. The
+    current estimate is in metrics().
+    """
+
+    def __init__(self, scope: str = 'location', max_memory_mb: float = 64, filter: str = 'exact',
+                 bloom_capacity: int = 10_000_000, bloom_error_rate: float = 1e-4):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown dedup scope: {scope}")
+        if filter not in ('exact', 'bloom'):
+            raise ValueError(f"Unknown dedup filter: {filter}")
+        self.scope = scope
+        self.filter = filter
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.lookups = 0
+        self.duplicates = 0
+        self.evictions = 0
+        self._file = None
+
+        if filter == 'exact':
+            self._generation_size = max(1, self.max_bytes // (2 * BYTES_PER_KEY))
+            self._current = set()
+            self._previous = set()
+        else:
+            # Optimal size for the capacity and error rate, capped by the ceiling
+            bits = math.ceil(-bloom_capacity * math.log(bloom_error_rate) / math.log(2) ** 2)
+            self._bits = max(64, min(bits, self.max_bytes * 8))
+            self._hashes = max(1, round(self._bits / bloom_capacity * math.log(2)))
+            self._bloom = bytearray((self._bits + 7) // 8)
+            self._added = 0
+            # With the "file" scope, bytes set since the file started, so only they are cleared
+            self._dirty = [] if scope == 'file' else None
+
+    @classmethod
+    def from_policy(cls, config: dict) -> 'DedupStore':
+        dedup = config.get('scan', {}).get('dedup', {})
+        return cls(
+            scope=dedup.get('scope', 'location'),
+            max_memory_mb=dedup.get('maxMemoryMB', 64),
+            filter=dedup.get('filter', 'exact'),
+            bloom_capacity=dedup.get('bloomCapacity', 10_000_000),
+            bloom_error_rate=dedup.get('bloomErrorRate', 1e-4),
+        )
+
+    def seen(self, digest: bytes, rule: str, file_path: str, line) -> bool:
+        """
+        Record a finding. Returns True if it was already recorded, i.e.
+        it is a duplicate and should not be reported.
+        """
+        self.lookups += 1
+        key = hashlib.blake2b(digest, digest_size=16)
+        key.update(rule.encode('utf-8'))
+        if self.scope == 'file':
+            if file_path != self._file:
+                self._start_file(file_path)
+            key.update(f"\0{line}".encode('utf-8'))
+        elif self.scope == 'location':
+            key.update(f"\0{file_path}\0{line}".encode('utf-8', 'surrogateescape'))
+        key = key.digest()
+
+        if self.filter == 'exact':
+            duplicate = self._seen_exact(int.from_bytes(key[:8], 'little'))
+        else:
+            duplicate = self._seen_bloom(int.from_bytes(key[:8], 'little'), int.from_bytes(key[8:], 'little'))
+        if duplicate:
+            self.duplicates += 1
+        return duplicate
+
+    def _start_file(self, file_path: str):
+        self._file = file_path
+        if self.filter == 'exact':
+            self._current.clear()
+            self._previous.clear()
+        else:
+            bloom = self._bloom
+            if len(self._dirty) < len(bloom) // 64:
+                for byte in self._dirty:
+                    bloom[byte] = 0
+            else:
+                self._bloom = bytearray(len(bloom))
+            self._dirty.clear()
+            self._added = 0
+
+    def _seen_exact(self, key: int) -> bool:
+        if key in self._current or key in self._previous:
+            return True
+        if len(self._current) >= self._generation_size:
+            self.evictions += len(self._previous)
+            self._previous = self._current
+            self._current = set()
+        self._current.add(key)
+        return False
+
+    def _seen_bloom(self, h1: int, h2: int) -> bool:
+        bloom = self._bloom
+        bits = self._bits
+        h2 |= 1
+        present = True
+        for i in range(self._hashes):
+            bit = (h1 + i * h2) % bits
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not bloom[byte] & mask:
+                present = False
+                if self._dirty is not None and not bloom[byte]:
+                    self._dirty.append(byte)
+                bloom[byte] |= mask
+        if not present:
+            self._added += 1
+        return present
+
+    def metrics(self) -> dict:
+        if self.filter == 'exact':
+            keys = len(self._current) + len(self._previous)
+            memory = keys * BYTES_PER_KEY
+            false_positive_rate = 0.0
+        else:
+            keys = self._added
+            memory = len(self._bloom)
+            false_positive_rate = (1 - math.exp(-self._hashes * keys / self._bits)) ** self._hashes
+        return {
+            "scope": self.scope,
+            "filter": self.filter,
+            "lookups": self.lookups,
+            "duplicates": self.duplicates,
+            "hit_rate": self.duplicates / self.lookups if self.lookups else 0.0,
+            "keys": keys,
+            "memory_bytes": memory,
+            "evictions": self.evictions,
+            "false_positive_rate": false_positive_rate,
+        }
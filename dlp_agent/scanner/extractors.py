@@ -0,0 +1,64 @@
+import importlib
+import logging
+from typing import Iterable, NamedTuple
+
+class ExtractorSpec(NamedTuple):
+    """
+    How files with an extension are read: target names a factory as
+    "package.module:callable", imported only when the first such file is
+    scanned. The factory is called with the policy and returns the
+    extractor, a callable taking a file path and yielding (locator, text)
+    pairs; a PartialScan may stand in for the text to report what wasn't
+    read. Extractors with a close() method have it called when the scan
+    ends.
+    """
+    target: str
+    # Yields many short rows, e.g. spreadsheet rows, which are scanned in batches
+    rows: bool = False
+
+    def load(self, config: dict):
+        """The extractor for this policy; raises ImportError if the factory or a library it needs is missing."""
+        module_name, _, name = self.target.partition(':')
+        factory = importlib.import_module(module_name)
+        for attr in name.split('.'):
+            try:
+                factory = getattr(factory, attr)
+            except AttributeError:
+                raise ImportError(f"cannot import name {name!r} from {module_name!r}") from None
+        return factory(config)
+
+# Extension (lowercase, with the dot) -> extractor; anything else is scanned as plain text
+_REGISTRY: dict[str, ExtractorSpec] = {}
+
+def register_extractor(extensions: Iterable[str], target: str, rows: bool = False):
+    """
+    Read files with these extensions with the extractor factory target
+    ("package.module:callable"), replacing any extractor they had. Policies
+    can do the same through scan.extractors, an {extension: target} map,
+    which also reaches the --workers processes.
+    """
+    for ext in extensions:
+        _REGISTRY[ext.lower()] = ExtractorSpec(target, rows)
+
+def extractor_specs(config: dict) -> dict[str, ExtractorSpec]:
+    """The registered extractors with the policy's scan.extractors applied; null there means plain text."""
+    specs = dict(_REGISTRY)
+    for ext, target in config.get('scan', {}).get('extractors', {}).items():
+        if target:
+            specs[ext.lower()] = ExtractorSpec(target)
+        else:
+            specs.pop(ext.lower(), None)
+    return specs
+
+def legacy_doc_extractor(config: dict):
+    """Binary .doc files aren't parsed; each one is logged instead."""
+    def extract(file_path: str):
+        logging.warning(f"File {file_path} is in .doc format. Only .docx is currently supported for Word documents.")
+        return iter(())
+    return extract
+
+register_extractor(['.docx'], 'dlp_agent.scanner.ooxml:docx_extractor')
+register_extractor(['.pptx'], 'dlp_agent.scanner.ooxml:pptx_extractor')
+register_extractor(['.xlsx'], 'dlp_agent.scanner.ooxml:xlsx_extractor', rows=True)
+register_extractor(['.pdf'], 'dlp_agent.scanner.pdf:PdfExtractor.from_policy')
+register_extractor(['.doc'], 'dlp_agent.scanner.extractors:legacy_doc_extractor')
@@ -1,4 +1,68 @@
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from dlp_agent.scanner.compressed import is_compressed_log
+from dlp_agent.scanner.extractors import extractor_specs
+from dlp_agent.scanner.large_files import LargeFilePolicy
+
+# Directory listings a threaded walk may have in flight, per thread
+PREFETCH_PER_THREAD = 4
+
+def walk_order_key(root_dir: str, path: str) -> tuple:
+    """
+    Sort key that orders paths under root_dir the way walk() yields them:
+    by name, with a directory's files before its subdirectories.
+    """
+    parts = os.path.relpath(path, root_dir).split(os.sep)
+    return tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+
+def _extension(name: str) -> str:
+    """os.path.splitext(name)[1] for a bare file name, without the generic path handling."""
+    dot = name.rfind('.')
+    # Leading dots don't start an extension
+    if dot > 0 and (name[0] != '.' or name[:dot].lstrip('.')):
+        return name[dot:]
+    return ''
+
+class ExclusionMatcher:
+    """
+    Compiled excludedPaths. A path is excluded if any entry is a substring
+    of it, after turning backslashes into slashes.
+
+    A walk only ever asks about a directory whose parent was not excluded,
+    so excludes_child() looks at the tail of the path that could hold a
+    new match. Entries of the usual "/name" form can only match at the
+    start of the new component, which is a single startswith() call; the
+    rest are joined into one regex.
+    """
+
+    def __init__(self, excluded_paths):
+        excluded_paths = sorted(set(excluded_paths))
+        components = [p for p in excluded_paths if p.startswith('/') and '/' not in p[1:]]
+        others = [p for p in excluded_paths if p not in components]
+        self._prefixes = tuple(p[1:] for p in components)
+        self._others = re.compile('|'.join(map(re.escape, others))) if others else None
+        self._all = re.compile('|'.join(map(re.escape, excluded_paths))) if excluded_paths else None
+        self._window = max(map(len, excluded_paths), default=0)
+
+    def matches(self, path: str) -> bool:
+        """Check a whole path."""
+        return self._all is not None and self._all.search(path.replace('\\', '/')) is not None
+
+    def excludes_child(self, path: str, name: str) -> bool:
+        """Check path, the directory name inside a parent that isn't excluded."""
+        if '\\' in name:
+            # Backslashes become separators, so anything can match inside the name
+            pattern = self._all
+        elif name.startswith(self._prefixes):
+            return True
+        else:
+            pattern = self._others
+        if pattern is None:
+            return False
+        tail = path[-(len(name) + self._window):]
+        return pattern.search(tail.replace('\\', '/')) is not None
 
 class FileWalker:
     def __init__(self, config: dict, debug: bool = False):
@@ -7,38 +71,127 @@ class FileWalker:
         self.allowed_extensions = set(config.get('scan', {}).get('allowedExtensions', []))
         self.excluded_paths = set(config.get('scan', {}).get('excludedPaths', []))
         self.max_file_size = config.get('scan', {}).get('maxFileSizeMB', 10) * 1024 * 1024
+        # Threads listing directories ahead of the walk, for high-latency filesystems
+        self.threads = config.get('scan', {}).get('walkerThreads', 0)
+        # Also yield compressed rotated logs (app.log.1.gz) of an allowed type. Their
+        # size limit applies once decompressed, so it is left to the processor
+        self.compressed_logs = config.get('scan', {}).get('compressedLogs', False)
+        # Text files over max_file_size are still yielded when large files are scanned in windows
+        self.large_files = LargeFilePolicy.from_policy(config).enabled
+        self._document_extensions = set(extractor_specs(config))
+        self._exclusions = ExclusionMatcher(self.excluded_paths)
+
+    def walk(self, root_dir: str, start_after: str = None):
+        """
+        Generator that yields valid file paths to scan, in walk_order_key()
+        order so that a walk can be resumed.
+        If start_after is given, only paths that follow it are yielded.
+
+        Symlinks to directories are not followed, and unreadable
+        directories are skipped, as with os.walk.
+        """
+        resume_key = walk_order_key(root_dir, start_after) if start_after else None
+        # Every subdirectory of an excluded root is excluded
+        root_excluded = self._exclusions.matches(root_dir)
+        top = (root_dir, (), resume_key, root_excluded)
 
-    def walk(self, root_dir: str):
+        if self.threads > 1:
+            yield from self._walk_threaded(top)
+            return
+
+        stack = [top]
+        while stack:
+            files, subdirs = self._list_dir(*stack.pop())
+            yield from files
+            stack.extend(reversed(subdirs))
+
+    def _walk_threaded(self, top):
+        """Same walk, with upcoming directories listed by a thread pool."""
+        window = self.threads * PREFETCH_PER_THREAD
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            stack = [[top, None]]
+            while stack:
+                # The top of the stack is visited next: keep it listing
+                for entry in stack[-window:]:
+                    if entry[1] is None:
+                        entry[1] = pool.submit(self._list_dir, *entry[0])
+                _, future = stack.pop()
+                files, subdirs = future.result()
+                yield from files
+                stack.extend([subdir, None] for subdir in reversed(subdirs))
+
+    def _list_dir(self, path: str, key: tuple, resume_key, excluded: bool):
         """
-        Generator that yields valid file paths to scan.
+        List one directory.
+        Returns (file paths to yield, subdirectory walk entries), both in walk order.
         """
-        for root, dirs, files in os.walk(root_dir):
-            # Modify dirs in-place to skip excluded directories
-            # We must use a copy of dirs to iterate safely while modifying
-            dirs[:] = [d for d in dirs if not self._is_excluded(os.path.join(root, d))]
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                if self._should_scan_file(file_path):
-                    yield file_path
-
-    def _is_excluded(self, path: str) -> bool:
-        # Normalize path for comparison
-        path = path.replace('\\', '/')
-        for excluded in self.excluded_paths:
-            if excluded in path:
-                return True
-        return False
-
-    def _should_scan_file(self, file_path: str) -> bool:
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=attrgetter('name'))
+        except OSError:
+            return [], []
+
+        files = []
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if excluded or self._exclusions.excludes_child(entry.path, entry.name):
+                    continue
+                try:
+                    if entry.is_symlink():
+                        continue
+                except OSError:
+                    continue
+                subdir_key = key + ((1, entry.name),)
+                subdir_resume = resume_key
+                if resume_key is not None:
+                    cut = resume_key[:len(subdir_key)]
+                    if subdir_key < cut:
+                        # Finished before the walk was interrupted
+                        continue
+                    if subdir_key > cut:
+                        subdir_resume = None
+                subdirs.append((entry.path, subdir_key, subdir_resume, False))
+                continue
+
+            if resume_key is not None and key + ((0, entry.name),) <= resume_key:
+                continue
+            # Extension first: most files never need a stat call
+            if _extension(entry.name).lower() not in self.allowed_extensions:
+                if self.compressed_logs and is_compressed_log(entry.name, self.allowed_extensions):
+                    files.append(entry.path)
+                continue
+            try:
+                if entry.stat().st_size > self.max_file_size and not self._large_text_ok(entry.name):
+                    continue
+            except OSError:
+                continue
+            files.append(entry.path)
+
+        return files, subdirs
+
+    def _large_text_ok(self, name: str) -> bool:
+        return self.large_files and _extension(os.path.basename(name)).lower() not in self._document_extensions
+
+    def should_descend(self, dir_path: str) -> bool:
+        """Whether a walk goes into dir_path: it isn't excluded, nor a symlink."""
+        return not self._exclusions.matches(dir_path) and not os.path.islink(dir_path)
+
+    def should_scan_file(self, file_path: str) -> bool:
+        """Whether a walk would yield file_path, judged by its extension and size."""
         # Check extension
         _, ext = os.path.splitext(file_path)
         if ext.lower() not in self.allowed_extensions:
-            return False
+            return self.compressed_logs and is_compressed_log(os.path.basename(file_path), self.allowed_extensions)
 
         # Check file size
         try:
-            if os.path.getsize(file_path) > self.max_file_size:
+            if os.path.getsize(file_path) > self.max_file_size and not self._large_text_ok(file_path):
                 return False
         except OSError:
             return False
@@ -0,0 +1,61 @@
+"""
+Text files over maxFileSizeMB, which the walker otherwise leaves out.
+
+With scan.largeFiles.enabled they are scanned like any text file, a
+window at a time, so memory doesn't grow with the file. budgetMB caps the
+bytes read per file: a larger file is sampled, with its first headMB and
+last tailMB read whole and the rest of the budget spread over the middle
+as evenly spaced windows of sampleWindowMB. Samples start and end on line
+boundaries, and findings in them are located as "b{offset}:l{line}", the
+line counted from the sample's start offset, since the lines before it
+were never read.
+"""
+from typing import NamedTuple
+
+MB = 1024 * 1024
+
+# Width of each sample between the head and the tail
+SAMPLE_WINDOW_MB = 1
+
+class LargeFilePolicy(NamedTuple):
+    enabled: bool = False
+    budget: int = 0     # Bytes read per file at most, 0 for no limit
+    head: int = 0
+    tail: int = 0
+    window: int = SAMPLE_WINDOW_MB * MB
+
+    @classmethod
+    def from_policy(cls, config: dict) -> 'LargeFilePolicy':
+        """Settings from the policy's scan.largeFiles section; head and tail default to a quarter of the budget each."""
+        large = config.get('scan', {}).get('largeFiles', {})
+        budget = int(large.get('budgetMB', 0) * MB)
+        return cls(enabled=large.get('enabled', False),
+                   budget=budget,
+                   head=int(large['headMB'] * MB) if 'headMB' in large else budget // 4,
+                   tail=int(large['tailMB'] * MB) if 'tailMB' in large else budget // 4,
+                   window=max(int(large.get('sampleWindowMB', SAMPLE_WINDOW_MB) * MB), 1))
+
+    def samples(self, size: int) -> bool:
+        """Whether a text file of size bytes is sampled rather than read in full."""
+        return self.enabled and self.budget > 0 and size > self.budget
+
+    def regions(self, size: int) -> list[tuple[int, int]]:
+        """
+        The [start, end) byte ranges to read from a file of size bytes, in
+        order and without overlap: the whole file, or the head, the middle
+        windows and the tail.
+        """
+        if not self.samples(size):
+            return [(0, size)]
+        head = min(self.head, self.budget)
+        tail = min(self.tail, self.budget - head)
+        regions = [(0, head)] if head else []
+        middle_start, middle_end = head, size - tail
+        count = min((self.budget - head - tail) // self.window, (middle_end - middle_start) // self.window)
+        if count:
+            stride = (middle_end - middle_start) // count
+            regions += [(start, start + self.window)
+                        for start in range(middle_start, middle_start + count * stride, stride)]
+        if tail:
+            regions.append((size - tail, size))
+        return regions
@@ -0,0 +1,540 @@
+"""
+Streaming text extraction for DOCX, PPTX and XLSX packages.
+
+Parts are read straight from the zip and fed to an expat parser a block
+at a time; no element tree is built, so memory stays bounded by the
+largest single paragraph or shape rather than the whole document.
+
+Text matches what python-docx's Paragraph.text and python-pptx's
+Shape.text return, but more of the package is covered: DOCX tables,
+content controls, text boxes, tracked insertions, headers, footers,
+footnotes, endnotes and comments, and PPTX tables, group shapes and
+speaker notes. mc:Fallback content is skipped since it duplicates the
+mc:Choice it stands in for.
+
+XLSX rows are joined like openpyxl values were, but cells that can't
+hold a candidate are left out and long numbers are written out in full.
+"""
+import functools
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from decimal import Decimal, InvalidOperation
+from typing import Iterator, Union
+from xml.parsers import expat
+from dlp_agent.detectors.custom import has_custom_rules
+
+# Element names as expat reports them with namespace_separator=' '
+_W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main '
+_A = 'http://schemas.openxmlformats.org/drawingml/2006/main '
+_P = 'http://schemas.openxmlformats.org/presentationml/2006/main '
+_S = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main '
+_MC_FALLBACK = 'http://schemas.openxmlformats.org/markup-compatibility/2006 Fallback'
+_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+_REL_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+_SLIDE_ID = '{http://schemas.openxmlformats.org/presentationml/2006/main}sldId'
+_SHEET = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet'
+
+# Part bytes fed to the parser at a time
+READ_SIZE = 64 * 1024
+
+# DOCX parts scanned after the main document, by relationship type
+_WORD_PARTS = ('header', 'footer', 'footnotes', 'endnotes', 'comments')
+# Elements whose direct w:p children are a part's numbered paragraphs
+_WORD_CONTAINERS = frozenset(_W + name for name in ('body', 'hdr', 'ftr', 'footnote', 'endnote', 'comment'))
+
+# Numeric XLSX cells with fewer digits can't hold a candidate of the
+# built-in rules; the shortest all-digit one is a 12 digit Aadhaar
+XLSX_MIN_NUMBER_DIGITS = 12
+# Longer numbers are left as written rather than expanded
+_MAX_EXPANDED_DIGITS = 30
+
+Locator = Union[int, str]
+
+def _relationships(zf: zipfile.ZipFile, part: str) -> list[tuple[str, str, str]]:
+    """(id, type, part name) of each internal relationship of part ('' for the package)."""
+    directory, name = posixpath.split(part)
+    try:
+        data = zf.read(posixpath.join(directory, '_rels', name + '.rels'))
+    except KeyError:
+        return []
+    relationships = []
+    for rel in ET.fromstring(data).iter(_REL):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target', '')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        relationships.append((rel.get('Id'), rel.get('Type', '').rsplit('/', 1)[-1], target))
+    return relationships
+
+def _main_part(zf: zipfile.ZipFile, default: str) -> str:
+    for _, rel_type, target in _relationships(zf, ''):
+        if rel_type == 'officeDocument':
+            return target
+    return default
+
+class _PartParser:
+    """
+    Base for the part parsers: subclasses map element names to start and
+    end methods and append what they extract to self.found as they go.
+    """
+
+    def __init__(self):
+        self.found = []
+        self.pieces = None    # Where character data goes while a text element is open
+        self.skipping = 0
+
+    def start(self, name: str, attrs: dict):
+        if self.skipping or name == _MC_FALLBACK:
+            self.skipping += 1
+            return
+        handler = self.starts.get(name)
+        if handler is not None:
+            handler(attrs)
+
+    def end(self, name: str):
+        if self.skipping:
+            self.skipping -= 1
+            return
+        handler = self.ends.get(name)
+        if handler is not None:
+            handler()
+
+    def data(self, text: str):
+        if self.pieces is not None:
+            self.pieces.append(text)
+
+    def parse(self, source) -> Iterator:
+        parser = expat.ParserCreate(namespace_separator=' ')
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+        while True:
+            block = source.read(READ_SIZE)
+            parser.Parse(block, not block)
+            if self.found:
+                yield from self.found
+                self.found = []
+            if not block:
+                return
+
+class _WordPart(_PartParser):
+    """
+    Paragraphs of a WordprocessingML part.
+
+    Paragraphs that are direct children of the body (or of a header,
+    footer, note or comment) are numbered from 1 in document order; in the
+    main document (no prefix) the locator is that number, so they keep the
+    numbers python-docx's document.paragraphs gives them. Other paragraphs
+    outside tables, such as those in block content controls, are numbered
+    after the last one before them ("p3.1" follows paragraph 3). Table
+    paragraphs are located by their outermost table, row and cell
+    ("t2:r1:c3"), and text box paragraphs share the locator of the
+    paragraph holding them.
+    """
+
+    def __init__(self, prefix: str = None):
+        super().__init__()
+        self.prefix = prefix
+        self.paragraphs = []   # [locator, pieces, open runs] of open paragraphs, innermost last
+        self.tables = []       # [row, cell] of open tables, outermost first
+        self.count = 0
+        self.nested_count = 0  # Paragraphs since the last counted one that aren't direct children
+        self.table_count = 0
+        self.depth = 0
+        self.container_depth = None
+        self.starts = {
+            _W + 'p': self.start_paragraph, _W + 'r': self.start_run, _W + 't': self.start_text,
+            _W + 'tab': self.tab, _W + 'ptab': self.tab, _W + 'cr': self.line_break,
+            _W + 'br': self.line_break, _W + 'noBreakHyphen': self.hyphen,
+            _W + 'tbl': self.start_table, _W + 'tr': self.start_row, _W + 'tc': self.start_cell,
+        }
+        self.ends = {_W + 'p': self.end_paragraph, _W + 'r': self.end_run, _W + 't': self.end_text,
+                     _W + 'tbl': self.end_table}
+
+    def start(self, name: str, attrs: dict):
+        self.depth += 1
+        if name in _WORD_CONTAINERS and not self.skipping:
+            self.container_depth = self.depth
+        super().start(name, attrs)
+
+    def end(self, name: str):
+        super().end(name)
+        self.depth -= 1
+
+    def locate(self, label):
+        if self.prefix is None:
+            return label
+        return f"{self.prefix}:{label}" if isinstance(label, str) else f"{self.prefix}:p{label}"
+
+    def start_paragraph(self, attrs):
+        if self.tables:
+            locator = self.locate(f"t{self.table_count}:r{self.tables[0][0]}:c{self.tables[0][1]}")
+        elif self.paragraphs:
+            locator = self.paragraphs[-1][0]
+        elif self.container_depth is None or self.depth == self.container_depth + 1:
+            self.count += 1
+            self.nested_count = 0
+            locator = self.locate(self.count)
+        else:
+            self.nested_count += 1
+            locator = self.locate(f"p{self.count}.{self.nested_count}")
+        self.paragraphs.append([locator, [], 0])
+
+    def end_paragraph(self):
+        locator, pieces, _ = self.paragraphs.pop()
+        if pieces:
+            self.found.append((locator, ''.join(pieces)))
+
+    def start_run(self, attrs):
+        if self.paragraphs:
+            self.paragraphs[-1][2] += 1
+
+    def end_run(self):
+        if self.paragraphs:
+            self.paragraphs[-1][2] -= 1
+
+    def _run_pieces(self):
+        # Text counts only in runs, not in paragraph properties such as tab stops
+        if self.paragraphs and self.paragraphs[-1][2]:
+            return self.paragraphs[-1][1]
+        return None
+
+    def start_text(self, attrs):
+        self.pieces = self._run_pieces()
+
+    def end_text(self):
+        self.pieces = None
+
+    def tab(self, attrs):
+        pieces = self._run_pieces()
+        if pieces is not None:
+            pieces.append('\t')
+
+    def line_break(self, attrs):
+        pieces = self._run_pieces()
+        # Page and column breaks have no text
+        if pieces is not None and attrs.get(_W + 'type', 'textWrapping') == 'textWrapping':
+            pieces.append('\n')
+
+    def hyphen(self, attrs):
+        pieces = self._run_pieces()
+        if pieces is not None:
+            pieces.append('-')
+
+    def start_table(self, attrs):
+        if not self.tables:
+            self.table_count += 1
+        self.tables.append([0, 0])
+
+    def end_table(self):
+        self.tables.pop()
+
+    def start_row(self, attrs):
+        if self.tables:
+            self.tables[-1][0] += 1
+            self.tables[-1][1] = 0
+
+    def start_cell(self, attrs):
+        if self.tables:
+            self.tables[-1][1] += 1
+
+class _SlidePart(_PartParser):
+    """
+    Shapes and table cells of a slide part holding text.
+
+    Shapes are numbered in slide order like python-pptx's slide.shapes
+    ("s2:sh3"); group members extend their group's number ("s2:sh3.1") and
+    table cells add their row and column ("s2:sh4:r1:c2"). Text is the
+    shape's paragraphs joined by "\\n", with "\\v" for line breaks.
+    """
+
+    def __init__(self, prefix: str):
+        super().__init__()
+        self.prefix = prefix
+        self.shapes = []      # [locator, members so far] of open shapes, innermost last
+        self.frames = []      # Paragraph texts of open text bodies
+        self.paragraph = []   # Text of the open paragraph
+        self.tables = []      # [row, cell] of open tables
+        self.count = 0
+        self.starts = {
+            _A + 'p': self.start_paragraph, _A + 't': self.start_text, _A + 'br': self.line_break,
+            _P + 'txBody': self.start_frame, _A + 'txBody': self.start_frame,
+            _A + 'tbl': self.start_table, _A + 'tr': self.start_row, _A + 'tc': self.start_cell,
+        }
+        self.ends = {
+            _A + 'p': self.end_paragraph, _A + 't': self.end_text,
+            _P + 'txBody': self.end_frame, _A + 'txBody': self.end_frame, _A + 'tbl': self.end_table,
+        }
+        # Elements python-pptx counts as shapes; they only occur in shape trees
+        for shape in ('sp', 'grpSp', 'graphicFrame', 'cxnSp', 'pic', 'contentPart'):
+            self.starts[_P + shape] = self.start_shape
+            self.ends[_P + shape] = self.end_shape
+
+    def start_shape(self, attrs):
+        if self.shapes:
+            group = self.shapes[-1]
+            group[1] += 1
+            self.shapes.append([f"{group[0]}.{group[1]}", 0])
+        else:
+            self.count += 1
+            self.shapes.append([f"{self.prefix}:sh{self.count}", 0])
+
+    def end_shape(self):
+        self.shapes.pop()
+
+    def start_frame(self, attrs):
+        self.frames.append([])
+
+    def end_frame(self):
+        text = '\n'.join(self.frames.pop())
+        if text.strip() and self.shapes:
+            locator = self.shapes[-1][0]
+            if self.tables:
+                locator = f"{locator}:r{self.tables[-1][0]}:c{self.tables[-1][1]}"
+            self.found.append((locator, text))
+
+    def start_paragraph(self, attrs):
+        self.paragraph = []
+
+    def end_paragraph(self):
+        if self.frames:
+            self.frames[-1].append(''.join(self.paragraph))
+
+    def start_text(self, attrs):
+        self.pieces = self.paragraph
+
+    def end_text(self):
+        self.pieces = None
+
+    def line_break(self, attrs):
+        self.paragraph.append('\v')
+
+    def start_table(self, attrs):
+        self.tables.append([0, 0])
+
+    def end_table(self):
+        self.tables.pop()
+
+    def start_row(self, attrs):
+        if self.tables:
+            self.tables[-1][0] += 1
+            self.tables[-1][1] = 0
+
+    def start_cell(self, attrs):
+        if self.tables:
+            self.tables[-1][1] += 1
+
+class _SharedStrings(_PartParser):
+    """The strings of a shared string table in index order, without phonetic runs, as openpyxl reads them."""
+
+    def __init__(self):
+        super().__init__()
+        self.item = []
+        self.phonetic = False
+        self.starts = {_S + 'si': self.start_item, _S + 't': self.start_text, _S + 'rPh': self.start_phonetic}
+        self.ends = {_S + 'si': self.end_item, _S + 't': self.end_text, _S + 'rPh': self.end_phonetic}
+
+    def start_item(self, attrs):
+        self.item = []
+
+    def end_item(self):
+        self.found.append(''.join(self.item))
+
+    def start_text(self, attrs):
+        if not self.phonetic:
+            self.pieces = self.item
+
+    def end_text(self):
+        self.pieces = None
+
+    def start_phonetic(self, attrs):
+        self.phonetic = True
+
+    def end_phonetic(self):
+        self.phonetic = False
+
+def _number_text(value: str, min_digits: int):
+    """
+    The text of a numeric cell, or None if it's too short to hold a
+    candidate. Integral values are written out in full, so the
+    '4.53201511283036E+15' Excel stores for a 16 digit number becomes
+    '4532015112830360' rather than str(float)'s '4.53201511283036e+15'.
+    """
+    if 'E' in value or 'e' in value or '.' in value:
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            return value
+        if not number.is_finite() or number.adjusted() > _MAX_EXPANDED_DIGITS:
+            return value
+        value = str(int(number)) if number == number.to_integral_value() else format(number, 'f')
+    digits = len(value) - value.startswith('-') - ('.' in value)
+    return value if digits >= min_digits else None
+
+class _SheetPart(_PartParser):
+    """
+    Rows of a worksheet part as ("Sheet:rN", cell texts joined by spaces).
+
+    Shared and inline strings and string formula results are kept.
+    Booleans, errors, dates, numeric formula results (computed from cells
+    that are scanned themselves) and numbers shorter than min_digits are
+    skipped, since none can hold a candidate.
+    """
+
+    def __init__(self, title: str, shared: list[str], min_digits: int):
+        super().__init__()
+        self.title = title
+        self.shared = shared
+        self.min_digits = min_digits
+        self.row = 0
+        self.cells = []        # Texts of the open row
+        self.cell_type = 'n'
+        self.formula = False
+        self.value = []
+        self.phonetic = False
+        self.starts = {
+            _S + 'row': self.start_row, _S + 'c': self.start_cell, _S + 'f': self.start_formula,
+            _S + 'v': self.start_value, _S + 't': self.start_text, _S + 'rPh': self.start_phonetic,
+        }
+        self.ends = {
+            _S + 'row': self.end_row, _S + 'c': self.end_cell, _S + 'v': self.end_value,
+            _S + 't': self.end_value, _S + 'rPh': self.end_phonetic,
+        }
+
+    def start_row(self, attrs):
+        row = attrs.get('r')
+        self.row = int(row) if row else self.row + 1
+        self.cells = []
+
+    def end_row(self):
+        content = ' '.join(self.cells).strip()
+        if content:
+            self.found.append((f"{self.title}:r{self.row}", content))
+
+    def start_cell(self, attrs):
+        self.cell_type = attrs.get('t', 'n')
+        self.formula = False
+        self.value = []
+
+    def end_cell(self):
+        text = self.cell_text(''.join(self.value))
+        if text:
+            self.cells.append(text)
+
+    def cell_text(self, value: str):
+        if not value:
+            return None
+        if self.cell_type == 's':
+            try:
+                return self.shared[int(value)]
+            except (ValueError, IndexError):
+                return None
+        if self.cell_type in ('str', 'inlineStr'):
+            return value
+        if self.cell_type != 'n' or self.formula:
+            return None
+        return _number_text(value, self.min_digits)
+
+    def start_formula(self, attrs):
+        self.formula = True
+
+    def start_value(self, attrs):
+        self.pieces = self.value
+
+    def start_text(self, attrs):
+        # Inline string text; its phonetic runs are left out
+        if not self.phonetic:
+            self.pieces = self.value
+
+    def end_value(self):
+        self.pieces = None
+
+    def start_phonetic(self, attrs):
+        self.phonetic = True
+
+    def end_phonetic(self):
+        self.phonetic = False
+
+def iter_docx_text(file_path: str) -> Iterator[tuple[Locator, str]]:
+    """
+    Yields (locator, text) for each paragraph of a DOCX file: the main
+    document first, then headers, footers, footnotes, endnotes and
+    comments, whose locators are prefixed with the part name ("header1:p3").
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        document = _main_part(zf, 'word/document.xml')
+        with zf.open(document) as f:
+            yield from _WordPart().parse(f)
+        related = _relationships(zf, document)
+        for part_type in _WORD_PARTS:
+            for _, rel_type, target in related:
+                if rel_type == part_type and target in zf.NameToInfo:
+                    with zf.open(target) as f:
+                        yield from _WordPart(posixpath.splitext(posixpath.basename(target))[0]).parse(f)
+
+def iter_pptx_text(file_path: str) -> Iterator[tuple[str, str]]:
+    """
+    Yields (locator, text) for each shape with text on each slide of a
+    PPTX file, in presentation order, followed by the slide's notes
+    ("s2:notes:sh2").
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        presentation = _main_part(zf, 'ppt/presentation.xml')
+        targets = {rel_id: target for rel_id, _, target in _relationships(zf, presentation)}
+        with zf.open(presentation) as f:
+            slide_ids = [elem.get(_REL_ID) for _, elem in ET.iterparse(f) if elem.tag == _SLIDE_ID]
+        for i, slide_id in enumerate(slide_ids, 1):
+            slide = targets.get(slide_id)
+            if slide not in zf.NameToInfo:
+                continue
+            with zf.open(slide) as f:
+                yield from _SlidePart(f"s{i}").parse(f)
+            for _, rel_type, target in _relationships(zf, slide):
+                if rel_type == 'notesSlide' and target in zf.NameToInfo:
+                    with zf.open(target) as f:
+                        yield from _SlidePart(f"s{i}:notes").parse(f)
+
+def iter_xlsx_rows(file_path: str, min_number_digits: int = XLSX_MIN_NUMBER_DIGITS) -> Iterator[tuple[str, str]]:
+    """
+    Yields ("Sheet:rN", text) for each row of each worksheet of an XLSX
+    file that has text to scan, in workbook order. The shared string
+    table is read once up front.
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        workbook = _main_part(zf, 'xl/workbook.xml')
+        related = _relationships(zf, workbook)
+        shared = []
+        for _, rel_type, target in related:
+            if rel_type == 'sharedStrings' and target in zf.NameToInfo:
+                with zf.open(target) as f:
+                    shared = list(_SharedStrings().parse(f))
+        worksheets = {rel_id: target for rel_id, rel_type, target in related if rel_type == 'worksheet'}
+        with zf.open(workbook) as f:
+            sheets = [(elem.get('name'), elem.get(_REL_ID)) for _, elem in ET.iterparse(f) if elem.tag == _SHEET]
+        for title, rel_id in sheets:
+            # Chart sheets have no worksheet relationship and no cells
+            target = worksheets.get(rel_id)
+            if target not in zf.NameToInfo:
+                continue
+            with zf.open(target) as f:
+                yield from _SheetPart(title, shared, min_number_digits).parse(f)
+
+# Factories for the extractor registry
+
+def docx_extractor(config: dict):
+    return iter_docx_text
+
+def pptx_extractor(config: dict):
+    return iter_pptx_text
+
+def xlsx_extractor(config: dict):
+    # Numeric cells shorter than scan.xlsxMinNumberDigits are not scanned;
+    # custom rules may match any number, so with them all of them are
+    default = 1 if has_custom_rules(config) else XLSX_MIN_NUMBER_DIGITS
+    min_digits = config.get('scan', {}).get('xlsxMinNumberDigits', default)
+    return functools.partial(iter_xlsx_rows, min_number_digits=min_digits)
@@ -0,0 +1,123 @@
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+from dlp_agent.events.model import Finding
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+# Files a worker may run ahead of the oldest unfinished one, per worker.
+# Results are small Finding lists, so a deep window is cheap and lets the
+# pool keep going while one slow PDF/XLSX holds up ordered emission.
+WINDOW_PER_WORKER = 64
+
+_worker_processor = None
+
+class Resolved(NamedTuple):
+    """
+    A file whose findings are known without scanning it, given to scan()
+    in place of its path so they are released in order with the rest.
+    """
+    file_path: str
+    findings: list[Finding]
+    cached: bool  # A content cache hit, rather than an unchanged file from the scan index
+
+def _init_worker(config: dict):
+    # Each worker compiles its own detectors once and never touches sinks;
+    # the workers are the parallelism, so PDFs aren't split further
+    global _worker_processor
+    _worker_processor = StreamProcessor(config, pdf_workers=0)
+
+def _take_skipped() -> Optional[Counter]:
+    """Files the worker skipped since the last call, if any, for the parent's counts."""
+    skipped = _worker_processor.skipped
+    if not skipped:
+        return None
+    _worker_processor.skipped = Counter()
+    return skipped
+
+def _scan_in_worker(file_path: str) -> tuple[list[Finding], bool, Optional[Counter]]:
+    findings, complete = _worker_processor.scan_file(file_path)
+    return findings, complete, _take_skipped()
+
+def _scan_timed_in_worker(file_path: str) -> tuple[list[Finding], bool, Optional[Counter], float]:
+    start = time.perf_counter()
+    findings, complete = _worker_processor.scan_file(file_path)
+    return findings, complete, _take_skipped(), time.perf_counter() - start
+
+class ParallelScanner:
+    """
+    Scans files in a process pool for a StreamProcessor in the parent.
+
+    Workers return compact Finding records, which scan() yields in the
+    order the paths were given. The caller passes them to the processor's
+    emit_findings(), which performs deduplication and calls the sinks, so
+    sinks never need to be process-safe and the output matches a serial run.
+    Paths can be interleaved with Resolved results, which are yielded
+    as they are in their place in the order, never ahead of a file
+    still being scanned. With stats (a ScanStats), workers also time
+    each file for its report. Files the workers skip as binary are added
+    to the processor's counts.
+    """
+
+    def __init__(self, processor: StreamProcessor, workers: int, stats=None):
+        self.processor = processor
+        self.workers = workers
+        self.stats = stats
+        self.window = workers * WINDOW_PER_WORKER
+
+    def scan(self, paths: Iterable[Union[str, Resolved]]
+             ) -> Iterator[Union[tuple[str, list[Finding], bool], Resolved]]:
+        """
+        Scan paths in the pool.
+        Yields (file_path, findings, complete) in input order, as
+        StreamProcessor.scan_file() returns them, and each Resolved as is.
+        """
+        scan = _scan_in_worker if self.stats is None else _scan_timed_in_worker
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.processor.config,)) as pool:
+            pending = {}   # future -> sequence number
+            done = {}      # sequence number -> worker result or Resolved
+            order = {}     # sequence number -> file_path
+            next_emit = 0
+            paths = iter(paths)
+            submitted = 0
+            exhausted = False
+
+            while True:
+                while not exhausted and submitted - next_emit < self.window:
+                    try:
+                        file_path = next(paths)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if isinstance(file_path, Resolved):
+                        # Already known, it only waits for its turn
+                        done[submitted] = file_path
+                    else:
+                        pending[pool.submit(scan, file_path)] = submitted
+                        order[submitted] = file_path
+                    submitted += 1
+
+                if next_emit not in done:
+                    if not pending:
+                        break
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        seq = pending.pop(future)
+                        done[seq] = future.result()
+
+                # Release every result that is next in input order
+                while next_emit in done:
+                    result = done.pop(next_emit)
+                    if isinstance(result, Resolved):
+                        yield result
+                        next_emit += 1
+                        continue
+                    file_path = order.pop(next_emit)
+                    findings, complete, skipped = result[:3]
+                    if skipped:
+                        self.processor.skipped.update(skipped)
+                    if self.stats is not None:
+                        self.stats.file_scanned(file_path, result[3], len(findings))
+                    yield file_path, findings, complete
+                    next_emit += 1
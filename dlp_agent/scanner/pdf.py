@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import time
+from typing import Iterator, Optional, Union
+import PyPDF2
+from PyPDF2.generic import ArrayObject
+from dlp_agent.events.model import PartialScan
+
+# Per-file budgets; 0 disables either
+PDF_TIMEOUT_SECONDS = 120
+PDF_MAX_PAGES = 10000
+# Pool processes when the policy doesn't say; one is enough to enforce the time budget
+PDF_DEFAULT_WORKERS = 1
+
+# Files with fewer pages go to the pool as a single range
+PARALLEL_MIN_PAGES = 8
+# Page ranges handed to the pool per worker, so a slow page holds up little else
+CHUNKS_PER_WORKER = 4
+
+_worker_reader = None   # (file_path, mtime_ns, size, reader) of the last PDF a pool worker opened
+
+def _may_have_text(page) -> bool:
+    """
+    Whether a page could hold text. Pages without a text object in their
+    content and without form XObjects, which may carry text of their own,
+    are skipped without running the text extractor; scanned images are
+    the common case.
+    """
+    resources = page.get('/Resources')
+    resources = resources.get_object() if resources is not None else {}
+    xobjects = resources.get('/XObject')
+    if xobjects is not None:
+        for xobject in xobjects.get_object().values():
+            if xobject.get_object().get('/Subtype') == '/Form':
+                return True
+    if '/Font' not in resources:
+        return False
+    contents = page.get('/Contents')
+    if contents is None:
+        return False
+    contents = contents.get_object()
+    streams = contents if isinstance(contents, ArrayObject) else [contents]
+    return any(b'BT' in stream.get_object().get_data() for stream in streams)
+
+def _page_lines(page) -> list[str]:
+    if not _may_have_text(page):
+        return []
+    text = page.extract_text()
+    return text.splitlines() if text else []
+
+def _open_in_worker(file_path: str) -> PyPDF2.PdfReader:
+    """The reader for a PDF in a pool worker, kept for the next call on the same file."""
+    global _worker_reader
+    st = os.stat(file_path)
+    if _worker_reader is None or _worker_reader[:3] != (file_path, st.st_mtime_ns, st.st_size):
+        _worker_reader = (file_path, st.st_mtime_ns, st.st_size, PyPDF2.PdfReader(file_path))
+    return _worker_reader[3]
+
+def _count_pages(file_path: str) -> int:
+    return len(_open_in_worker(file_path).pages)
+
+def _extract_pages(file_path: str, start: int, stop: int) -> list[list[str]]:
+    """Lines of pages [start, stop) of a PDF, in a pool worker."""
+    reader = _open_in_worker(file_path)
+    return [_page_lines(reader.pages[i]) for i in range(start, stop)]
+
+class PdfExtractor:
+    """
+    Extracts PDF text page by page under per-file time and page budgets.
+
+    With workers, PDFs are opened and extracted by a process pool, which
+    is started on first use and kept for later files; those of
+    PARALLEL_MIN_PAGES or more are split into page ranges across it. A
+    file that runs out of budget yields a PartialScan after the pages it
+    got through. In the pool the time budget is enforced even on a file
+    that never opens or a page that never finishes, by terminating the
+    pool; with workers=0 it is only checked between pages.
+    """
+
+    def __init__(self, workers: int = PDF_DEFAULT_WORKERS, max_pages: int = PDF_MAX_PAGES,
+                 timeout: float = PDF_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self._pool = None
+
+    @classmethod
+    def from_policy(cls, config: dict, workers: Optional[int] = None) -> 'PdfExtractor':
+        """Budgets and pool size from the policy's scan.pdf section; workers overrides the latter."""
+        pdf = config.get('scan', {}).get('pdf', {})
+        return cls(workers=pdf.get('workers', PDF_DEFAULT_WORKERS) if workers is None else workers,
+                   max_pages=pdf.get('maxPages', PDF_MAX_PAGES),
+                   timeout=pdf.get('timeoutSeconds', PDF_TIMEOUT_SECONDS))
+
+    def __call__(self, file_path: str):
+        return self.iter_lines(file_path)
+
+    def iter_lines(self, file_path: str) -> Iterator[tuple[str, Union[str, PartialScan]]]:
+        """Yields ("p{page}:l{line}", line) for each line of text, then a PartialScan if a budget ran out."""
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        if self.workers > 0:
+            total = self._pool_result(self._apply(_count_pages, file_path), deadline)
+            if total is None:
+                yield "p1", PartialScan(f"PDF time budget of {self.timeout:g}s ran out opening the file")
+                return
+            pages = min(total, self.max_pages) if self.max_pages else total
+            scanned = yield from self._iter_pool(file_path, pages, deadline)
+        else:
+            reader = PyPDF2.PdfReader(file_path)
+            total = len(reader.pages)
+            pages = min(total, self.max_pages) if self.max_pages else total
+            scanned = yield from self._iter_serial(reader, pages, deadline)
+
+        if scanned < pages:
+            yield f"p{scanned + 1}", PartialScan(
+                f"PDF time budget of {self.timeout:g}s ran out: {scanned} of {total} pages scanned")
+        elif pages < total:
+            yield f"p{pages + 1}", PartialScan(
+                f"PDF page budget of {self.max_pages} pages ran out: {pages} of {total} pages scanned")
+
+    @staticmethod
+    def _lines(page_index: int, lines: list[str]):
+        for line_num, line in enumerate(lines, 1):
+            # Compounding page and line number for unique tracking
+            yield f"p{page_index + 1}:l{line_num}", line
+
+    def _iter_serial(self, reader, pages: int, deadline):
+        """Returns the number of pages extracted."""
+        for i in range(pages):
+            if deadline is not None and time.monotonic() > deadline:
+                return i
+            yield from self._lines(i, _page_lines(reader.pages[i]))
+        return pages
+
+    def _apply(self, func, *args):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+        return self._pool.apply_async(func, args)
+
+    def _pool_result(self, result, deadline):
+        """The result of a pool call, or None if the deadline passed first."""
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            return result.get(remaining)
+        except multiprocessing.TimeoutError:
+            # Workers can't be interrupted mid-page, so the pool goes and a fresh one starts next time
+            self._pool.terminate()
+            self._pool = None
+            return None
+
+    def _iter_pool(self, file_path: str, pages: int, deadline):
+        """Returns the number of leading pages extracted."""
+        if pages < PARALLEL_MIN_PAGES:
+            size = max(pages, 1)
+        else:
+            size = -(-pages // (self.workers * CHUNKS_PER_WORKER))
+        chunks = [(start, min(start + size, pages)) for start in range(0, pages, size)]
+        results = [self._apply(_extract_pages, file_path, start, stop) for start, stop in chunks]
+        for (start, stop), result in zip(chunks, results):
+            page_lines = self._pool_result(result, deadline)
+            if page_lines is None:
+                return start
+            for offset, lines in enumerate(page_lines):
+                yield from self._lines(start + offset, lines)
+        return pages
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Optional
+from dlp_agent.events.model import Finding
+
+INDEX_FILE = "scan_index.sqlite3"
+SCHEMA_VERSION = 1
+
+# Commit pending index writes at least this often
+COMMIT_EVERY_FILES = 1000
+COMMIT_EVERY_SECONDS = 2.0
+
+def policy_fingerprint(config: dict) -> str:
+    """Stable digest of a policy; any change invalidates every index entry."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+class ScanIndex:
+    """
+    On-disk record of what the last scan saw for each file.
+
+    Each row holds (path, inode, size, mtime_ns, policy fingerprint) and the
+    masked findings of the last scan, so an unchanged file can be skipped and
+    its findings replayed or suppressed. The database uses SQLite in WAL mode
+    with a busy timeout, so concurrent runs sharing a state dir serialize
+    their writes instead of failing; rows are plain upserts, last writer wins.
+    """
+
+    def __init__(self, db_path: str, config: dict):
+        self.db_path = db_path
+        self.policy = policy_fingerprint(config)
+        self.run_id = time.time_ns()
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+        self._stats = {}  # path -> os.stat_result taken at lookup time
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+    def _init_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with self._conn:
+                self._conn.execute("DROP TABLE IF EXISTS files")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    inode INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    policy TEXT NOT NULL,
+                    findings TEXT NOT NULL,
+                    last_seen INTEGER NOT NULL
+                )
+            """)
+
+    def lookup(self, file_path: str) -> Optional[list[Finding]]:
+        """
+        Returns the stored findings if the file is unchanged since it was
+        last indexed under the current policy, otherwise None.
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+
+        row = self._conn.execute(
+            "SELECT inode, size, mtime_ns, policy, findings FROM files WHERE path = ?",
+            (file_path,)
+        ).fetchone()
+        if row is not None and row[:4] == (st.st_ino, st.st_size, st.st_mtime_ns, self.policy):
+            self._conn.execute("UPDATE files SET last_seen = ? WHERE path = ?", (self.run_id, file_path))
+            self._wrote()
+            self.skipped_files += 1
+            self.skipped_bytes += st.st_size
+            return [Finding(*finding) for finding in json.loads(row[4])]
+
+        self._stats[file_path] = st
+        return None
+
+    def record(self, file_path: str, findings: list[Finding]):
+        """Store the findings of a fresh scan of a file passed to lookup()."""
+        st = self._stats.pop(file_path, None)
+        if st is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, inode, size, mtime_ns, policy, findings, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_path, st.st_ino, st.st_size, st.st_mtime_ns, self.policy,
+             json.dumps([list(finding) for finding in findings]), self.run_id)
+        )
+        self._wrote()
+
+    def prune(self, root: str) -> int:
+        """
+        Drop entries under root that this run did not see and that no longer
+        exist on disk. Returns the number of entries removed.
+        """
+        root = root.rstrip(os.sep) + os.sep
+        # Every path under root sorts between "root/" and "root0" ('0' follows '/')
+        upper = root[:-1] + chr(ord(os.sep) + 1)
+        stale = self._conn.execute(
+            "SELECT path FROM files WHERE path >= ? AND path < ? AND last_seen != ?",
+            (root, upper, self.run_id)
+        ).fetchall()
+        removed = [(path,) for (path,) in stale if not os.path.lexists(path)]
+        if removed:
+            with self._conn:
+                self._conn.executemany("DELETE FROM files WHERE path = ?", removed)
+        return len(removed)
+
+    def _wrote(self):
+        self._uncommitted += 1
+        if (self._uncommitted >= COMMIT_EVERY_FILES
+                or time.monotonic() - self._last_commit >= COMMIT_EVERY_SECONDS):
+            self.commit()
+
+    def commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        self.commit()
+        self._conn.close()
@@ -0,0 +1,214 @@
+"""
+Scheduled scans: a low-priority background run that keeps to a CPU share
+and a read rate, waits while the machine is busy, scans the files most
+likely to matter first, and stops when its maintenance window is over.
+
+Settings come from the policy's scan.schedule section. A run that doesn't
+finish in its window is resumed by the next one through the incremental
+scan index (--state-dir), which skips every file already scanned.
+"""
+import heapq
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Iterable, Iterator, Optional
+
+CPU_PERCENT = 25
+READ_MBPS = 10
+NICE = 10
+RECENT_HOURS = 24
+# Where exports and documents full of personal data usually end up
+HIGH_RISK_EXTENSIONS = ['.csv', '.xlsx', '.json', '.docx', '.pdf']
+
+# Paths held for reordering; past this the best one is released for each new one
+QUEUE_SIZE = 50000
+# Seconds between load average checks while paused
+LOAD_POLL_SECONDS = 5.0
+
+def cpu_time() -> float:
+    """
+    CPU seconds used by this process and its children that have exited.
+    Children still running, such as pool workers, aren't counted yet.
+    """
+    children = os.times()
+    return time.process_time() + children.children_user + children.children_system
+
+def prioritized(paths: Iterable[str], high_risk_extensions: Iterable[str] = HIGH_RISK_EXTENSIONS,
+                recent_seconds: float = RECENT_HOURS * 3600, queue_size: int = QUEUE_SIZE) -> Iterator[str]:
+    """
+    paths reordered so that files modified within recent_seconds that have
+    a high-risk extension come first, then files that are one or the
+    other, then the rest; newest first within each group. Only queue_size
+    paths are held at once, so trees larger than that are ordered within
+    a sliding window of the walk.
+    """
+    high_risk = {ext.lower() for ext in high_risk_extensions}
+    now = time.time()
+    queue = []
+    for seq, path in enumerate(paths):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        recent = now - mtime <= recent_seconds
+        risky = os.path.splitext(path)[1].lower() in high_risk
+        heapq.heappush(queue, (2 - recent - risky, -mtime, seq, path))
+        if len(queue) > queue_size:
+            yield heapq.heappop(queue)[3]
+    while queue:
+        yield heapq.heappop(queue)[3]
+
+def lower_priority(nice: int = NICE) -> list[str]:
+    """
+    Lower this process's CPU and I/O priority, as far as the platform
+    allows. Returns what was applied.
+    """
+    applied = []
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        # Lowers CPU, I/O and memory priority together
+        PROCESS_MODE_BACKGROUND_BEGIN = 0x00100000
+        if kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), PROCESS_MODE_BACKGROUND_BEGIN):
+            applied.append("background mode")
+        return applied
+
+    if nice and hasattr(os, 'nice'):
+        try:
+            os.nice(nice)
+            applied.append(f"nice +{nice}")
+        except OSError as e:
+            logging.warning(f"Could not lower CPU priority: {e}")
+    # Lowest best-effort I/O priority; the idle class could starve the scan outright
+    ionice = shutil.which('ionice') if sys.platform.startswith('linux') else None
+    if ionice:
+        result = subprocess.run([ionice, '-c', '2', '-n', '7', '-p', str(os.getpid())],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode == 0:
+            applied.append("ionice best-effort 7")
+    return applied
+
+class ScanSchedule:
+    """
+    Orders and paces a serial scan.
+
+    order() puts the files most worth scanning first (see prioritized()),
+    and lower_priority() makes the process yield to other work. The CPU
+    time and bytes of each file are paid for before the next one starts,
+    by idling until they fit within cpu_percent of the elapsed time and
+    read_mbps, so no credit builds up while the scan waits. While the
+    1-minute load average is above max_load the scan pauses. Once
+    window_seconds have passed, before_file() returns False.
+
+    CPU time is only seen once it is this process's or that of a child
+    that exited, so work should stay in this process; a scheduled scan
+    extracts PDFs without a pool.
+    """
+
+    def __init__(self, cpu_percent: float = CPU_PERCENT, read_mbps: float = READ_MBPS,
+                 max_load: Optional[float] = None, window_seconds: Optional[float] = None, nice: int = NICE,
+                 high_risk_extensions: Iterable[str] = HIGH_RISK_EXTENSIONS, recent_hours: float = RECENT_HOURS):
+        self.cpu_share = cpu_percent / 100 if cpu_percent else None
+        self.read_rate = read_mbps * 1024 * 1024 if read_mbps else None
+        self.max_load = max_load if hasattr(os, 'getloadavg') else None
+        self.window_seconds = window_seconds
+        self.nice = nice
+        self.high_risk_extensions = high_risk_extensions
+        self.recent_seconds = recent_hours * 3600
+        self.files = 0
+        self.bytes_read = 0
+        self.throttled_seconds = 0.0
+        self.paused_seconds = 0.0
+        self.window_closed = False
+        self._start = time.monotonic()
+        self._cpu_start = cpu_time()
+        self._wall_mark = self._start
+        self._cpu_mark = self._cpu_start
+        self._pending_bytes = 0
+
+    @classmethod
+    def from_policy(cls, config: dict, **overrides) -> 'ScanSchedule':
+        """Budgets from the policy's scan.schedule section; overrides that aren't None win."""
+        schedule = config.get('scan', {}).get('schedule', {})
+        window_minutes = schedule.get('windowMinutes')
+        settings = {
+            'cpu_percent': schedule.get('cpuPercent', CPU_PERCENT),
+            'read_mbps': schedule.get('readMBps', READ_MBPS),
+            'max_load': schedule.get('maxLoad', os.cpu_count()),
+            'window_seconds': window_minutes * 60 if window_minutes else None,
+            'nice': schedule.get('nice', NICE),
+            'high_risk_extensions': schedule.get('highRiskExtensions', HIGH_RISK_EXTENSIONS),
+            'recent_hours': schedule.get('recentHours', RECENT_HOURS),
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**settings)
+
+    def order(self, paths: Iterable[str]) -> Iterator[str]:
+        return prioritized(paths, self.high_risk_extensions, self.recent_seconds)
+
+    def lower_priority(self) -> list[str]:
+        return lower_priority(self.nice)
+
+    def before_file(self, file_path: str) -> bool:
+        """
+        Wait until the budgets allow scanning file_path; returns False, and
+        should not be called again, once the window is over.
+        """
+        if self._window_over():
+            return False
+        now = time.monotonic()
+        due = 0.0
+        if self.cpu_share is not None:
+            due = (cpu_time() - self._cpu_mark) / self.cpu_share
+        if self.read_rate is not None:
+            due = max(due, self._pending_bytes / self.read_rate)
+        wait = due - (now - self._wall_mark)
+        if wait > 0:
+            time.sleep(wait)
+            self.throttled_seconds += wait
+        self._wait_for_load()
+        if self._window_over():
+            return False
+
+        try:
+            self._pending_bytes = os.path.getsize(file_path)
+        except OSError:
+            self._pending_bytes = 0
+        self.bytes_read += self._pending_bytes
+        self.files += 1
+        self._wall_mark = time.monotonic()
+        self._cpu_mark = cpu_time()
+        return True
+
+    def _window_over(self) -> bool:
+        if self.window_seconds is not None and time.monotonic() - self._start >= self.window_seconds:
+            self.window_closed = True
+        return self.window_closed
+
+    def _wait_for_load(self):
+        if self.max_load is None:
+            return
+        while os.getloadavg()[0] > self.max_load and not self._window_over():
+            time.sleep(LOAD_POLL_SECONDS)
+            self.paused_seconds += LOAD_POLL_SECONDS
+
+    def report(self) -> dict:
+        """What the scan used of its budgets so far."""
+        elapsed = time.monotonic() - self._start
+        cpu = cpu_time() - self._cpu_start
+        return {
+            'files': self.files,
+            'elapsed_seconds': elapsed,
+            'cpu_seconds': cpu,
+            'cpu_percent': 100 * cpu / elapsed if elapsed else 0.0,
+            'cpu_budget_percent': self.cpu_share * 100 if self.cpu_share is not None else None,
+            'read_mb': self.bytes_read / (1024 * 1024),
+            'read_mbps': self.bytes_read / (1024 * 1024) / elapsed if elapsed else 0.0,
+            'read_budget_mbps': self.read_rate / (1024 * 1024) if self.read_rate is not None else None,
+            'throttled_seconds': self.throttled_seconds,
+            'paused_seconds': self.paused_seconds,
+            'window_closed': self.window_closed,
+        }
@@ -0,0 +1,97 @@
+"""
+Tells text from binary files, and finds the encoding of text files, from
+the first block of a file.
+
+Byte order marks identify UTF-8, UTF-16 and UTF-32. UTF-16 without one
+is recognised by its zero bytes: text that is mostly ASCII or Latin-1
+has a zero high byte in nearly every code unit, on the same side of
+each pair. Anything else containing a NUL byte, or with many control
+characters, is binary; everything else is read as UTF-8.
+"""
+import codecs
+from typing import NamedTuple, Optional
+
+# Bytes read from the start of a file to decide
+SNIFF_SIZE = 8 * 1024
+
+# Binary if more of the first block than this is control characters
+CONTROL_RATIO = 0.1
+# BOM-less UTF-16 needs zeros in at least this share of its code units on
+# one side, and at most UTF16_OTHER_SIDE on the other
+UTF16_ZERO_SIDE = 0.4
+UTF16_OTHER_SIDE = 0.02
+UTF16_MIN_UNITS = 8
+
+# UTF-32 first: its little-endian mark starts with UTF-16's
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Control characters that don't turn up in text: all below 0x20 except
+# tab, newline, vertical tab, form feed, carriage return and escape (ANSI
+# colour codes in logs)
+_TEXT_BYTES = bytes(b for b in range(256) if b >= 0x20 or b in b'\t\n\v\f\r\x1b')
+
+class Sniff(NamedTuple):
+    encoding: Optional[str]
+    # Why the file isn't text, when it isn't
+    skip_reason: Optional[str] = None
+
+def _utf16_without_bom(head: bytes) -> Optional[str]:
+    units = len(head) // 2
+    if units < UTF16_MIN_UNITS:
+        return None
+    even_zeros = head[0:units * 2:2].count(0)
+    odd_zeros = head[1:units * 2:2].count(0)
+    if odd_zeros >= units * UTF16_ZERO_SIDE and even_zeros <= units * UTF16_OTHER_SIDE:
+        return 'utf-16-le'
+    if even_zeros >= units * UTF16_ZERO_SIDE and odd_zeros <= units * UTF16_OTHER_SIDE:
+        return 'utf-16-be'
+    return None
+
+def sniff(head: bytes) -> Sniff:
+    """The encoding of a file that starts with head, or why it is skipped."""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return Sniff(encoding)
+    if b'\0' in head:
+        encoding = _utf16_without_bom(head)
+        if encoding is not None:
+            return Sniff(encoding)
+        return Sniff(None, "binary (NUL bytes)")
+    if len(head.translate(None, _TEXT_BYTES)) > len(head) * CONTROL_RATIO:
+        return Sniff(None, "binary (control characters)")
+    return Sniff('utf-8')
+
+class TranscodingReader:
+    """
+    Reads a binary file in another encoding as UTF-8 bytes, for the
+    byte-oriented block scanner. head is what was already read from f;
+    at most limit bytes are read from f after it, counted in the source
+    encoding, since the UTF-8 returned can be longer or shorter.
+    Undecodable bytes are dropped, as the UTF-8 text path drops them.
+    """
+
+    def __init__(self, f, encoding: str, head: bytes = b'', limit: int = None):
+        self._f = f
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+        self._head = head
+        self._limit = limit
+
+    def read(self, size: int) -> bytes:
+        while True:
+            if self._head:
+                data, self._head = self._head, b''
+            elif self._limit is None:
+                data = self._f.read(size)
+            else:
+                data = self._f.read(min(size, self._limit)) if self._limit > 0 else b''
+                self._limit -= len(data)
+            text = self._decoder.decode(data, final=not data)
+            # A block can end mid code unit and decode to nothing yet
+            if text or not data:
+                return text.encode('utf-8')
@@ -0,0 +1,297 @@
+import cProfile
+import fnmatch
+import heapq
+import json
+import os
+import pstats
+import threading
+import time
+
+STATS_VERSION = 1
+
+class Histogram:
+    """
+    Latency histogram with power-of-two microsecond buckets: bucket k
+    counts samples of [2^(k-1), 2^k) microseconds, bucket 0 those under 1.
+    """
+
+    __slots__ = ('samples', 'items', 'bytes', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.samples = 0
+        self.items = 0
+        self.bytes = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, seconds: float, items: int = 0, size: int = 0):
+        self.samples += 1
+        self.items += items
+        self.bytes += size
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the q-th quantile."""
+        rank = q * self.samples
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "items": self.items,
+            "bytes": self.bytes,
+            "total_s": self.total,
+            "mean_ms": self.total / self.samples * 1000 if self.samples else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p90_ms": self.percentile(0.9) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+            "buckets_us": {f"<{1 << bucket}": count for bucket, count in sorted(self.buckets.items())},
+        }
+
+class _Timer:
+    """Time spent in the wrapped calls of one stage since the last take()."""
+
+    __slots__ = ('seconds', 'calls', 'depth')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.depth = 0
+
+    def take(self) -> tuple[float, int]:
+        taken = self.seconds, self.calls
+        self.seconds = 0.0
+        self.calls = 0
+        return taken
+
+def _timed(method, timer: _Timer):
+    """Wrap method to add its duration to timer; calls made from inside it aren't counted twice."""
+    clock = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        if timer.depth:
+            return method(*args, **kwargs)
+        timer.depth = 1
+        start = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timer.seconds += clock() - start
+            timer.calls += 1
+            timer.depth = 0
+    return wrapper
+
+class ScanStats:
+    """
+    Per-stage counters and latency histograms for a scan, for --stats.
+
+    Nothing is measured unless an object is instrumented, which replaces
+    methods on that instance with timing wrappers, so a scan without
+    --stats runs the plain code. Stages and their histogram samples:
+      - walk: "list_dir" per directory listed (scandir and stat calls),
+        "wait" per walk for the time the scan spent waiting on the walker
+      - file: per scanned file, by extension
+      - extract: per file, by extension; file time less detection and
+        emitting, i.e. reading, parsing and text extraction
+      - detect: per file, "all" for the engine, "match" for candidate
+        matching and "validate.<rule>" for each rule's validation
+      - emit: per event, by sink class
+    Detection and extraction are measured in this process only; with
+    --workers the files are timed by the workers and reported under
+    "file".
+
+    Files matching profile_pattern, and every profile_every-th file, are
+    run under cProfile; the aggregated profile goes into the report.
+    """
+
+    def __init__(self, top_n: int = 20, profile_pattern: str = None, profile_every: int = 0):
+        self.top_n = top_n
+        self.profile_pattern = profile_pattern
+        self.profile_every = profile_every
+        self.stages = {}
+        self.slowest = []  # Min-heap of (seconds, path, bytes, findings)
+        self.files = 0
+        self.bytes = 0
+        self.findings = 0
+        self.profiled_files = 0
+        self._profile = None
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._detect = _Timer()
+        self._emit = _Timer()
+        self._validate = {}
+
+    def record(self, stage: str, key: str, seconds: float, items: int = 0, size: int = 0):
+        with self._lock:
+            histogram = self.stages.setdefault(stage, {}).get(key)
+            if histogram is None:
+                histogram = self.stages[stage][key] = Histogram()
+            histogram.add(seconds, items, size)
+
+    def file_scanned(self, file_path: str, seconds: float, findings: int):
+        """Record one scanned file and its total scan time."""
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        self.files += 1
+        self.bytes += size
+        self.findings += findings
+        self.record("file", _extension(file_path), seconds, findings, size)
+        entry = (seconds, file_path, size, findings)
+        if len(self.slowest) < self.top_n:
+            heapq.heappush(self.slowest, entry)
+        elif self.top_n and entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def instrument_walker(self, walker):
+        list_dir = walker._list_dir
+        walk = walker.walk
+        clock = time.perf_counter
+
+        def timed_list_dir(*args):
+            start = clock()
+            files, subdirs = list_dir(*args)
+            self.record("walk", "list_dir", clock() - start, len(files) + len(subdirs))
+            return files, subdirs
+
+        def timed_walk(*args, **kwargs):
+            paths = walk(*args, **kwargs)
+            waited = 0.0
+            count = 0
+            while True:
+                start = clock()
+                try:
+                    path = next(paths)
+                except StopIteration:
+                    break
+                finally:
+                    waited += clock() - start
+                count += 1
+                yield path
+            self.record("walk", "wait", waited, count)
+
+        walker._list_dir = timed_list_dir
+        walker.walk = timed_walk
+
+    def instrument_processor(self, processor):
+        engine = processor.engine
+        for name in ('detect', 'detect_buffer', 'detect_block'):
+            setattr(engine, name, _timed(getattr(engine, name), self._detect))
+        rules = []
+        for rule in engine.rules:
+            timer = self._validate[rule.key] = _Timer()
+            rules.append(rule._replace(to_hits=_timed(rule.to_hits, timer)))
+        engine.rules = rules
+
+        for name in ('scan_file', 'process_file', 'scan_appended'):
+            setattr(processor, name, self._timed_file(getattr(processor, name), name))
+
+    def _timed_file(self, method, name: str):
+        clock = time.perf_counter
+
+        def wrapper(file_path, *args, **kwargs):
+            self._emit.take()  # Drop emits made between files, e.g. by emit_findings()
+            profile = self._should_profile(file_path)
+            if profile:
+                self._profile.enable()
+            start = clock()
+            try:
+                result = method(file_path, *args, **kwargs)
+            finally:
+                seconds = clock() - start
+                if profile:
+                    self._profile.disable()
+            self._file_stages(file_path, seconds)
+            if name == 'process_file':
+                findings = result
+            else:
+                findings = len(result[0])
+            self.file_scanned(file_path, seconds, findings)
+            return result
+        return wrapper
+
+    def _file_stages(self, file_path: str, seconds: float):
+        """Split one file's scan time into detection, validation and extraction."""
+        ext = _extension(file_path)
+        detect, calls = self._detect.take()
+        emit, _ = self._emit.take()
+        self.record("detect", "all", detect, calls)
+        validated = 0.0
+        for key, timer in self._validate.items():
+            validate, batches = timer.take()
+            if batches:
+                self.record("detect", f"validate.{key}", validate, batches)
+                validated += validate
+        self.record("detect", "match", detect - validated, calls)
+        self.record("extract", ext, max(seconds - detect - emit, 0.0))
+
+    def _should_profile(self, file_path: str) -> bool:
+        chosen = ((self.profile_pattern and fnmatch.fnmatch(file_path, self.profile_pattern)) or
+                  (self.profile_every and self.files % self.profile_every == 0))
+        if not chosen:
+            return False
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+        self.profiled_files += 1
+        return True
+
+    def instrument_sinks(self, sinks):
+        clock = time.perf_counter
+        for sink in sinks:
+            emit = sink.emit
+            key = type(sink).__name__
+
+            def timed_emit(event, emit=emit, key=key):
+                start = clock()
+                try:
+                    emit(event)
+                finally:
+                    seconds = clock() - start
+                    self._emit.seconds += seconds
+                    self.record("emit", key, seconds, 1)
+            sink.emit = timed_emit
+
+    def report(self, profile_dump: str = None, profile_top: int = 30) -> dict:
+        report = {
+            "version": STATS_VERSION,
+            "elapsed_s": time.monotonic() - self._started,
+            "files": {"scanned": self.files, "bytes": self.bytes, "findings": self.findings},
+            "stages": {stage: {key: histogram.to_dict() for key, histogram in sorted(keys.items())}
+                       for stage, keys in self.stages.items()},
+            "slowest_files": [{"path": path, "seconds": seconds, "bytes": size, "findings": findings}
+                              for seconds, path, size, findings in sorted(self.slowest, reverse=True)],
+        }
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile)
+            if profile_dump:
+                stats.dump_stats(profile_dump)
+            top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:profile_top]
+            report["profile"] = {
+                "files": self.profiled_files,
+                "dump": profile_dump,
+                "top_cumulative": [{"function": f"{path}:{line}({name})", "calls": calls,
+                                    "tottime_s": tottime, "cumtime_s": cumtime}
+                                   for (path, line, name), (_, calls, tottime, cumtime, _) in top],
+            }
+        return report
+
+    def write(self, path: str):
+        """Write the report to path as JSON, and any profile next to it as <path>.prof."""
+        report = self.report(profile_dump=path + '.prof' if self._profile is not None else None)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+def _extension(file_path: str) -> str:
+    return os.path.splitext(file_path)[1].lower() or '(none)'
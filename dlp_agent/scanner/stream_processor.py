@@ -1,28 +1,136 @@
+import io
 import logging
 import os
-import docx
-import PyPDF2
-import openpyxl
-from pptx import Presentation
-from dlp_agent.detectors import detect_credit_cards, detect_aadhaar, detect_pan
+from collections import Counter
+from typing import Optional
+from dlp_agent.detectors import DetectionEngine
+from dlp_agent.detectors.custom import has_custom_rules
+from dlp_agent.events.model import (FULL_COVERAGE, PARTIAL_SCAN_RULE, SAMPLED_COVERAGE, DetectionEvent, Finding, Hit,
+                                    PartialScan, digest_value)
 from dlp_agent.events.sinks import EventSink
+from dlp_agent.scanner.dedup import DedupStore
+from dlp_agent.scanner.compressed import COMPRESSED_EXTENSIONS, open_decompressed
+from dlp_agent.scanner.extractors import extractor_specs
+from dlp_agent.scanner.large_files import MB, LargeFilePolicy
+from dlp_agent.scanner.sniff import SNIFF_SIZE, TranscodingReader, sniff
+
+# Block size for chunked text scanning
+CHUNK_SIZE = 1024 * 1024
+
+# Characters of spreadsheet rows scanned per detection buffer
+ROW_BATCH_CHARS = 64 * 1024
+
+# Most of one line held at once; longer lines are scanned in windows
+WINDOW_SIZE = 4 * CHUNK_SIZE
+# Bytes consecutive windows share when a line has nowhere safe to cut
+WINDOW_OVERLAP = 1024
+# How far to look for the end of a line when aligning a sample to one
+LINE_SEARCH = 1024 * 1024
+
+# Bytes after which a line can be cut without splitting or changing any
+# built-in rule's match: ASCII punctuation but '-' and '_', control
+# characters other than whitespace, and '\r', a line break of its own once
+# no '\n' follows
+_WINDOW_CUTS = bytes(range(0x00, 0x09)) + b'\r' + bytes(range(0x0e, 0x1c)) + b'!"#$%&\'()*+,./:;<=>?@[\\]^`{|}~\x7f'
+_WINDOW_CUT_TABLE = bytes(0 if b in _WINDOW_CUTS else 1 for b in range(256))
+# Custom rules' patterns may match any of those, so with them lines are
+# only cut after '\r'
+_LINE_BREAK_CUT_TABLE = bytes(0 if b == ord('\r') else 1 for b in range(256))
+
+def _universal_newlines(block: bytes) -> bytes:
+    """Translate '\\r\\n' and '\\r' to '\\n' the way a text-mode file does."""
+    if b'\r' not in block:
+        return block
+    if not block.isascii():
+        # Text mode decodes before translating newlines, so an invalid byte
+        # dropped between '\r' and '\n' still yields a single line break.
+        text = block.decode('utf-8', errors='ignore')
+        return text.replace('\r\n', '\n').replace('\r', '\n').encode('utf-8')
+    return block.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+def _last_line_end(f, start: int) -> int:
+    """Offset just past the last '\\n' at or after start, or start if there is none."""
+    end = f.seek(0, os.SEEK_END)
+    while end > start:
+        block_start = max(start, end - CHUNK_SIZE)
+        f.seek(block_start)
+        cut = f.read(end - block_start).rfind(b'\n')
+        if cut != -1:
+            return block_start + cut + 1
+        end = block_start
+    return start
+
+def _window_cut(data: bytes, line_start: int, cut_table: bytes = _WINDOW_CUT_TABLE) -> tuple[int, int]:
+    """
+    Where to end a block inside the over-long last line of data, which
+    starts at line_start and has no '\n': just past its last cut byte, or,
+    without one, at the end with up to WINDOW_OVERLAP bytes, but never
+    half the window, scanned again.
+    Returns (cut, bytes before the cut to scan again in the next window).
+    """
+    # Not after the final byte: a '\r' there may be half of a '\r\n'
+    cut = data.translate(cut_table).rfind(b'\0', line_start, len(data) - 1) + 1
+    if cut:
+        return cut, 0
+    return len(data), min(WINDOW_OVERLAP, (len(data) - line_start) // 2)
+
+def _next_line_start(f, offset: int) -> int:
+    """
+    Offset of the first line that starts at or after offset, or offset
+    itself if no '\n' turns up within LINE_SEARCH bytes.
+    """
+    if offset == 0:
+        return 0
+    f.seek(offset - 1)
+    cut = f.read(LINE_SEARCH).find(b'\n')
+    return offset if cut == -1 else offset + cut
 
 class StreamProcessor:
-    def __init__(self, config: dict, sinks: list[EventSink] = None):
+    def __init__(self, config: dict, sinks: list[EventSink] = None, pdf_workers: Optional[int] = None):
         self.config = config
         self.sinks = sinks or []
-        self.detectors = []
-        self.seen_hashes = set() # For deduplication
+        self.dedup = DedupStore.from_policy(config)
+        # Scan plain-text files a block at a time instead of line by line
+        self.chunked_text = config.get('scan', {}).get('chunkedText', True)
+        # Extensions with a document extractor; each is loaded when its first file comes up
+        self.extractor_specs = extractor_specs(config)
+        self._extractors = {}
+        self._extractor_config = config
+        if pdf_workers is not None:
+            scan = config.get('scan', {})
+            self._extractor_config = {**config, 'scan': {**scan, 'pdf': {**scan.get('pdf', {}), 'workers': pdf_workers}}}
+        # Rotated logs compressed with gzip, bzip2 or xz are scanned as they are decompressed
+        self.compressed_logs = config.get('scan', {}).get('compressedLogs', False)
+        # The walker can't size those, so decompression stops here
+        self.max_file_size = config.get('scan', {}).get('maxFileSizeMB', 10) * 1024 * 1024
+        # Text files over maxFileSizeMB, scanned in windows and sampled past a budget
+        self.large_files = LargeFilePolicy.from_policy(config)
+        # Reason -> number of files skipped unscanned, e.g. as binary
+        self.skipped = Counter()
         self._init_detectors()
 
     def _init_detectors(self):
-        rules = self.config.get('rules', {})
-        if rules.get('card', {}).get('enabled', False):
-            self.detectors.append(detect_credit_cards)
-        if rules.get('aadhaar', {}).get('enabled', False):
-            self.detectors.append(detect_aadhaar)
-        if rules.get('pan', {}).get('enabled', False):
-            self.detectors.append(detect_pan)
+        # All enabled rules are compiled once into a single-pass engine
+        self.engine = DetectionEngine.from_policy(self.config)
+        self._window_cuts = _LINE_BREAK_CUT_TABLE if has_custom_rules(self.config) else _WINDOW_CUT_TABLE
+
+    def _extractor(self, ext: str):
+        """
+        The extractor registered for ext, loaded on first use, or None if
+        it needs a library that isn't installed; files of that type are
+        then skipped, with a single warning.
+        """
+        try:
+            return self._extractors[ext]
+        except KeyError:
+            pass
+        extractor = None
+        try:
+            extractor = self.extractor_specs[ext].load(self._extractor_config)
+        except ImportError as e:
+            logging.warning(f"{ext} files will not be scanned: {e}")
+        self._extractors[ext] = extractor
+        return extractor
 
     def _get_content_iterator(self, file_path: str):
         """
@@ -32,55 +140,234 @@ class StreamProcessor:
         _, ext = os.path.splitext(file_path)
         ext = ext.lower()
 
-        if ext == '.docx':
-            try:
-                doc = docx.Document(file_path)
-                for i, para in enumerate(doc.paragraphs, 1):
-                    yield i, para.text
-            except Exception as e:
-                logging.error(f"Error reading docx {file_path}: {e}")
-        elif ext == '.pdf':
-            try:
-                with open(file_path, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    for i, page in enumerate(reader.pages, 1):
-                        text = page.extract_text()
-                        if text:
-                            for line_num, line in enumerate(text.splitlines(), 1):
-                                # Compounding page and line number for unique tracking
-                                yield f"p{i}:l{line_num}", line
-            except Exception as e:
-                logging.error(f"Error reading pdf {file_path}: {e}")
-        elif ext == '.xlsx':
-            try:
-                wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-                try:
-                    for sheet in wb.worksheets:
-                        for row_num, row in enumerate(sheet.iter_rows(values_only=True), 1):
-                            content = " ".join([str(cell) for cell in row if cell is not None])
-                            if content:
-                                yield f"{sheet.title}:r{row_num}", content
-                finally:
-                    wb.close()
-            except Exception as e:
-                logging.error(f"Error reading xlsx {file_path}: {e}")
-        elif ext == '.pptx':
+        if ext in self.extractor_specs:
+            extractor = self._extractor(ext)
+            if extractor is None:
+                return
             try:
-                prs = Presentation(file_path)
-                for i, slide in enumerate(prs.slides, 1):
-                    for shape_num, shape in enumerate(slide.shapes, 1):
-                        if hasattr(shape, "text"):
-                            yield f"s{i}:sh{shape_num}", shape.text
+                yield from extractor(file_path)
             except Exception as e:
-                logging.error(f"Error reading pptx {file_path}: {e}")
-        elif ext == '.doc':
-            logging.warning(f"File {file_path} is in .doc format. Only .docx is currently supported for Word documents.")
+                logging.error(f"Error reading {ext[1:]} {file_path}: {e}")
         else:
             # Default text processing
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line_num, line in enumerate(f, 1):
+            with open(file_path, 'rb') as f:
+                sniffed = self._sniff(file_path, f.read(SNIFF_SIZE))
+                if sniffed is None:
+                    return
+                f.seek(0)
+                text = io.TextIOWrapper(f, encoding=sniffed.encoding, errors='ignore')
+                for line_num, line in enumerate(text, 1):
                     yield line_num, line
 
+    def sniff_file(self, file_path: str):
+        """How to decode a text file (a Sniff), or None, counted in skipped, if it is binary."""
+        with open(file_path, 'rb') as f:
+            return self._sniff(file_path, f.read(SNIFF_SIZE))
+
+    def _sniff(self, file_path: str, head: bytes):
+        """How to decode a text file that starts with head, or None (and a count) if it is binary."""
+        sniffed = sniff(head)
+        if sniffed.skip_reason is not None:
+            self.skipped[sniffed.skip_reason] += 1
+            logging.debug(f"Skipping {file_path}: {sniffed.skip_reason}")
+            return None
+        return sniffed
+
+    def _iter_findings(self, file_path: str):
+        """
+        Yields (line_num, hit) for every detection in the file.
+        """
+        _, ext = os.path.splitext(file_path)
+        if self.compressed_logs and ext.lower() in COMPRESSED_EXTENSIONS:
+            yield from self._scan_compressed(file_path)
+            return
+        spec = self.extractor_specs.get(ext.lower())
+        if spec is None and (self.chunked_text or self._is_large(file_path)):
+            yield from self._scan_text_file(file_path)
+            return
+        if spec is not None and spec.rows:
+            yield from self._scan_rows(self._get_content_iterator(file_path))
+            return
+
+        for line_num, line_content in self._get_content_iterator(file_path):
+            if isinstance(line_content, PartialScan):
+                yield line_num, line_content.to_hit()
+                continue
+            line_content = line_content.strip()
+            if not line_content:
+                continue
+            for hit in self.engine.detect(line_content):
+                yield line_num, hit
+
+    def _is_large(self, file_path: str) -> bool:
+        return self.large_files.enabled and os.path.getsize(file_path) > self.max_file_size
+
+    def _coverage(self, file_path: str) -> str:
+        """Whether findings in a file come from reading all of it, decided up front from its size."""
+        if not self.large_files.budget or os.path.splitext(file_path)[1].lower() in self.extractor_specs:
+            return FULL_COVERAGE
+        try:
+            return SAMPLED_COVERAGE if self.large_files.samples(os.path.getsize(file_path)) else FULL_COVERAGE
+        except OSError:
+            return FULL_COVERAGE
+
+    def _scan_text_file(self, file_path: str):
+        with open(file_path, 'rb') as f:
+            # The first block is read once, to sniff and then to scan
+            head = f.read(SNIFF_SIZE)
+            sniffed = self._sniff(file_path, head)
+            if sniffed is None:
+                return
+            size = os.fstat(f.fileno()).st_size
+            if self.large_files.samples(size):
+                yield from self._scan_samples(file_path, f, size, sniffed.encoding, head)
+            elif sniffed.encoding == 'utf-8':
+                yield from self._scan_text_stream(f, head=head)
+            else:
+                yield from self._scan_text_stream(TranscodingReader(f, sniffed.encoding, head))
+
+    def _scan_samples(self, file_path: str, f, size: int, encoding: str, head: bytes):
+        """
+        Scan the regions the large file policy picks from a text file over
+        its budget, aligned to whole lines, then yield a PartialScan saying
+        how much was read. Files in other encodings than UTF-8 are read
+        from the start up to the budget instead.
+        """
+        budget = self.large_files.budget
+        if encoding != 'utf-8':
+            next_line = yield from self._scan_text_stream(
+                TranscodingReader(f, encoding, head, limit=max(budget - len(head), 0)))
+            yield next_line, PartialScan(
+                f"Large file sampled: first {budget / MB:g} MB of {size / MB:.0f} MB scanned").to_hit()
+            return
+
+        scanned = 0
+        gap = None
+        end = 0
+        for start, stop in self.large_files.regions(size):
+            start = max(_next_line_start(f, start), end)
+            if start > end and gap is None:
+                gap = end
+            end = _next_line_start(f, stop) if stop < size else size
+            if start >= end:
+                end = max(end, start)
+                continue
+            f.seek(start)
+            stream = self._scan_text_stream(f, limit=end - start)
+            if start == 0:
+                yield from stream
+            else:
+                for line_num, hit in stream:
+                    yield f"b{start}:l{line_num}", hit
+            scanned += end - start
+        reason = (f"Large file sampled: {scanned / MB:.0f} of {size / MB:.0f} MB scanned "
+                  f"(budget {budget / MB:g} MB, head, tail and stride windows)")
+        yield f"b{gap if gap is not None else end}", PartialScan(reason).to_hit()
+
+    def _scan_compressed(self, file_path: str):
+        """
+        Scan a compressed text file as it is decompressed, up to
+        maxFileSizeMB of its contents; a file cut short there ends with a
+        PartialScan. Findings keep the compressed file's path.
+        """
+        try:
+            f = open_decompressed(file_path)
+        except ImportError as e:
+            self.skipped[f"compressed ({e})"] += 1
+            return
+        with f:
+            head = f.read(SNIFF_SIZE)
+            sniffed = self._sniff(file_path, head)
+            if sniffed is None:
+                return
+            limit = max(self.max_file_size - len(head), 0)
+            if sniffed.encoding == 'utf-8':
+                next_line = yield from self._scan_text_stream(f, limit=limit, head=head)
+            else:
+                next_line = yield from self._scan_text_stream(TranscodingReader(f, sniffed.encoding, head, limit))
+            if f.read(1):
+                reason = f"Decompressed size is over maxFileSizeMB: first {self.max_file_size / (1024 * 1024):g} MB scanned"
+                yield next_line, PartialScan(reason).to_hit()
+
+    def _scan_rows(self, rows):
+        """
+        Scan (locator, text) rows with detect_buffer(), ROW_BATCH_CHARS at a
+        time, rather than calling detect() once per row. Newlines inside a
+        row become tabs so it stays one buffer line; the built-in patterns
+        treat the two alike.
+        """
+        locators = []
+        lines = []
+        size = 0
+        for locator, content in rows:
+            content = content.strip()
+            if not content:
+                continue
+            locators.append(locator)
+            lines.append(content.replace('\n', '\t'))
+            size += len(content) + 1
+            if size >= ROW_BATCH_CHARS:
+                for line_index, hit in self.engine.detect_buffer('\n'.join(lines)):
+                    yield locators[line_index], hit
+                locators, lines, size = [], [], 0
+        if lines:
+            for line_index, hit in self.engine.detect_buffer('\n'.join(lines)):
+                yield locators[line_index], hit
+
+    def _scan_text_stream(self, f, first_line: int = 1, limit: int = None, head: bytes = b''):
+        """
+        Scan a binary text stream in large blocks, reading at most limit bytes
+        after head, the bytes already read from it. A TranscodingReader
+        limits itself instead: what it returns isn't what it reads.
+        Yields (line_num, hit) exactly as the line-by-line text branch of
+        _get_content_iterator would, numbering lines from first_line, and
+        returns the number of the line after the last one read.
+
+        Each block is cut at its last '\\n' byte, which never occurs inside a
+        UTF-8 sequence, so no line or character is split between blocks.
+        Only lines with a candidate are ever decoded.
+
+        A line longer than WINDOW_SIZE is cut into windows, after a byte
+        no match can span (see _WINDOW_CUTS), so memory stays bounded with
+        the same findings. A window with no such byte is cut anywhere and
+        overlaps the next by WINDOW_OVERLAP bytes; hits the next one finds
+        again at the start of that line are dropped.
+        """
+        pending = head
+        line_base = first_line
+        carried = None  # (rule, digest) of hits on the last line of an overlapping window
+        while True:
+            if limit is None:
+                data = f.read(CHUNK_SIZE)
+            else:
+                data = f.read(min(CHUNK_SIZE, limit)) if limit > 0 else b''
+                limit -= len(data)
+            final = not data
+            data = pending + data
+            overlap = 0
+            if final:
+                block, pending = data, b''
+            else:
+                cut = data.rfind(b'\n') + 1
+                if len(data) - cut > WINDOW_SIZE:
+                    cut, overlap = _window_cut(data, cut, self._window_cuts)
+                block, pending = data[:cut], data[cut - overlap:]
+
+            if block:
+                block = _universal_newlines(block)
+                last_line = block.count(b'\n')
+                seen, carried = carried, (set() if overlap else None)
+                for line_index, hit in self.engine.detect_block(block):
+                    if seen and line_index == 0 and (hit.rule, hit.digest) in seen:
+                        continue
+                    if carried is not None and line_index == last_line:
+                        carried.add((hit.rule, hit.digest))
+                    yield line_base + line_index, hit
+                line_base += last_line
+
+            if final:
+                return line_base
+
     def process_file(self, file_path: str) -> int:
         """
         Process a file and emit findings to sinks.
@@ -88,37 +375,101 @@ class StreamProcessor:
         """
         findings_count = 0
         try:
-            for line_num, line_content in self._get_content_iterator(file_path):
-                line_content = line_content.strip()
-                if not line_content:
-                    continue
-                    
-                for detector in self.detectors:
-                    file_events = detector(line_content)
-                    for event in file_events:
-                        # Populate source info
-                        event.source = {
-                            "type": "file",
-                            "path": file_path,
-                            "line": line_num
-                        }
-                        
-                        # Deduplication check
-                        # Key: hash + rule + file + line
-                        dedup_key = f"{event.hash}:{event.rule}:{file_path}:{line_num}"
-                        
-                        if dedup_key in self.seen_hashes:
-                            continue
-                            
-                        self.seen_hashes.add(dedup_key)
-                        
-                        # Emit to all sinks
-                        for sink in self.sinks:
-                            sink.emit(event)
-                            
-                        findings_count += 1
+            coverage = self._coverage(file_path)
+            for line_num, hit in self._iter_findings(file_path):
+                if self._emit(file_path, line_num, hit, coverage):
+                    findings_count += 1
                             
         except Exception as e:
             logging.error(f"Error processing file {file_path}: {str(e)}")
             
         return findings_count
+
+    def scan_file(self, file_path: str) -> tuple[list[Finding], bool]:
+        """
+        Scan a file without emitting anything.
+        Returns (findings, complete): compact Finding records to pass to
+        emit_findings(), and False if an error or a budget (a PartialScan
+        finding) cut the scan short, in which case the findings are those
+        made before it.
+        """
+        findings = []
+        complete = True
+        try:
+            coverage = self._coverage(file_path)
+            for line_num, hit in self._iter_findings(file_path):
+                findings.append(Finding(line_num, hit.rule, hit.severity, hit.masked_value, hit.digest.hex(), coverage))
+                if hit.rule == PARTIAL_SCAN_RULE:
+                    complete = False
+        except Exception as e:
+            logging.error(f"Error processing file {file_path}: {str(e)}")
+            return findings, False
+        return findings, complete
+
+    def scan_appended(self, file_path: str, offset: int = 0, first_line: int = 1) -> tuple[list[Finding], int, int]:
+        """
+        Scan the complete lines of a text file from byte offset on, where
+        offset is the start of line number first_line.
+        Returns (findings, end_offset, next_line); pass the last two back in
+        to scan only what was appended since. A trailing line without its
+        '\\n' is left for a later call, once the writer has finished it.
+        The bytes are read as UTF-8; check other files with sniff_file() first.
+        """
+        findings = []
+        with open(file_path, 'rb') as f:
+            end = _last_line_end(f, offset)
+            f.seek(offset)
+            stream = self._scan_text_stream(f, first_line, limit=end - offset)
+            while True:
+                try:
+                    line_num, hit = next(stream)
+                except StopIteration as done:
+                    next_line = done.value
+                    break
+                findings.append(Finding(line_num, hit.rule, hit.severity, hit.masked_value, hit.digest.hex()))
+        return findings, end, next_line
+
+    def emit_findings(self, file_path: str, findings: list[Finding]) -> int:
+        """
+        Deduplicate and emit findings produced by scan_file().
+        Returns the count of findings emitted.
+        """
+        findings_count = 0
+        for finding in findings:
+            hit = Hit(finding.rule, finding.severity, finding.masked_value, bytes.fromhex(finding.hash))
+            if self._emit(file_path, finding.line, hit, finding.coverage):
+                findings_count += 1
+        return findings_count
+
+    def close(self):
+        """Close the extractors loaded so far, such as the PDF page pool."""
+        for extractor in self._extractors.values():
+            if hasattr(extractor, 'close'):
+                extractor.close()
+
+    def _emit(self, file_path: str, line_num, hit: Hit, coverage: str = FULL_COVERAGE) -> bool:
+        """
+        Send one hit to the sinks unless it is a duplicate.
+        Returns True if it was emitted.
+        """
+        # Deduplication check on the raw digest, before any event exists
+        digest = hit.digest
+        if hit.rule == PARTIAL_SCAN_RULE:
+            # Every file reports its own, whatever the dedup scope
+            digest = digest_value(f"{file_path}\0{hit.masked_value}")
+        if self.dedup.seen(digest, hit.rule, file_path, line_num):
+            return False
+
+        if self.sinks:
+            # Populate source info
+            event = DetectionEvent.from_hit(hit, {
+                "type": "file",
+                "path": file_path,
+                "line": line_num,
+                "coverage": coverage
+            })
+            # Emit to all sinks
+            for sink in self.sinks:
+                sink.emit(event)
+            
+        return True
@@ -0,0 +1,329 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import stat
+import struct
+import time
+from typing import NamedTuple, Optional
+from dlp_agent.events.model import Finding
+from dlp_agent.scanner.file_walker import FileWalker
+from dlp_agent.scanner.stream_processor import CHUNK_SIZE, StreamProcessor, _last_line_end, _universal_newlines
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+# Text files that are usually only ever appended to; only new bytes are scanned
+TAIL_EXTENSIONS = {'.log', '.txt'}
+
+# A file written to continuously is still scanned this many debounce periods after its first write
+MAX_DELAY_FACTOR = 10
+
+# Longest time to block waiting for events, so a stop request is noticed
+POLL_INTERVAL = 1.0
+
+# Bytes kept from just before a tail offset to detect a file rewritten in place
+TAIL_MARK_SIZE = 64
+
+class Inotify:
+    """Minimal ctypes binding for Linux inotify."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read_events(self, timeout: Optional[float]) -> list[tuple[int, int, str]]:
+        """Wait up to timeout seconds. Returns (wd, mask, name) tuples."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b'\0'))
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+class _Tail(NamedTuple):
+    inode: int
+    offset: int     # Start of the first line not scanned yet
+    next_line: int  # Its line number
+    mark: bytes     # Last bytes before offset, to detect in-place rewrites
+    encoding: Optional[str]  # As sniffed when the file was first seen; None if it is binary
+
+def _count_lines(f, end: int) -> int:
+    """Number of lines, as a text-mode file counts them, in the first end bytes."""
+    f.seek(0)
+    count = 0
+    pending = b''
+    remaining = end
+    while remaining:
+        block = f.read(min(CHUNK_SIZE, remaining))
+        data = pending + block
+        remaining = end - f.tell() if block else 0
+        cut = data.rfind(b'\n') + 1 if remaining else len(data)
+        count += _universal_newlines(data[:cut]).count(b'\n')
+        pending = data[cut:]
+    return count
+
+class Watcher:
+    """
+    Watches a directory tree with inotify and rescans files as they change.
+
+    Every directory the FileWalker would descend into is watched, and files
+    are filtered with its extension and size rules. Bursts of events for
+    one file are debounced: it is scanned once no event arrived for
+    `debounce` seconds, or at the latest MAX_DELAY_FACTOR periods after the
+    first one. Append-only .log/.txt files are tailed: only the complete
+    lines added since the last scan are read, with line numbers carried
+    over. Tailed files are sniffed when first seen, like any text file:
+    binary ones are skipped, and those in other encodings than UTF-8 are
+    scanned in full on every change. A file that shrank, was replaced by another inode or rewritten in
+    place is scanned again from the start. Findings go through the
+    processor, so its deduplication suppresses anything reported before.
+    """
+
+    def __init__(self, walker: FileWalker, processor: StreamProcessor, debounce: float = 1.0):
+        self.walker = walker
+        self.processor = processor
+        self.debounce = debounce
+        self.scanned_files = 0
+        # Files whose scan was cut short, by an error or a budget
+        self.failed_files = 0
+        self.total_findings = 0
+        self.scanned_bytes = 0
+        self.full_rescans = 0
+        self._inotify = None
+        self._root = None
+        self._dirs = {}   # wd -> directory path
+        self._tails = {}  # path -> _Tail
+        self._due = {}    # path -> (first event time, last event time)
+
+    def run(self, root: str, stop=None):
+        """
+        Scan root, then watch it until stop (a threading.Event) is set
+        or KeyboardInterrupt.
+        """
+        self._root = root
+        self._inotify = Inotify()
+        try:
+            # Watches are added before files are scanned, so no write is missed
+            self._watch_tree(root)
+            while stop is None or not stop.is_set():
+                for wd, mask, name in self._inotify.read_events(self._timeout()):
+                    self._handle(wd, mask, name)
+                self._scan_due()
+        finally:
+            self._inotify.close()
+            self._inotify = None
+            self._dirs.clear()
+
+    def _watch_tree(self, top: str):
+        """Watch top and every non-excluded directory below it, scanning their files."""
+        for root, dirs, files in os.walk(top):
+            dirs[:] = [d for d in dirs if self.walker.should_descend(os.path.join(root, d))]
+            try:
+                self._dirs[self._inotify.add_watch(root, WATCH_MASK)] = root
+            except OSError as e:
+                logging.error(f"Cannot watch {root}: {e}")
+                dirs[:] = []
+                continue
+            for file in files:
+                self._scan(os.path.join(root, file))
+
+    def _handle(self, wd: int, mask: int, name: str):
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost; tails keep the rescan cheap for logs
+            logging.warning("inotify queue overflowed, rescanning the watched tree")
+            self._watch_tree(self._root)
+            return
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)
+            return
+        directory = self._dirs.get(wd)
+        if directory is None or not name:
+            return
+        path = os.path.join(directory, name)
+
+        if mask & IN_ISDIR:
+            if mask & IN_MOVED_FROM:
+                self._unwatch(path)
+            elif mask & (IN_CREATE | IN_MOVED_TO) and self.walker.should_descend(path):
+                self._watch_tree(path)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self._tails.pop(path, None)
+            self._due.pop(path, None)
+        else:
+            now = time.monotonic()
+            first, _ = self._due.get(path, (now, now))
+            self._due[path] = (first, now)
+
+    def _unwatch(self, directory: str):
+        """Forget a directory that was moved away, along with everything below it."""
+        prefix = directory + os.sep
+        for wd, path in list(self._dirs.items()):
+            if path == directory or path.startswith(prefix):
+                self._inotify.rm_watch(wd)
+                del self._dirs[wd]
+        for path in [p for p in self._tails if p.startswith(prefix)]:
+            del self._tails[path]
+        for path in [p for p in self._due if p.startswith(prefix)]:
+            del self._due[path]
+
+    def _deadline(self, first: float, last: float) -> float:
+        return min(last + self.debounce, first + self.debounce * MAX_DELAY_FACTOR)
+
+    def _timeout(self) -> float:
+        if not self._due:
+            return POLL_INTERVAL
+        deadline = min(self._deadline(first, last) for first, last in self._due.values())
+        return min(POLL_INTERVAL, max(0.0, deadline - time.monotonic()))
+
+    def _scan_due(self):
+        now = time.monotonic()
+        due = [path for path, times in self._due.items() if self._deadline(*times) <= now]
+        for path in due:
+            del self._due[path]
+            self._scan(path)
+
+    def _scan(self, file_path: str):
+        ext = os.path.splitext(file_path)[1].lower()
+        # Tailed files over the size limit are still followed
+        tailed = ext in TAIL_EXTENSIONS and ext in self.walker.allowed_extensions
+        if not tailed and not self.walker.should_scan_file(file_path):
+            return
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self._tails.pop(file_path, None)
+            return
+        if not stat.S_ISREG(st.st_mode):
+            return
+
+        try:
+            if tailed:
+                findings, complete = self._scan_tail(file_path, st)
+            else:
+                findings, complete = self.processor.scan_file(file_path)
+                self.scanned_bytes += st.st_size
+        except OSError as e:
+            logging.error(f"Error processing file {file_path}: {e}")
+            return
+        # A scan cut short leaves no tail behind, so the next change scans it again in full
+        if complete:
+            self.scanned_files += 1
+        else:
+            self.failed_files += 1
+        self.total_findings += self.processor.emit_findings(file_path, findings)
+
+    def _scan_tail(self, file_path: str, st: os.stat_result) -> tuple[list[Finding], bool]:
+        """
+        Scan the lines appended to a file since it was last seen.
+        Returns (findings, complete) as StreamProcessor.scan_file() does.
+        """
+        tail = self._tails.get(file_path)
+        if tail is not None and not self._appended_to(file_path, st, tail):
+            # Truncated, rotated or rewritten: start over
+            self.full_rescans += 1
+            tail = None
+
+        if tail is None:
+            if not st.st_size:
+                # Nothing to sniff yet
+                return [], True
+            sniffed = self.processor.sniff_file(file_path)
+            encoding = sniffed.encoding if sniffed is not None else None
+            if encoding == 'utf-8' and st.st_size > self.walker.max_file_size:
+                # Too big to scan in full, like the walker would skip it;
+                # only what gets appended from now on is scanned
+                with open(file_path, 'rb') as f:
+                    end = _last_line_end(f, 0)
+                    self._tails[file_path] = _Tail(st.st_ino, end, _count_lines(f, end) + 1, self._mark(f, end),
+                                                   encoding)
+                return [], True
+            tail = _Tail(st.st_ino, 0, 1, b'', encoding)
+
+        if tail.encoding != 'utf-8':
+            # Binary files stay skipped. Other encodings can't be scanned from
+            # a byte offset on, so the whole file is scanned again, and
+            # deduplication drops what was reported before
+            findings, complete = [], True
+            if tail.encoding is not None and self.walker.should_scan_file(file_path):
+                findings, complete = self.processor.scan_file(file_path)
+                self.scanned_bytes += st.st_size
+            if complete:
+                with open(file_path, 'rb') as f:
+                    self._tails[file_path] = _Tail(st.st_ino, st.st_size, 1, self._mark(f, st.st_size), tail.encoding)
+            else:
+                self._tails.pop(file_path, None)
+            return findings, complete
+
+        findings, end, next_line = self.processor.scan_appended(file_path, tail.offset, tail.next_line)
+        self.scanned_bytes += end - tail.offset
+        mark = tail.mark
+        if end != tail.offset:
+            with open(file_path, 'rb') as f:
+                mark = self._mark(f, end)
+        self._tails[file_path] = _Tail(st.st_ino, end, next_line, mark, tail.encoding)
+        return findings, True
+
+    def _appended_to(self, file_path: str, st: os.stat_result, tail: _Tail) -> bool:
+        if st.st_ino != tail.inode or st.st_size < tail.offset:
+            return False
+        with open(file_path, 'rb') as f:
+            return self._mark(f, tail.offset) == tail.mark
+
+    @staticmethod
+    def _mark(f, offset: int) -> bytes:
+        start = max(0, offset - TAIL_MARK_SIZE)
+        f.seek(start)
+        return f.read(offset - start)
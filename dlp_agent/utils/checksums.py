@@ -1,25 +1,42 @@
+from typing import Optional, Sequence
+
+# NumPy is optional, and slow enough to import that it waits for the first
+# batch big enough to use it: None until then, False if it isn't installed,
+# in which case the batch functions fall back to pure Python
+np = None
+
+# Batches smaller than this are validated in pure Python, where NumPy's
+# per-call overhead would outweigh the vectorized arithmetic
+NUMPY_MIN_BATCH = 64
+
+# b'0'..b'9' -> 0..9, and the Luhn doubled value of each digit (2d, minus 9 above 9)
+_DIGIT_VALUES = bytes.maketrans(b'0123456789', bytes(range(10)))
+_LUHN_DOUBLED = bytes.maketrans(b'0123456789', bytes([0, 2, 4, 6, 8, 1, 3, 5, 7, 9]))
+
+def _ascii_digits(number: str) -> Optional[bytes]:
+    """
+    The digits of number as ASCII bytes, or None if it isn't all digits.
+    Other Unicode decimal digits (which \\d matches) are converted the way
+    int() reads them.
+    """
+    if not number.isdigit():
+        return None
+    if not number.isascii():
+        number = ''.join(str(int(char)) for char in number)
+    return number.encode('ascii')
+
 def luhn_check(number: str) -> bool:
     """
     Validate a number using the Luhn algorithm.
     Input should be a string of digits.
     """
-    if not number.isdigit():
+    digits = _ascii_digits(number)
+    if digits is None:
         return False
-        
-    digits = [int(d) for d in number]
-    checksum = 0
-    reverse_digits = digits[::-1]
-    
-    for i, digit in enumerate(reverse_digits):
-        if i % 2 == 1:
-            doubled = digit * 2
-            if doubled > 9:
-                doubled -= 9
-            checksum += doubled
-        else:
-            checksum += digit
-            
-    return checksum % 10 == 0
+    # Counting from the right, odd positions add their digit and even ones the doubled digit
+    plain = digits[::-1][::2]
+    doubled = digits[-2::-2].translate(_LUHN_DOUBLED)
+    return (sum(plain) - 48 * len(plain) + sum(doubled)) % 10 == 0
 
 # Verhoeff Algorithm Tables
 VERHOEFF_D = [
@@ -48,18 +65,113 @@ VERHOEFF_P = [
 
 VERHOEFF_INV = [0, 4, 3, 2, 1, 5, 6, 7, 8, 9]
 
+# Flat Verhoeff step table: VERHOEFF_D[c][VERHOEFF_P[i % 8][d]] at (i % 8) * 100 + c * 10 + d
+_VERHOEFF_STEP = bytes(VERHOEFF_D[c][VERHOEFF_P[i][d]] for i in range(8) for c in range(10) for d in range(10))
+# Two steps at once, from an even position: at (i % 8 // 2) * 1000 + c * 100 + d1 * 10 + d2
+_VERHOEFF_PAIR = bytes(_VERHOEFF_STEP[(i + 1) * 100 + _VERHOEFF_STEP[i * 100 + c * 10 + d1] * 10 + d2]
+                       for i in range(0, 8, 2) for c in range(10) for d1 in range(10) for d2 in range(10))
+
 def verhoeff_check(number: str) -> bool:
     """
     Validate a number using the Verhoeff algorithm.
     Input should be a string of digits.
     """
-    if not number.isdigit():
+    digits = _ascii_digits(number)
+    if digits is None:
         return False
-        
+
+    pair = _VERHOEFF_PAIR
+    values = digits[::-1].translate(_DIGIT_VALUES)
+    length = len(values)
     c = 0
-    reversed_number = number[::-1]
-    
-    for i, char in enumerate(reversed_number):
-        c = VERHOEFF_D[c][VERHOEFF_P[i % 8][int(char)]]
-        
+    for i in range(0, length - 1, 2):
+        c = pair[(i & 6) * 500 + c * 100 + values[i] * 10 + values[i + 1]]
+    if length & 1:
+        c = _VERHOEFF_STEP[((length - 1) & 7) * 100 + c * 10 + values[-1]]
+
     return c == 0
+
+def _by_length(numbers: Sequence[str]) -> dict[int, list[int]]:
+    """Group the indexes of numbers by length."""
+    groups = {}
+    for i, number in enumerate(numbers):
+        groups.setdefault(len(number), []).append(i)
+    return groups
+
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = False
+    return np
+
+def _digit_matrix(numbers: Sequence[str], indexes: list[int], length: int):
+    """
+    Digits of equally long numbers as a (len(indexes), length) array,
+    rightmost digit first, or None if any of them isn't plain ASCII digits.
+    """
+    data = ''.join([numbers[i] for i in indexes])
+    if not (data.isascii() and data.isdigit()):
+        return None
+    matrix = np.frombuffer(data.encode('ascii'), dtype=np.uint8).reshape(len(indexes), length)
+    return (matrix[:, ::-1] - 48).astype(np.intp)
+
+_NP_TABLES = None
+
+def _np_tables():
+    global _NP_TABLES
+    if _NP_TABLES is None:
+        _NP_TABLES = (
+            np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.intp),
+            np.array(VERHOEFF_D, dtype=np.intp),
+            np.array(VERHOEFF_P, dtype=np.intp),
+        )
+    return _NP_TABLES
+
+def luhn_check_many(numbers: Sequence[str]) -> list[bool]:
+    """
+    luhn_check() for each of numbers, as a list of bools in the same order.
+    Vectorized with NumPy, when it is installed and the batch is large enough.
+    """
+    if len(numbers) < NUMPY_MIN_BATCH or not _numpy():
+        return [luhn_check(number) for number in numbers]
+
+    doubled_table = _np_tables()[0]
+    results = [False] * len(numbers)
+    for length, indexes in _by_length(numbers).items():
+        matrix = _digit_matrix(numbers, indexes, length) if length else None
+        if matrix is None:
+            for i in indexes:
+                results[i] = luhn_check(numbers[i])
+            continue
+        total = matrix[:, ::2].sum(axis=1) + doubled_table[matrix[:, 1::2]].sum(axis=1)
+        for i, valid in zip(indexes, (total % 10 == 0).tolist()):
+            results[i] = valid
+    return results
+
+def verhoeff_check_many(numbers: Sequence[str]) -> list[bool]:
+    """
+    verhoeff_check() for each of numbers, as a list of bools in the same order.
+    Vectorized with NumPy, when it is installed and the batch is large enough.
+    """
+    if len(numbers) < NUMPY_MIN_BATCH or not _numpy():
+        return [verhoeff_check(number) for number in numbers]
+
+    _, d_table, p_table = _np_tables()
+    results = [False] * len(numbers)
+    for length, indexes in _by_length(numbers).items():
+        matrix = _digit_matrix(numbers, indexes, length) if length else None
+        if matrix is None:
+            for i in indexes:
+                results[i] = verhoeff_check(numbers[i])
+            continue
+        c = np.zeros(len(indexes), dtype=np.intp)
+        # One step per digit position, applied to every number at once
+        for i in range(length):
+            c = d_table[c, p_table[i % 8][matrix[:, i]]]
+        for i, valid in zip(indexes, (c == 0).tolist()):
+            results[i] = valid
+    return results
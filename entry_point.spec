@@ -6,7 +6,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # Extractors are imported by name when their first file is scanned, which analysis can't follow
+    hiddenimports=['dlp_agent.scanner.ooxml', 'dlp_agent.scanner.pdf'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,18 @@
+import pytest
+
+class CollectingSink:
+    """Keeps the events it is sent, in order."""
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def flush(self):
+        pass
+
+@pytest.fixture
+def collecting_sink():
+    """Makes a new CollectingSink on each call."""
+    return CollectingSink
@@ -0,0 +1,107 @@
+import json
+from click.testing import CliRunner
+from dlp_agent.main import main
+from dlp_agent.scanner.checkpoint import CHECKPOINT_VERSION
+from dlp_agent.scanner.file_walker import FileWalker
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+TEST_CONFIG = {
+    "scan": {
+        "maxFileSizeMB": 1,
+        "allowedExtensions": [".txt"],
+        "excludedPaths": []
+    },
+    "rules": {
+        "card": { "enabled": True },
+        "pan": { "enabled": True }
+    }
+}
+
+def _make_tree(root):
+    for i, sub in enumerate(["", "a", "a/b", "c", "c/d", "c/e"]):
+        directory = root / sub
+        directory.mkdir(parents=True, exist_ok=True)
+        for j in range(3):
+            (directory / f"f{j}.txt").write_text(f"file {i}.{j}\ncard 4532 0151 1283 0368\nPAN ABCDE1234F\n")
+
+def test_walk_resumes_after_any_file(tmp_path):
+    _make_tree(tmp_path)
+    walker = FileWalker(TEST_CONFIG)
+    paths = list(walker.walk(str(tmp_path)))
+    assert len(paths) == 18
+    # A directory's files come before its subdirectories
+    assert paths[:4] == [str(tmp_path / "f0.txt"), str(tmp_path / "f1.txt"),
+                         str(tmp_path / "f2.txt"), str(tmp_path / "a" / "f0.txt")]
+    for i, path in enumerate(paths):
+        assert list(walker.walk(str(tmp_path), start_after=path)) == paths[i + 1:]
+
+def _events(json_out):
+    with open(json_out) as f:
+        return [(e["source"]["path"], e["source"]["line"], e["rule"]) for e in map(json.loads, f)]
+
+def test_resume_continues_without_duplicates(tmp_path, monkeypatch):
+    tree = tmp_path / "tree"
+    _make_tree(tree)
+    policy = tmp_path / "policy.json"
+    policy.write_text(json.dumps(TEST_CONFIG))
+    runner = CliRunner()
+
+    expected_out = tmp_path / "expected.json"
+    result = runner.invoke(main, ["--scan-dir", str(tree), "--policy", str(policy), "--json-out", str(expected_out)])
+    assert result.exit_code == 0
+
+    # Kill the scan while it's scanning the eighth file
+    scan_file = StreamProcessor.scan_file
+    calls = []
+    killed = []
+    def flaky_scan_file(self, file_path):
+        calls.append(file_path)
+        if len(calls) == 8 and not killed:
+            killed.append(file_path)
+            raise RuntimeError("killed")
+        return scan_file(self, file_path)
+    monkeypatch.setattr(StreamProcessor, "scan_file", flaky_scan_file)
+
+    out = tmp_path / "out.json"
+    checkpoint = tmp_path / "scan.ckpt"
+    args = ["--scan-dir", str(tree), "--policy", str(policy), "--json-out", str(out),
+            "--checkpoint", str(checkpoint), "--checkpoint-interval", "0"]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 1
+    state = json.loads(checkpoint.read_text())
+    assert state["frontier"] == calls[6]
+    # Simulate an event written after the last checkpoint, cut off mid-line
+    with open(out, "a") as f:
+        f.write('{"rule": "PAN", "source": {"pa')
+
+    calls.clear()
+    result = runner.invoke(main, args + ["--resume"])
+    assert result.exit_code == 0, result.output
+    assert len(calls) == 11
+    assert _events(out) == _events(expected_out)
+    assert "Scanned 18 files. Found 36 issues." in result.output
+    # A finished scan leaves nothing to resume
+    assert not checkpoint.exists()
+
+def test_resume_rejects_other_root(tmp_path):
+    (tmp_path / "one").mkdir()
+    (tmp_path / "two").mkdir()
+    checkpoint = tmp_path / "scan.ckpt"
+    checkpoint.write_text(json.dumps({"version": CHECKPOINT_VERSION, "root": str(tmp_path / "one"), "policy": "x",
+                                      "frontier": None, "completed": [], "scanned_files": 0,
+                                      "total_findings": 0, "sinks": []}))
+    result = CliRunner().invoke(main, ["--scan-dir", str(tmp_path / "two"), "--checkpoint", str(checkpoint), "--resume"])
+    assert result.exit_code == 1
+    assert "different scan root" in result.output
+
+def test_resume_rejects_older_format(tmp_path):
+    checkpoint = tmp_path / "scan.ckpt"
+    # Version 1 saved JsonSink positions as a plain byte offset
+    checkpoint.write_text(json.dumps({"version": 1, "root": str(tmp_path), "policy": "x", "frontier": None,
+                                      "completed": [], "scanned_files": 0, "total_findings": 0,
+                                      "sinks": [{"type": "CliSink", "position": None},
+                                                {"type": "JsonSink", "position": 1234}]}))
+    result = CliRunner().invoke(main, ["--scan-dir", str(tmp_path), "--checkpoint", str(checkpoint), "--resume",
+                                       "--json-out", str(tmp_path / "out.json")])
+    assert result.exit_code == 1
+    assert "unsupported format" in result.output
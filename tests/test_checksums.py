@@ -0,0 +1,32 @@
+import random
+import pytest
+from dlp_agent.utils import checksums
+from dlp_agent.utils.checksums import luhn_check, luhn_check_many, verhoeff_check, verhoeff_check_many
+
+def test_known_values():
+    assert luhn_check("4532015112830366")
+    assert luhn_check("378282246310005")
+    assert not luhn_check("4532015112830367")
+    assert not luhn_check("4532-0151")
+    assert not luhn_check("")
+    assert verhoeff_check("999999990019")
+    assert verhoeff_check("2363")
+    assert not verhoeff_check("999999990018")
+    # Other Unicode decimal digits count like their ASCII forms
+    assert luhn_check("٣٧٨٢٨٢٢٤٦٣١٠٠٠٥")
+    assert verhoeff_check("٢٣٦٣")
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_batch_matches_single_checks(monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(checksums, "np", False)
+    elif not checksums._numpy():
+        pytest.skip("NumPy not installed")
+    rng = random.Random(7)
+    alphabet = "0123456789" * 6 + "٣x "
+    numbers = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20))) for _ in range(5000)]
+    numbers += ["4532015112830366", "999999990019"] * 50
+
+    assert luhn_check_many(numbers) == [luhn_check(number) for number in numbers]
+    assert verhoeff_check_many(numbers) == [verhoeff_check(number) for number in numbers]
+    assert luhn_check_many([]) == verhoeff_check_many([]) == []
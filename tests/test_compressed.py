@@ -0,0 +1,64 @@
+import bz2
+import gzip
+import lzma
+import pytest
+from dlp_agent.events.model import PARTIAL_SCAN_RULE
+from dlp_agent.scanner.compressed import inner_extension
+from dlp_agent.scanner.file_walker import FileWalker
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+CONFIG = {
+    "rules": {"card": {"enabled": True}, "pan": {"enabled": True}},
+    "scan": {"allowedExtensions": [".log", ".tar"], "compressedLogs": True, "maxFileSizeMB": 1},
+}
+TEXT = b"start\ncard 4532 0151 1283 0366\r\n" + b"filler line\n" * 1000 + b"PAN ABCDE1234F\n"
+
+@pytest.mark.parametrize("name, expected", [
+    ("app.log.gz", ".log"), ("app.log.3.gz", ".log"), ("app.LOG.12.BZ2", ".log"),
+    ("app.log-20240101.xz", ".log"), ("syslog.2.gz", ""), ("backup.tar.gz", ".tar"), ("app.log", None),
+])
+def test_inner_extension(name, expected):
+    assert inner_extension(name) == expected
+
+def test_walker_yields_compressed_logs_only_when_enabled(tmp_path):
+    for name in ("a.log", "a.log.1.gz", "a.log.2.bz2", "syslog.1.gz", "logs.tar.gz", "a.csv.gz"):
+        (tmp_path / name).write_bytes(b"")
+    names = lambda config: sorted(p.rsplit("/", 1)[1] for p in FileWalker(config).walk(str(tmp_path)))
+    assert names(CONFIG) == ["a.log", "a.log.1.gz", "a.log.2.bz2"]
+    assert names({"scan": {**CONFIG["scan"], "compressedLogs": False}}) == ["a.log"]
+
+@pytest.mark.parametrize("module, ext", [(gzip, ".gz"), (bz2, ".bz2"), (lzma, ".xz")])
+def test_compressed_logs_scan_like_plain_ones(tmp_path, module, ext):
+    plain = tmp_path / "app.log"
+    plain.write_bytes(TEXT)
+    packed = tmp_path / f"app.log.1{ext}"
+    packed.write_bytes(module.compress(TEXT))
+
+    processor = StreamProcessor(CONFIG)
+    expected = [(f.line, f.rule, f.hash) for f in processor.scan_file(str(plain))[0]]
+    assert [f.rule for f in processor.scan_file(str(plain))[0]] == ["Credit Card", "PAN"]
+    assert [(f.line, f.rule, f.hash) for f in processor.scan_file(str(packed))[0]] == expected
+
+def test_decompression_stops_at_max_file_size(tmp_path):
+    packed = tmp_path / "big.log.gz"
+    with gzip.open(packed, "wb") as f:
+        f.write(TEXT)
+        for _ in range(2048):
+            f.write(b"x" * 1023 + b"\n")
+        f.write(b"PAN ZZZZZ9999Z\n")
+
+    findings, _ = StreamProcessor(CONFIG).scan_file(str(packed))
+    # The PAN past the cutoff is never reached
+    assert [f.rule for f in findings] == ["Credit Card", "PAN", PARTIAL_SCAN_RULE]
+    assert findings[-1].masked_value == "Decompressed size is over maxFileSizeMB: first 1 MB scanned"
+
+def test_wide_encoded_logs_stop_at_max_file_size(tmp_path):
+    # CJK text is 2 bytes a character in UTF-16 but 3 in UTF-8: the limit counts the former
+    row = "日志条目" * 100 + "\n"
+    text = "PAN ABCDE1234F\n" + row * 2000 + "PAN ABCDE5678F\n"
+    packed = tmp_path / "wide.log.gz"
+    packed.write_bytes(gzip.compress(text.encode("utf-16")))
+
+    findings, _ = StreamProcessor(CONFIG).scan_file(str(packed))
+    assert [f.rule for f in findings] == ["PAN", PARTIAL_SCAN_RULE]
+    assert findings[0].line == 1
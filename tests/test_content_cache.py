@@ -0,0 +1,97 @@
+from dlp_agent.events.model import Finding
+from dlp_agent.scanner.content_cache import ContentCache
+
+FINDINGS = [Finding(2, "PAN", "High", "ABCDE****F", "abc")]
+
+def test_hashes_only_on_size_collision(tmp_path):
+    first, copy, other = tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "c.txt"
+    first.write_text("PAN ABCDE1234F")
+    copy.write_text("PAN ABCDE1234F")
+    other.write_text("nothing here, longer")
+
+    cache = ContentCache()
+    assert cache.lookup(str(first)) is None
+    cache.store(str(first), FINDINGS)
+    assert cache.lookup(str(other)) is None
+    cache.store(str(other), [])
+    assert cache.hashed_files == 0
+
+    assert cache.lookup(str(copy)) == FINDINGS
+    assert (cache.hits, cache.misses, cache.hashed_files) == (1, 2, 2)
+
+def test_same_size_different_content_or_extension_misses(tmp_path):
+    a, b, c = tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "a.log"
+    a.write_text("ABCDE1234F")
+    b.write_text("ZZZZZ0000Z")
+    c.write_text("ABCDE1234F")
+
+    cache = ContentCache()
+    cache.lookup(str(a))
+    cache.store(str(a), FINDINGS)
+    assert cache.lookup(str(b)) is None
+    cache.store(str(b), [])
+    assert cache.lookup(str(c)) is None
+
+def test_lru_eviction(tmp_path):
+    cache = ContentCache(max_entries=2)
+    for i in range(4):
+        path = tmp_path / f"f{i}.txt"
+        path.write_text("x" * (i + 1))
+        cache.lookup(str(path))
+        cache.store(str(path), [])
+    assert cache.evictions == 2
+
+def test_failed_scans_are_not_cached(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from dlp_agent.main import main
+    from dlp_agent.scanner.stream_processor import StreamProcessor
+
+    root = tmp_path / "data"
+    root.mkdir()
+    for name in ("a.txt", "b.txt"):
+        (root / name).write_text("PAN ABCDE1234F\ncard 4532 0151 1283 0366\n")
+    policy = tmp_path / "policy.json"
+    policy.write_text('{"rules": {"pan": {"enabled": true}, "card": {"enabled": true}}, '
+                      '"scan": {"allowedExtensions": [".txt"]}}')
+
+    iter_findings = StreamProcessor._iter_findings
+    scanned = []
+    def failing_once(self, file_path):
+        scanned.append(file_path.rsplit("/", 1)[1])
+        for found in iter_findings(self, file_path):
+            yield found
+            if len(scanned) == 1:
+                raise OSError("read error")
+    monkeypatch.setattr(StreamProcessor, "_iter_findings", failing_once)
+    result = CliRunner().invoke(main, ["--scan-dir", str(root), "--policy", str(policy)])
+    assert result.exit_code == 0
+    # The copy is scanned in full rather than given the first file's partial findings
+    assert scanned == ["a.txt", "b.txt"]
+    assert "Found 3 issues." in result.output
+
+def test_cache_hits_keep_walk_order_with_workers(tmp_path):
+    import json
+    from click.testing import CliRunner
+    from dlp_agent.main import main
+
+    root = tmp_path / "data"
+    root.mkdir()
+    for i in range(200):
+        # Every other file is a copy, answered from the cache
+        text = "PAN ABCDE1234F\n" if i % 2 else f"row {i}\nPAN ABCDE{i:04d}F\ncard 4532 0151 1283 0366\n"
+        (root / f"f{i:03d}.txt").write_text(text)
+    policy = tmp_path / "policy.json"
+    policy.write_text('{"rules": {"pan": {"enabled": true}, "card": {"enabled": true}}, '
+                      '"scan": {"allowedExtensions": [".txt"], "dedup": {"scope": "file"}}}')
+
+    outputs = []
+    for workers in ("1", "2"):
+        out = tmp_path / f"workers{workers}.json"
+        result = CliRunner().invoke(main, ["--scan-dir", str(root), "--policy", str(policy),
+                                           "--json-out", str(out), "--workers", workers])
+        assert result.exit_code == 0, result.output
+        with open(out) as f:
+            outputs.append([(event["source"]["path"], event["source"]["line"], event["rule"])
+                            for event in map(json.loads, f)])
+    assert len(outputs[0]) == 300
+    assert outputs[1] == outputs[0]
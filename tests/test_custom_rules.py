@@ -0,0 +1,110 @@
+import random
+import re
+import pytest
+from dlp_agent.detectors import DetectionEngine
+from dlp_agent.detectors.custom import pattern_literal
+from dlp_agent.scanner import stream_processor
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+RULES = {
+    "pan": {"enabled": True},
+    "card": {"enabled": True},
+    "employee_id": {"enabled": True, "name": "Employee ID", "pattern": r"\bEMP-(?P<value>\d{6})\b",
+                    "severity": "Low"},
+    "account": {"enabled": True, "name": "Account", "pattern": r"\b\d{10}\b", "validator": "luhn",
+                "keywords": ["account", "acct"]},
+    "api_key": {"enabled": True, "pattern": r"\bapi_key=(?P<value>[A-Za-z0-9]{16})", "mask": "edges"},
+    "disabled": {"pattern": r"\bABCDE\d{4}F\b"},
+}
+
+def _hits(engine, text):
+    return [(hit.rule, hit.severity, hit.masked_value) for hit in engine.detect(text)]
+
+def test_custom_rules_from_the_policy():
+    engine = DetectionEngine.from_policy({"rules": RULES})
+    assert _hits(engine, "hired EMP-123456, pan ABCDE1234F") == [("PAN", "High", "ABCDE****F"), ("Employee ID", "Low", "**3456")]
+    # Keywords are required, and the validator runs over the value
+    assert _hits(engine, "ACCT no. 4532015114") == [("Account", "Medium", "******5114")]
+    assert _hits(engine, "acct no. 4532015115") == []
+    assert _hits(engine, "ref 4532015114") == []
+    # Anchors taken from the pattern gate case-insensitively; the pattern decides
+    assert _hits(engine, "API_KEY=0123456789abcdef") == []
+    assert _hits(engine, "api_key=0123456789abcdef") == [("api_key", "Medium", "01************ef")]
+
+def test_pattern_literal():
+    assert pattern_literal(re.compile(r"\bEMP-(?P<value>\d{6})\b")) == "emp-"
+    assert pattern_literal(re.compile(r"(?:tok|key)_\d+_live_\w+")) == "_live_"
+    assert pattern_literal(re.compile(r"\b\d{10}\b")) is None
+    assert pattern_literal(re.compile(r"ab?c")) is None
+
+@pytest.mark.parametrize("spec, message", [
+    ({"pattern": r"\b\d{10}\b"}, "needs anchors or keywords"),
+    ({"pattern": r"EMP-(\d"}, "invalid pattern"),
+    ({"pattern": r"EMP-\d+", "validator": "mod97"}, "unknown validator 'mod97'"),
+    ({"pattern": r"EMP-\d+", "mask": "middle"}, "unknown mask 'middle'"),
+    ({"keywords": ["emp"]}, "has no pattern"),
+])
+def test_unusable_rules_are_rejected(spec, message):
+    with pytest.raises(ValueError, match=message):
+        DetectionEngine.from_policy({"rules": {"bad": {"enabled": True, **spec}}})
+
+def test_anchors_match_each_line():
+    engine = DetectionEngine.from_policy({"rules": {"emp": {"enabled": True, "pattern": r"^EMP-\d{7}$"}}})
+    assert [line for line, _ in engine.detect_buffer("EMP-1234567\nEMP-7654321\nx EMP-1111111")] == [0, 1]
+    assert [line for line, _ in engine.detect_block(b"EMP-1234567\nEMP-7654321\n")] == [0, 1]
+
+def test_overlapping_literals():
+    rules = {f"r{i}": {"enabled": True, "pattern": rf"\b{word}\d{{3}}\b", "keywords": [keyword]}
+             for i, (word, keyword) in enumerate([("emp", "emp"), ("employee", "employee"), ("ploy", "plo")])}
+    engine = DetectionEngine.from_policy({"rules": rules})
+    assert [hit[0] for hit in _hits(engine, "employee123 emp123 ploy123")] == ["r0", "r1", "r2"]
+    # "emp" and "plo" are only found inside "employee"
+    assert [hit[0] for hit in _hits(engine, "employee ploy123 emp123")] == ["r0", "r2"]
+
+@pytest.mark.parametrize("unicode_anchor", [False, True])
+def test_block_and_buffer_match_line_by_line(unicode_anchor):
+    rules = dict(RULES)
+    rules.update({f"gen{i}": {"enabled": True, "pattern": rf"\bT{i}x-?\d{{4}}\b"} for i in range(30)})
+    rules["anchored"] = {"enabled": True, "pattern": r"^EMP-\d{7}$"}
+    if unicode_anchor:
+        # Not searchable on raw bytes ignoring case, so blocks are decoded whole
+        rules["unicode"] = {"enabled": True, "pattern": r"\bNº\s?\d{5}\b", "anchors": ["nº"]}
+    engine = DetectionEngine.from_policy({"rules": rules})
+    rng = random.Random(25)
+    pieces = ["EMP-123456", "acct", "Account ", "4532015114", "api_key=0123456789abcdef", "ABCDE1234F",
+              "T7x-1234", "t12X1234", "T2", "9x1234", "EMP-1234567", "\nEMP-7654321\n", "Nº 12345", "nº12345", " ", "-", "\n", "é", "x", b"\xff"]
+    for _ in range(300):
+        chosen = [rng.choice(pieces) for _ in range(rng.randint(0, 40))]
+        data = b"".join(piece if isinstance(piece, bytes) else piece.encode() for piece in chosen)
+        text = data.decode("utf-8", errors="ignore")
+        expected = [(i, hit) for i, line in enumerate(text.split("\n")) for hit in engine.detect(line)]
+        assert engine.detect_buffer(text) == expected
+        assert engine.detect_block(data) == expected
+
+def test_rules_only_run_on_lines_with_their_literals():
+    rules = {f"gen{i}": {"enabled": True, "pattern": rf"\bT{i}x-\d{{4}}\b"} for i in range(50)}
+    engine = DetectionEngine.from_policy({"rules": rules})
+    calls = []
+    engine.rules = [rule._replace(finder=lambda text, pos, endpos, find=rule.finder, key=rule.key:
+                                  calls.append(key) or find(text, pos, endpos))
+                    for rule in engine.rules]
+    assert engine.detect("no literals on this line, just 4532 0151 1283 0366") == []
+    assert calls == []
+    assert [hit.rule for hit in engine.detect("see T17x-1234 and T3x-9999")] == ["gen3", "gen17"]
+    assert sorted(calls) == ["gen17", "gen3"]
+
+def test_long_lines_keep_custom_matches_whole(tmp_path, monkeypatch):
+    keys = [f"api_key={i:016d}" for i in range(200)]
+    path = tmp_path / "config.json"
+    path.write_text('{"keys": "' + ";".join(keys) + '"}\n')
+    monkeypatch.setattr(stream_processor, "CHUNK_SIZE", 64)
+    monkeypatch.setattr(stream_processor, "WINDOW_SIZE", 128)
+    monkeypatch.setattr(stream_processor, "WINDOW_OVERLAP", 40)
+    findings, _ = StreamProcessor({"rules": {"api_key": RULES["api_key"]}}).scan_file(str(path))
+    assert len(findings) == len(keys) and len({finding.hash for finding in findings}) == len(keys)
+
+def test_xlsx_numbers_are_all_scanned_with_custom_rules():
+    from dlp_agent.scanner.ooxml import XLSX_MIN_NUMBER_DIGITS, xlsx_extractor
+
+    assert xlsx_extractor({"rules": {"card": {"enabled": True}}}).keywords["min_number_digits"] == XLSX_MIN_NUMBER_DIGITS
+    assert xlsx_extractor({"rules": RULES}).keywords["min_number_digits"] == 1
@@ -0,0 +1,88 @@
+import pytest
+from dlp_agent.events.model import digest_value
+from dlp_agent.scanner.dedup import BYTES_PER_KEY, DedupStore
+
+CARD = digest_value("4532015112830366")
+PAN = digest_value("ABCDE1234F")
+
+def test_location_scope():
+    store = DedupStore()
+    assert not store.seen(CARD, "Credit Card", "/a.txt", 1)
+    assert store.seen(CARD, "Credit Card", "/a.txt", 1)
+    assert not store.seen(CARD, "Credit Card", "/a.txt", 2)
+    assert not store.seen(CARD, "Credit Card", "/b.txt", 1)
+    assert not store.seen(CARD, "Other", "/a.txt", 1)
+    assert not store.seen(PAN, "Credit Card", "/a.txt", 1)
+
+    metrics = store.metrics()
+    assert (metrics["lookups"], metrics["duplicates"], metrics["keys"]) == (6, 1, 5)
+    assert metrics["hit_rate"] == pytest.approx(1 / 6)
+    assert metrics["memory_bytes"] == 5 * BYTES_PER_KEY
+
+def test_file_scope_forgets_previous_file():
+    store = DedupStore(scope="file")
+    assert not store.seen(CARD, "Credit Card", "/a.txt", 1)
+    assert store.seen(CARD, "Credit Card", "/a.txt", 1)
+    assert not store.seen(CARD, "Credit Card", "/b.txt", 1)
+    assert store.metrics()["keys"] == 1
+    # Files are emitted one after another, so coming back starts afresh
+    assert not store.seen(CARD, "Credit Card", "/a.txt", 1)
+
+def test_secret_scope_reports_once_per_scan():
+    store = DedupStore(scope="secret")
+    assert not store.seen(CARD, "Credit Card", "/a.txt", 1)
+    assert store.seen(CARD, "Credit Card", "/a.txt", 7)
+    assert store.seen(CARD, "Credit Card", "/b.txt", 3)
+    assert not store.seen(PAN, "PAN", "/b.txt", 3)
+
+def test_exact_store_stays_within_ceiling():
+    store = DedupStore(max_memory_mb=0.01)
+    ceiling = store.max_bytes
+    for line in range(5000):
+        store.seen(CARD, "Credit Card", "/a.txt", line)
+        assert store.metrics()["memory_bytes"] <= ceiling + BYTES_PER_KEY
+    assert store.metrics()["evictions"] > 0
+    # Recent keys are still known
+    assert store.seen(CARD, "Credit Card", "/a.txt", 4999)
+    # Forgotten ones are reported again rather than a new finding being lost
+    assert not store.seen(CARD, "Credit Card", "/a.txt", 0)
+
+def test_bloom_filter():
+    store = DedupStore(filter="bloom", max_memory_mb=1, bloom_capacity=10000, bloom_error_rate=0.01)
+    first_seen = sum(not store.seen(PAN, "PAN", "/a.txt", line) for line in range(10000))
+    assert first_seen > 9900
+    assert all(store.seen(PAN, "PAN", "/a.txt", line) for line in range(10000))
+
+    metrics = store.metrics()
+    assert metrics["memory_bytes"] < 16 * 1024
+    assert 0.005 < metrics["false_positive_rate"] < 0.02
+    # Each probe is recorded too, so keep them few next to the capacity
+    false_positives = sum(store.seen(CARD, "Credit Card", "/b.txt", line) for line in range(1000))
+    assert false_positives < 40
+
+def test_bloom_filter_capped_by_ceiling():
+    store = DedupStore(filter="bloom", max_memory_mb=0.001, bloom_capacity=10_000_000)
+    assert store.metrics()["memory_bytes"] <= store.max_bytes
+
+def test_from_policy_and_validation():
+    store = DedupStore.from_policy({"scan": {"dedup": {"scope": "secret", "filter": "bloom", "maxMemoryMB": 2}}})
+    assert (store.scope, store.filter, store.max_bytes) == ("secret", "bloom", 2 * 1024 * 1024)
+    with pytest.raises(ValueError):
+        DedupStore(scope="line")
+    with pytest.raises(ValueError):
+        DedupStore(filter="cuckoo")
+
+def test_file_scope_bloom_clears_only_what_the_file_set():
+    store = DedupStore(scope="file", filter="bloom", max_memory_mb=1, bloom_capacity=10000, bloom_error_rate=0.01)
+    bloom = store._bloom
+    for line in range(10):
+        assert not store.seen(CARD, "Credit Card", "/a.txt", line)
+    assert store.seen(CARD, "Credit Card", "/a.txt", 7)
+    assert not store.seen(CARD, "Credit Card", "/b.txt", 7)
+    # Cleared in place, leaving only /b.txt's bits
+    assert store._bloom is bloom and sum(map(int.bit_count, bloom)) <= store._hashes
+    for line in range(5000):
+        store.seen(PAN, "PAN", "/b.txt", line)
+    # A file that set many bytes gets a fresh filter instead
+    assert not store.seen(PAN, "PAN", "/c.txt", 1)
+    assert store._bloom is not bloom and store.metrics()["keys"] == 1
@@ -9,14 +9,19 @@ def test_credit_card_detection():
     text = "Here is a card: 4532 0151 1283 0368 thanks."
     findings = detect_credit_cards(text)
     assert len(findings) == 1
-    assert findings[0]['type'] == 'Credit Card'
-    assert findings[0]['value'].endswith('0368')
-    assert '****' in findings[0]['value']
+    assert findings[0].rule == 'Credit Card'
+    assert findings[0].masked_value.endswith('0368')
+    assert '****' in findings[0].masked_value
 
-    # Invalid Luhn
+    # Invalid Luhn: 16 digit numbers are still reported, at lower severity
     text_invalid = "Bad card: 4532 0151 1283 0369"
     findings = detect_credit_cards(text_invalid)
-    assert len(findings) == 0
+    assert len(findings) == 1
+    assert findings[0].severity == 'Medium'
+
+    # Other lengths must pass Luhn
+    assert len(detect_credit_cards("Amex: 3782 822463 10005")) == 1
+    assert len(detect_credit_cards("Bad Amex: 3782 822463 10006")) == 0
 
 def test_aadhaar_detection():
     # Valid Verhoeff (Using a known valid test number or constructing one)
@@ -38,8 +43,8 @@ def test_aadhaar_detection():
     text_valid = "Identity: 9999 9999 0019"
     findings = detect_aadhaar(text_valid)
     assert len(findings) == 1
-    assert findings[0]['type'] == 'Aadhaar'
-    assert findings[0]['value'] == 'XXXX XXXX 0019'
+    assert findings[0].rule == 'Aadhaar'
+    assert findings[0].masked_value == 'XXXX XXXX 0019'
 
     # Invalid format (repeating)
     text_repeat = "1111 1111 1111"
@@ -51,8 +56,8 @@ def test_pan_detection():
     text = "My PAN is ABCDE1234F"
     findings = detect_pan(text)
     assert len(findings) == 1
-    assert findings[0]['type'] == 'PAN'
-    assert findings[0]['value'] == 'ABCDE****F'
+    assert findings[0].rule == 'PAN'
+    assert findings[0].masked_value == 'ABCDE****F'
 
     # Invalid PAN (wrong digit count)
     text_invalid = "ABCDE123F"
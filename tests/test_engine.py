@@ -0,0 +1,50 @@
+import random
+from dlp_agent.config import DEFAULT_POLICY
+from dlp_agent.detectors import DetectionEngine, credit_card, detect_aadhaar, detect_credit_cards, detect_pan
+
+def _per_detector(text):
+    events = detect_credit_cards(text) + detect_aadhaar(text) + detect_pan(text)
+    return [(e.rule, e.severity, e.masked_value, e.hash) for e in events]
+
+def _engine(engine, text):
+    return [(e.rule, e.severity, e.masked_value, e.hash) for e in engine.detect(text)]
+
+def test_engine_matches_per_detector_output():
+    engine = DetectionEngine.from_policy(DEFAULT_POLICY)
+    samples = [
+        "My card is 4532 0151 1283 0368 and PAN is ABCDE1234F",
+        "Identity: 9999 9999 0019",
+        # Overlapping candidates: the trailing 12 digits are also an Aadhaar shape
+        "1234 5678 9999 9999 0019",
+        "378282246310005 abcde1234f 2345 6789 0123",
+        "no digits here at all",
+        "",
+    ]
+    for text in samples:
+        assert _engine(engine, text) == _per_detector(text)
+
+def test_engine_matches_per_detector_on_random_input():
+    engine = DetectionEngine.from_policy(DEFAULT_POLICY)
+    rng = random.Random(1234)
+    alphabet = "0123456789" * 4 + "  --ABCDEFxyz\t.:"
+    for _ in range(3000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert _engine(engine, text) == _per_detector(text)
+
+def test_engine_respects_disabled_rules():
+    policy = {"rules": {"pan": {"enabled": True}, "card": {"enabled": False}}}
+    engine = DetectionEngine.from_policy(policy)
+    events = engine.detect("card 4532 0151 1283 0368 pan ABCDE1234F")
+    assert [e.rule for e in events] == ["PAN"]
+    assert DetectionEngine.from_policy({"rules": {}}).detect("ABCDE1234F") == []
+
+def test_card_finder_matches_pattern():
+    rng = random.Random(99)
+    alphabets = ["0123456789" * 3 + "  --x_.", "12 -", "0123456789" * 8 + " -x٣"]
+    for _ in range(5000):
+        text = "".join(rng.choice(rng.choice(alphabets)) for _ in range(rng.randint(0, 80)))
+        pos = rng.randint(0, len(text))
+        endpos = rng.randint(pos, len(text))
+        for bounds in ((), (pos, endpos)):
+            expected = [m.group() for m in credit_card.CC_PATTERN.finditer(text, *bounds)]
+            assert credit_card.find_candidates(text, *bounds) == expected
@@ -0,0 +1,54 @@
+import logging
+import subprocess
+import sys
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+RULES = {"card": {"enabled": True}, "pan": {"enabled": True}}
+
+def test_plain_text_scan_imports_no_document_libraries(tmp_path):
+    path = tmp_path / "a.log"
+    path.write_text("card 4532 0151 1283 0366\n")
+    code = ("import sys\n"
+            "from dlp_agent.scanner import StreamProcessor\n"
+            f"findings = StreamProcessor({{'rules': {RULES!r}}}).scan_file({str(path)!r})[0]\n"
+            "print(len(findings), sorted(m for m in ('PyPDF2', 'numpy', 'dlp_agent.scanner.ooxml') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["1", "[]"]
+
+def test_policy_adds_an_extractor_loaded_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "rtf_extractor.py").write_text(
+        "def rtf_extractor(config):\n"
+        "    def extract(file_path):\n"
+        "        with open(file_path) as f:\n"
+        "            for i, line in enumerate(f, 1):\n"
+        "                yield f'l{i}', line.replace('\\\\par', '')\n"
+        "    return extract\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "rtf_extractor", raising=False)
+    path = tmp_path / "a.rtf"
+    path.write_text("{\\rtf1 intro\\par\nPAN ABCDE1234F\\par}\n")
+
+    processor = StreamProcessor({"rules": RULES, "scan": {"extractors": {".RTF": "rtf_extractor:rtf_extractor"}}})
+    assert "rtf_extractor" not in sys.modules
+    assert [(f.line, f.rule) for f in processor.scan_file(str(path))[0]] == [("l2", "PAN")]
+    assert "rtf_extractor" in sys.modules
+
+def test_missing_library_skips_that_type_only(tmp_path, caplog):
+    (tmp_path / "a.pdf").write_text("PAN ABCDE1234F\n")
+    (tmp_path / "b.pdf").write_text("PAN ABCDE1234F\n")
+    (tmp_path / "c.txt").write_text("PAN ABCDE1234F\n")
+    processor = StreamProcessor({"rules": RULES, "scan": {"extractors": {".pdf": "no_such_pdf_library:extractor"}}})
+
+    with caplog.at_level(logging.WARNING):
+        found = [len(processor.scan_file(str(tmp_path / name))[0]) for name in ("a.pdf", "b.pdf", "c.txt")]
+    assert found == [0, 0, 1]
+    assert [r.getMessage() for r in caplog.records] == [
+        ".pdf files will not be scanned: No module named 'no_such_pdf_library'"]
+    processor.close()
+
+def test_policy_can_return_an_extension_to_plain_text(tmp_path):
+    path = tmp_path / "notes.doc"
+    path.write_text("PAN ABCDE1234F\n")
+    assert StreamProcessor({"rules": RULES}).scan_file(str(path))[0] == []
+    processor = StreamProcessor({"rules": RULES, "scan": {"extractors": {".doc": None}}})
+    assert [f.rule for f in processor.scan_file(str(path))[0]] == ["PAN"]
@@ -0,0 +1,102 @@
+import random
+from dlp_agent.events.model import PARTIAL_SCAN_RULE
+from dlp_agent.scanner import stream_processor
+from dlp_agent.scanner.file_walker import FileWalker
+from dlp_agent.scanner.large_files import MB, LargeFilePolicy
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+RULES = {"card": {"enabled": True}, "pan": {"enabled": True}, "aadhaar": {"enabled": True}}
+
+def _findings(processor, path):
+    return [(f.line, f.rule, f.masked_value, f.coverage) for f in processor.scan_file(str(path))[0]]
+
+def test_long_lines_are_cut_where_no_match_can_split(tmp_path, monkeypatch):
+    rng = random.Random(3)
+    pieces = ["4532 0151 1283 0366", "9999 9999 0019", "ABCDE1234F", '{"id": ', '", "', "-", " ", "x", "é", "_", "\r"]
+    data = "".join(rng.choice(pieces) for _ in range(6000)).encode("utf-8")
+    path = tmp_path / "export.json"
+    path.write_bytes(data + b"\n" + data[::-1] + b"\n")
+    expected = _findings(StreamProcessor({"rules": RULES}), path)
+    assert len(expected) > 100
+
+    # Wider than any run without a cut byte in data, so windows never overlap;
+    # within a line, hits come out per window
+    monkeypatch.setattr(stream_processor, "CHUNK_SIZE", 13)
+    monkeypatch.setattr(stream_processor, "WINDOW_SIZE", 256)
+    assert sorted(_findings(StreamProcessor({"rules": RULES}), path)) == sorted(expected)
+
+def test_lines_without_cut_bytes_overlap_windows(tmp_path, monkeypatch):
+    rng = random.Random(5)
+    pans = ["".join(rng.choice("ABCDEFGHJK") for _ in range(5)) + f"{i:04d}" + "Z" for i in range(400)]
+    path = tmp_path / "pans.log"
+    path.write_text("start\n" + " ".join(pans) + "\n")
+
+    monkeypatch.setattr(stream_processor, "CHUNK_SIZE", 64)
+    monkeypatch.setattr(stream_processor, "WINDOW_SIZE", 100)
+    monkeypatch.setattr(stream_processor, "WINDOW_OVERLAP", 24)
+    found = _findings(StreamProcessor({"rules": RULES}), path)
+    assert len(found) == len(pans)
+    assert {line for line, *_ in found} == {2}
+
+def test_sample_regions():
+    policy = LargeFilePolicy(enabled=True, budget=10 * MB, head=2 * MB, tail=3 * MB, window=MB)
+    assert policy.regions(10 * MB) == [(0, 10 * MB)]
+    regions = policy.regions(100 * MB)
+    assert regions[0] == (0, 2 * MB) and regions[-1] == (97 * MB, 100 * MB)
+    assert len(regions) == 7 and sum(end - start for start, end in regions) == 10 * MB
+    assert all(a[1] <= b[0] for a, b in zip(regions, regions[1:]))
+    assert LargeFilePolicy.from_policy({"scan": {"largeFiles": {"enabled": True, "budgetMB": 8}}}).head == 2 * MB
+
+def test_files_over_budget_are_sampled(tmp_path, collecting_sink):
+    lines = [f"row {i:05d} PAN ABCDE{i:04d}Z filler filler filler" for i in range(4000)]
+    path = tmp_path / "big.log"
+    path.write_text("\n".join(lines) + "\n")
+    scan = {"maxFileSizeMB": 0.01, "largeFiles": {"enabled": True, "budgetMB": 0.02, "sampleWindowMB": 0.002}}
+    processor = StreamProcessor({"rules": RULES, "scan": scan})
+
+    found = _findings(processor, path)
+    assert {coverage for *_, coverage in found} == {"sampled"}
+    assert found[0] == (1, "PAN", "ABCDE****Z", "sampled")
+    assert found[-1][1] == PARTIAL_SCAN_RULE and found[-1][2].startswith("Large file sampled: 0 of 0 MB scanned")
+    located = [line for line, rule, *_ in found if isinstance(line, str) and rule == "PAN"]
+    assert len(located) > 100
+    data = path.read_bytes()
+    rows = []
+    for locator in located:
+        offset, line = map(int, locator[1:].split(":l"))
+        # Samples start on a line boundary, and locators name lines with a PAN
+        assert data[offset - 1:offset] == b"\n"
+        rows.append(data[offset:].split(b"\n")[line - 1])
+    assert all(b" PAN ABCDE" in row for row in rows) and rows[-1].startswith(b"row 03999")
+
+    # Under budget the same settings read the whole file
+    small = tmp_path / "small.log"
+    small.write_text("\n".join(lines[:10]) + "\n")
+    assert [coverage for *_, coverage in _findings(processor, small)] == ["full"] * 10
+
+    sink = collecting_sink()
+    StreamProcessor({"rules": RULES, "scan": scan}, sinks=[sink]).process_file(str(path))
+    assert len(sink.events) == len(found) and {event.source["coverage"] for event in sink.events} == {"sampled"}
+
+def test_wide_encoded_files_are_read_up_to_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(stream_processor, "CHUNK_SIZE", 4096)
+    # The budget counts UTF-16 bytes, though CJK text is half as long again in UTF-8
+    row = "日志条目" * 100 + "\n"
+    path = tmp_path / "wide.log"
+    path.write_text("PAN ABCDE1234F\n" + row * 50 + "PAN ABCDE1111F\n" + row * 200 + "PAN ABCDE5678F\n",
+                    encoding="utf-16")
+    scan = {"maxFileSizeMB": 0.01, "largeFiles": {"enabled": True, "budgetMB": 0.05}}
+    found = _findings(StreamProcessor({"rules": RULES, "scan": scan}), path)
+    # 40 KB in, the second PAN is within budget; the last one is well past it
+    assert [(line, rule) for line, rule, *_ in found[:-1]] == [(1, "PAN"), (52, "PAN")]
+    assert found[-1][1] == PARTIAL_SCAN_RULE
+    assert found[-1][2].startswith("Large file sampled: first 0.0")
+
+def test_walker_keeps_large_text_files_only_when_enabled(tmp_path):
+    (tmp_path / "big.log").write_bytes(b"x" * 2048)
+    (tmp_path / "big.docx").write_bytes(b"x" * 2048)
+    (tmp_path / "small.log").write_bytes(b"x")
+    scan = {"allowedExtensions": [".log", ".docx"], "maxFileSizeMB": 0.001}
+    names = lambda scan: sorted(p.rsplit("/", 1)[1] for p in FileWalker({"scan": scan}).walk(str(tmp_path)))
+    assert names(scan) == ["small.log"]
+    assert names({**scan, "largeFiles": {"enabled": True}}) == ["big.log", "small.log"]
@@ -0,0 +1,135 @@
+import zipfile
+import docx
+from pptx import Presentation
+from pptx.util import Inches
+from dlp_agent.scanner.ooxml import iter_docx_text, iter_pptx_text, iter_xlsx_rows
+
+def test_docx_matches_python_docx_and_covers_more(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("card 4532 0151 1283 0366")
+    paragraph = document.add_paragraph("a")
+    paragraph.add_run().add_break()
+    paragraph.add_run("b\tc")
+    document.add_paragraph("")
+    document.add_table(rows=2, cols=2).cell(1, 0).text = "PAN ABCDE1234F"
+    document.add_paragraph("after the table")
+    document.sections[0].header.paragraphs[0].text = "header ABCDE1234F"
+    document.sections[0].footer.paragraphs[0].text = "footer"
+    path = str(tmp_path / "a.docx")
+    document.save(path)
+
+    body = [(i, p.text) for i, p in enumerate(docx.Document(path).paragraphs, 1) if p.text]
+    found = list(iter_docx_text(path))
+    assert [entry for entry in found if isinstance(entry[0], int)] == body
+    assert ("t1:r2:c1", "PAN ABCDE1234F") in found
+    assert found[-2:] == [("header1:p1", "header ABCDE1234F"), ("footer1:p1", "footer")]
+
+def test_docx_text_box_fallback_is_not_duplicated(tmp_path):
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    mc = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+    box = '<w:txbxContent><w:p><w:r><w:t>boxed ABCDE1234F</w:t></w:r></w:p></w:txbxContent>'
+    body = (f'<w:document {w} {mc}><w:body>'
+            '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+            f'<w:r><w:t xml:space="preserve">outer </w:t></w:r><w:r><mc:AlternateContent><mc:Choice>{box}'
+            f'</mc:Choice><mc:Fallback>{box}</mc:Fallback></mc:AlternateContent></w:r>'
+            '<w:ins><w:r><w:t>inserted</w:t></w:r></w:ins><w:del><w:r><w:delText>deleted</w:delText></w:r></w:del></w:p>'
+            '</w:body></w:document>')
+    path = str(tmp_path / "box.docx")
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('word/document.xml', body)
+
+    assert list(iter_docx_text(path)) == [(1, "boxed ABCDE1234F"), (1, "outer inserted")]
+
+def test_docx_content_controls_keep_python_docx_numbering(tmp_path):
+    from docx.oxml import parse_xml
+
+    document = docx.Document()
+    document.add_paragraph("intro")
+    pan = document.add_paragraph("PAN ABCDE1234F")
+    w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    pan._p.addprevious(parse_xml(
+        f'<w:sdt {w}><w:sdtContent><w:p><w:r><w:t>control ABCDE5678F</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t>second</w:t></w:r></w:p></w:sdtContent></w:sdt>'))
+    document.add_paragraph("card 4532 0151 1283 0366")
+    path = str(tmp_path / "sdt.docx")
+    document.save(path)
+
+    body = [(i, p.text) for i, p in enumerate(docx.Document(path).paragraphs, 1) if p.text]
+    assert body == [(1, "intro"), (2, "PAN ABCDE1234F"), (3, "card 4532 0151 1283 0366")]
+    assert list(iter_docx_text(path)) == [(1, "intro"), ("p1.1", "control ABCDE5678F"), ("p1.2", "second"),
+                                          (2, "PAN ABCDE1234F"), (3, "card 4532 0151 1283 0366")]
+
+def test_pptx_matches_python_pptx_and_covers_more(tmp_path):
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[5])
+    slide.shapes.title.text = "Title\nsecond line"
+    group = slide.shapes.add_group_shape()
+    group.shapes.add_textbox(0, 0, Inches(1), Inches(1)).text_frame.text = "grouped ABCDE1234F"
+    table = slide.shapes.add_table(2, 2, 0, 0, Inches(2), Inches(1)).table
+    table.cell(0, 1).text = "card 4532 0151 1283 0366"
+    slide.notes_slide.notes_text_frame.text = "note ABCDE1234F"
+    presentation.slides.add_slide(presentation.slide_layouts[6]).shapes.add_textbox(
+        0, 0, Inches(1), Inches(1)).text_frame.text = "second slide"
+    path = str(tmp_path / "a.pptx")
+    presentation.save(path)
+
+    found = list(iter_pptx_text(path))
+    reference = [(f"s{i}:sh{n}", shape.text) for i, s in enumerate(Presentation(path).slides, 1)
+                 for n, shape in enumerate(s.shapes, 1) if hasattr(shape, "text") and shape.text.strip()]
+    assert [entry for entry in found if entry[0].count(':') == 1 and '.' not in entry[0]] == reference
+    assert ("s1:sh2.1", "grouped ABCDE1234F") in found
+    assert ("s1:sh3:r1:c2", "card 4532 0151 1283 0366") in found
+    assert ("s1:notes:sh2", "note ABCDE1234F") in found
+    assert found[-1] == ("s2:sh1", "second slide")
+
+def _write_xlsx(path, sheet_xml, shared_xml):
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    rels_ns = 'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"'
+    types = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('_rels/.rels', f'<Relationships {rels_ns}><Relationship Id="rId1" '
+                                   f'Type="{types}/officeDocument" Target="xl/workbook.xml"/></Relationships>')
+        zf.writestr('xl/workbook.xml', f'<workbook {ns} xmlns:r="{types}"><sheets>'
+                                       '<sheet name="Cards" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        zf.writestr('xl/_rels/workbook.xml.rels', f'<Relationships {rels_ns}>'
+                    f'<Relationship Id="rId1" Type="{types}/worksheet" Target="worksheets/sheet1.xml"/>'
+                    f'<Relationship Id="rId2" Type="{types}/sharedStrings" Target="sharedStrings.xml"/>'
+                    '</Relationships>')
+        zf.writestr('xl/sharedStrings.xml', f'<sst {ns}>{shared_xml}</sst>')
+        zf.writestr('xl/worksheets/sheet1.xml', f'<worksheet {ns}><sheetData>{sheet_xml}</sheetData></worksheet>')
+
+def test_xlsx_rows_skip_cells_without_candidates(tmp_path):
+    shared = ('<si><t>card</t></si>'
+              '<si><r><t>PAN </t></r><r><t>ABCDE1234F</t></r><rPh><t>ignored</t></rPh></si>')
+    sheet = ('<row r="1"><c t="s"><v>0</v></c><c><v>4.53201511283036E+15</v></c><c><v>42</v></c>'
+             '<c t="b"><v>1</v></c><c><f>A9*2</f><v>9064030225660732</v></c></row>'
+             '<row r="4"><c t="s"><v>1</v></c><c t="e"><v>#N/A</v></c>'
+             '<c t="str"><f>CONCAT(A1,A2)</f><v>joined</v></c></row>'
+             '<row r="5"><c><v>7</v></c></row>'
+             '<row r="9"><c t="inlineStr"><is><t>inline 2345 6789 0123</t></is></c><c><v>123456789012</v></c></row>')
+    path = str(tmp_path / "a.xlsx")
+    _write_xlsx(path, sheet, shared)
+
+    assert list(iter_xlsx_rows(path)) == [
+        ("Cards:r1", "card 4532015112830360"),
+        ("Cards:r4", "PAN ABCDE1234F joined"),
+        ("Cards:r9", "inline 2345 6789 0123 123456789012"),
+    ]
+    assert list(iter_xlsx_rows(path, min_number_digits=1))[0] == ("Cards:r1", "card 4532015112830360 42")
+
+def test_xlsx_batches_keep_row_locators(tmp_path, monkeypatch):
+    from dlp_agent.scanner import stream_processor
+    from dlp_agent.scanner.stream_processor import StreamProcessor
+
+    rows = ''.join(f'<row r="{r}"><c t="inlineStr"><is><t>{text}</t></is></c></row>' for r, text in [
+        (2, "4532 0151 1283 0366"), (3, "multi\nline ABCDE1234F"), (7, "nothing"), (8, "PAN ZZZZZ9999Z")])
+    path = str(tmp_path / "b.xlsx")
+    _write_xlsx(path, rows, '')
+
+    processor = StreamProcessor({"rules": {"card": {"enabled": True}, "pan": {"enabled": True}}})
+    expected = [(locator, hit.rule) for locator, text in iter_xlsx_rows(path)
+                for hit in processor.engine.detect(text)]
+    assert expected == [("Cards:r2", "Credit Card"), ("Cards:r3", "PAN"), ("Cards:r8", "PAN")]
+    for batch in (1, 30, 64 * 1024):
+        monkeypatch.setattr(stream_processor, "ROW_BATCH_CHARS", batch)
+        assert [(locator, hit.rule) for locator, hit in processor._iter_findings(path)] == expected
@@ -0,0 +1,111 @@
+import time
+import PyPDF2
+import pytest
+from dlp_agent.events.model import PARTIAL_SCAN_RULE
+from dlp_agent.scanner import pdf
+from dlp_agent.scanner.pdf import PdfExtractor, _may_have_text
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+def _write_pdf(path, pages):
+    """A minimal PDF; each page is a list of lines, or None for an image-only page."""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    next_id = 4
+    for lines in pages:
+        if lines is None:
+            stream = b"q 10 0 0 10 0 0 cm 0.5 g 0 0 1 1 re f Q"
+            resources = b""
+        else:
+            stream = b"BT /F1 8 Tf 12 TL 20 800 Td " + b" ".join(b"(%s) Tj T*" % line.encode() for line in lines) + b" ET"
+            resources = b"/Resources << /Font << /F1 3 0 R >> >> "
+        objects[next_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[next_id + 1] = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 842 842] %s/Contents %d 0 R >>" % (
+            resources, next_id)
+        kids.append(next_id + 1)
+        next_id += 2
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i in range(1, next_id):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, objects[i])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % next_id + b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref)
+    path.write_bytes(bytes(out))
+    return str(path)
+
+PAGES = [["page %d card 4532 0151 1283 0366" % i, "PAN ABCDE1234F"] if i % 3 else None for i in range(12)]
+
+def test_image_only_pages_are_skipped(tmp_path):
+    path = _write_pdf(tmp_path / "a.pdf", PAGES)
+    reader = PyPDF2.PdfReader(path)
+    assert [_may_have_text(page) for page in reader.pages] == [lines is not None for lines in PAGES]
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_lines_keep_page_locators(tmp_path, workers):
+    path = _write_pdf(tmp_path / "a.pdf", PAGES)
+    extractor = PdfExtractor(workers=workers)
+    try:
+        lines = list(extractor.iter_lines(path))
+    finally:
+        extractor.close()
+    assert lines[:2] == [("p2:l1", "page 1 card 4532 0151 1283 0366"), ("p2:l2", "PAN ABCDE1234F")]
+    assert len(lines) == 16
+    assert lines[-1] == ("p12:l2", "PAN ABCDE1234F")
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_page_budget_reports_partial_scan(tmp_path, workers):
+    path = _write_pdf(tmp_path / "a.pdf", PAGES)
+    extractor = PdfExtractor(workers=workers, max_pages=8)
+    try:
+        lines = list(extractor.iter_lines(path))
+    finally:
+        extractor.close()
+    locator, partial = lines[-1]
+    assert locator == "p9"
+    assert partial.reason == "PDF page budget of 8 pages ran out: 8 of 12 pages scanned"
+    assert lines[-2][0] == "p8:l2"
+
+@pytest.mark.parametrize("workers, reason", [
+    (0, "PDF time budget of 1e-09s ran out: 0 of 12 pages"),
+    (1, "PDF time budget of 1e-09s ran out opening the file"),
+])
+def test_time_budget_is_reported_as_a_finding(tmp_path, workers, reason):
+    path = _write_pdf(tmp_path / "a.pdf", PAGES)
+    budget = {"timeoutSeconds": 1e-9, "workers": workers}
+    processor = StreamProcessor({"rules": {"pan": {"enabled": True}}, "scan": {"pdf": budget}})
+    try:
+        findings, complete = processor.scan_file(path)
+    finally:
+        processor.close()
+    assert [(f.line, f.rule, f.severity) for f in findings] == [("p1", PARTIAL_SCAN_RULE, "INFO")]
+    assert not complete
+    assert findings[0].masked_value.startswith(reason)
+
+def test_stalled_page_terminates_the_pool(tmp_path, monkeypatch):
+    slow = _write_pdf(tmp_path / "slow.pdf", [["PAN ABCDE1234F"], ["stalls here"], ["PAN ABCDE5678F"]])
+    fine = _write_pdf(tmp_path / "fine.pdf", [["PAN ABCDE1234F"]])
+    page_lines = pdf._page_lines
+    def stalling(page):
+        lines = page_lines(page)
+        if lines == ["stalls here"]:
+            time.sleep(60)
+        return lines
+    # Pool workers are forked after this, so they stall too
+    monkeypatch.setattr(pdf, "_page_lines", stalling)
+
+    extractor = PdfExtractor.from_policy({"scan": {"pdf": {"timeoutSeconds": 1}}})
+    try:
+        start = time.monotonic()
+        lines = list(extractor.iter_lines(slow))
+        assert time.monotonic() - start < 10
+        assert extractor._pool is None
+        # Small files are one range: none of its pages made it in time
+        assert lines == [("p1", lines[0][1])]
+        assert lines[0][1].reason == "PDF time budget of 1s ran out: 0 of 3 pages scanned"
+        # The next file gets a fresh pool
+        assert list(extractor.iter_lines(fine)) == [("p1:l1", "PAN ABCDE1234F")]
+    finally:
+        extractor.close()
@@ -0,0 +1,111 @@
+import os
+from dlp_agent.events.model import PARTIAL_SCAN_RULE, Finding
+from dlp_agent.scanner.scan_index import ScanIndex
+
+POLICY = {"rules": {"pan": {"enabled": True}}}
+
+def test_unchanged_file_is_skipped_with_stored_findings(tmp_path):
+    target = tmp_path / "data" / "a.txt"
+    target.parent.mkdir()
+    target.write_text("PAN ABCDE1234F")
+    db = str(tmp_path / "state" / "index.sqlite3")
+    findings = [Finding(1, "PAN", "High", "ABCDE****F", "abc")]
+
+    index = ScanIndex(db, POLICY)
+    assert index.lookup(str(target)) is None
+    index.record(str(target), findings)
+    index.close()
+
+    index = ScanIndex(db, POLICY)
+    assert index.lookup(str(target)) == findings
+    assert index.skipped_files == 1
+    assert index.skipped_bytes == target.stat().st_size
+    index.close()
+
+    # A different policy invalidates every entry
+    index = ScanIndex(db, {"rules": {"pan": {"enabled": False}}})
+    assert index.lookup(str(target)) is None
+    index.close()
+
+def test_modified_and_deleted_files(tmp_path):
+    root = tmp_path / "data"
+    root.mkdir()
+    kept, removed = root / "kept.txt", root / "removed.txt"
+    kept.write_text("one")
+    removed.write_text("two")
+    db = str(tmp_path / "index.sqlite3")
+
+    index = ScanIndex(db, POLICY)
+    for path in (kept, removed):
+        index.lookup(str(path))
+        index.record(str(path), [])
+    index.close()
+
+    kept.write_text("one, but longer")
+    os.remove(removed)
+
+    index = ScanIndex(db, POLICY)
+    assert index.lookup(str(kept)) is None
+    index.record(str(kept), [])
+    assert index.prune(str(root)) == 1
+    index.close()
+
+def test_files_that_failed_to_scan_are_not_recorded(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from dlp_agent.main import main
+    from dlp_agent.scanner.stream_processor import StreamProcessor
+
+    root = tmp_path / "data"
+    root.mkdir()
+    for name in ("a.txt", "b.txt"):
+        (root / name).write_text(f"{name} PAN ABCDE1234F\n")
+    policy = tmp_path / "policy.json"
+    policy.write_text('{"rules": {"pan": {"enabled": true}}, "scan": {"allowedExtensions": [".txt"]}}')
+    args = ["--scan-dir", str(root), "--policy", str(policy), "--state-dir", str(tmp_path / "state")]
+
+    iter_findings = StreamProcessor._iter_findings
+    def failing_on_b(self, file_path):
+        for found in iter_findings(self, file_path):
+            yield found
+            if file_path.endswith("b.txt"):
+                raise OSError("read error")
+    monkeypatch.setattr(StreamProcessor, "_iter_findings", failing_on_b)
+    assert CliRunner().invoke(main, args).exit_code == 0
+
+    scanned = []
+    def recording(self, file_path):
+        scanned.append(os.path.basename(file_path))
+        return iter_findings(self, file_path)
+    monkeypatch.setattr(StreamProcessor, "_iter_findings", recording)
+    assert CliRunner().invoke(main, args).exit_code == 0
+    assert scanned == ["b.txt"]
+
+def test_partially_scanned_files_are_not_recorded(tmp_path):
+    import gzip
+    import hashlib
+    import json
+    from click.testing import CliRunner
+    from dlp_agent.main import main
+
+    root = tmp_path / "data"
+    root.mkdir()
+    text = b"PAN ABCDE1234F\n" + b"x" * 1024 * 1024 + b"\nPAN ZZZZZ9999Z\n"
+    for name in ("a.log.1.gz", "b.log.1.gz"):
+        (root / name).write_bytes(gzip.compress(text))
+    policy = tmp_path / "policy.json"
+    policy.write_text('{"rules": {"pan": {"enabled": true}}, "scan": {"allowedExtensions": [".log"], '
+                      '"compressedLogs": true, "maxFileSizeMB": 1, "dedup": {"scope": "secret"}}}')
+    args = ["--scan-dir", str(root), "--policy", str(policy), "--state-dir", str(tmp_path / "state")]
+
+    for run in range(2):
+        out = tmp_path / f"run{run}.json"
+        result = CliRunner().invoke(main, args + ["--json-out", str(out)])
+        assert result.exit_code == 0, result.output
+        # Cut short by the size limit: scanned again, never from the index or the content cache
+        assert "skipped 0 unchanged files" in result.output and "Content cache: 0 hits" in result.output
+        with open(out) as f:
+            events = [json.loads(line) for line in f]
+        partial = [e for e in events if e["rule"] == PARTIAL_SCAN_RULE]
+        # Each file reports its own, with a digest of the reason alone
+        assert [os.path.basename(e["source"]["path"]) for e in partial] == ["a.log.1.gz", "b.log.1.gz"]
+        assert {e["hash"] for e in partial} == {hashlib.sha256(partial[0]["masked_value"].encode()).hexdigest()}
@@ -38,15 +38,113 @@ def test_file_walker_exclusions(tmp_path):
     found_file = files[0].replace('\\', '/')
     assert found_file.endswith("valid/test.txt")
 
-def test_stream_processor_detection(tmp_path):
+def _os_walk_reference(walker, root_dir):
+    # The original os.walk based walk, in walk order
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = sorted(d for d in dirs if not any(e in os.path.join(root, d).replace('\\', '/')
+                                                    for e in walker.excluded_paths))
+        for file in sorted(files):
+            if walker.should_scan_file(os.path.join(root, file)):
+                yield os.path.join(root, file)
+
+@pytest.mark.parametrize("threads", [0, 3])
+def test_file_walker_matches_os_walk(tmp_path, threads):
+    config = {"scan": {"maxFileSizeMB": 1, "allowedExtensions": [".txt", ".LOG"],
+                       "excludedPaths": ["/.git", "/skip", "deep/er", "x\\y", "b/c"],
+                       "walkerThreads": threads}}
+    for sub in ["a", "a/.github", "a/.git", "skipped", "skipped/inner", "keep/deep/er", "keep/deep/e", "b/cd", "b/d",
+                "x\\y", "x\\z", "z/" + "n" * 40]:
+        (tmp_path / sub).mkdir(parents=True, exist_ok=True)
+        for name in ["f.txt", "g.TXT", "h.log", "i.md", ".txt", "big.txt"]:
+            (tmp_path / sub / name).write_text("x" * (2 * 1024 * 1024 if name == "big.txt" else 10))
+    (tmp_path / "link.txt").symlink_to(tmp_path / "a" / "f.txt")
+    (tmp_path / "broken.txt").symlink_to(tmp_path / "missing.txt")
+    (tmp_path / "dirlink").symlink_to(tmp_path / "a")
+
+    walker = FileWalker(config)
+    expected = list(_os_walk_reference(walker, str(tmp_path)))
+    assert expected
+    assert list(walker.walk(str(tmp_path))) == expected
+    # A root that is itself excluded excludes every subdirectory
+    root = str(tmp_path / "skipped")
+    assert list(walker.walk(root)) == list(_os_walk_reference(walker, root)) == [os.path.join(root, "f.txt"), os.path.join(root, "g.TXT")]
+
+def _located(sink):
+    return [(event.source["path"], event.source["line"], event.rule, event.hash) for event in sink.events]
+
+def test_stream_processor_detection(tmp_path, collecting_sink):
     test_file = tmp_path / "sensitive.txt"
     test_file.write_text("My card is 4532 0151 1283 0368 and PAN is ABCDE1234F")
     
-    processor = StreamProcessor(TEST_CONFIG)
-    findings = processor.process_file(str(test_file))
+    sink = collecting_sink()
+    processor = StreamProcessor(TEST_CONFIG, [sink])
+    findings_count = processor.process_file(str(test_file))
     
-    assert len(findings) == 2
-    types = [f['type'] for f in findings]
+    assert findings_count == 2
+    types = [event.rule for event in sink.events]
     assert "Credit Card" in types
     assert "PAN" in types
-    assert findings[0]['file'] == str(test_file)
+    assert sink.events[0].source["path"] == str(test_file)
+
+def _findings(processor, path):
+    return [(line, e.rule, e.masked_value, e.hash) for line, e in processor._iter_findings(path)]
+
+def test_chunked_text_matches_line_scan(tmp_path, monkeypatch):
+    import random
+    from dlp_agent.scanner import stream_processor
+
+    rng = random.Random(42)
+    pieces = ["4532 0151 1283 0368", "9999 9999 0019", "ABCDE1234F", "2345\n6789 0123",
+              "2345\t6789\x1c0123", "\r\n", "\n", "\r", " ", "-", "x", "é", "４", "٣", "\t", "\xa0"]
+    data = "".join(rng.choice(pieces) for _ in range(4000)).encode("utf-8")
+    # Invalid UTF-8 is dropped on decode, which can join digit runs
+    data = data.replace(b"0019", b"00\xff19") + b"\xe0\xa5"
+    test_file = tmp_path / "mixed.log"
+    test_file.write_bytes(data)
+
+    line_mode = StreamProcessor({**TEST_CONFIG, "scan": {**TEST_CONFIG["scan"], "chunkedText": False}})
+    expected = _findings(line_mode, str(test_file))
+    assert expected
+
+    # Small blocks force many block boundaries, including inside "\r\n" pairs
+    monkeypatch.setattr(stream_processor, "CHUNK_SIZE", 7)
+    assert _findings(StreamProcessor(TEST_CONFIG), str(test_file)) == expected
+    monkeypatch.setattr(stream_processor, "CHUNK_SIZE", 1024 * 1024)
+    assert _findings(StreamProcessor(TEST_CONFIG), str(test_file)) == expected
+
+def test_parallel_scan_matches_serial(tmp_path, collecting_sink):
+    from dlp_agent.scanner import ParallelScanner
+
+    for i in range(12):
+        (tmp_path / f"f{i}.txt").write_text(f"row {i}\ncard 4532 0151 1283 0368\nPAN ABCDE1234F\n" * (i % 3 + 1))
+    paths = list(FileWalker(TEST_CONFIG).walk(str(tmp_path)))
+
+    serial_sink = collecting_sink()
+    serial = StreamProcessor(TEST_CONFIG, sinks=[serial_sink])
+    serial_total = sum(serial.process_file(path) for path in paths)
+
+    parallel_sink = collecting_sink()
+    parallel = StreamProcessor(TEST_CONFIG, sinks=[parallel_sink])
+    results = list(ParallelScanner(parallel, workers=3).scan(paths))
+    parallel_total = sum(parallel.emit_findings(path, findings) for path, findings, _ in results)
+
+    assert [path for path, *_ in results] == paths
+    assert parallel_total == serial_total
+    assert _located(parallel_sink) == _located(serial_sink)
+
+def test_scan_appended_continues_line_numbers(tmp_path):
+    test_file = tmp_path / "app.log"
+    test_file.write_bytes(b"start\r\nPAN ABCDE1234F\npartial 4532 0151")
+    processor = StreamProcessor(TEST_CONFIG)
+
+    findings, offset, next_line = processor.scan_appended(str(test_file))
+    assert [(f.line, f.rule) for f in findings] == [(2, "PAN")]
+    # The unterminated last line is left for later
+    assert (offset, next_line) == (len(b"start\r\nPAN ABCDE1234F\n"), 3)
+
+    with open(test_file, "ab") as f:
+        f.write(b" 1283 0368\r\rAADHAAR 9999 9999 0019\n")
+    findings, offset, next_line = processor.scan_appended(str(test_file), offset, next_line)
+    whole = _findings(processor, str(test_file))
+    assert [(f.line, f.rule, f.masked_value, f.hash) for f in findings] == whole[1:]
+    assert (offset, next_line) == (test_file.stat().st_size, 6)
@@ -0,0 +1,125 @@
+import json
+import os
+import pytest
+from click.testing import CliRunner
+from dlp_agent.main import main
+from dlp_agent.scanner import schedule
+from dlp_agent.scanner.schedule import ScanSchedule, prioritized
+
+class _FakeTime:
+    def __init__(self):
+        self.wall = 1000.0
+        self.cpu = 0.0
+        self.children_cpu = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.wall
+
+    def process_time(self):
+        return self.cpu
+
+    def time(self):
+        return self.wall
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.wall += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeTime()
+    monkeypatch.setattr(schedule, "time", clock)
+    # Pool workers of other tests may be reaped at any time
+    monkeypatch.setattr(schedule.os, "times", lambda: os.times_result((0, 0, clock.children_cpu, 0, 0)))
+    return clock
+
+def test_prioritized_puts_recent_and_risky_files_first(tmp_path):
+    now = os.path.getmtime(tmp_path)
+    ages = {"old.log": 90, "old.csv": 80, "new.log": 2, "new.csv": 3, "newest.log": 1, "older.csv": 85}
+    for name, days in ages.items():
+        (tmp_path / name).write_text("")
+        os.utime(tmp_path / name, (now - days * 86400, now - days * 86400))
+    paths = sorted(str(tmp_path / name) for name in ages)
+
+    order = [os.path.basename(p) for p in prioritized(paths, ['.csv'], recent_seconds=7 * 86400)]
+    assert order == ["new.csv", "newest.log", "new.log", "old.csv", "older.csv", "old.log"]
+    # A one-path queue releases paths almost in walk order
+    assert len(list(prioritized(paths, ['.csv'], queue_size=1))) == len(paths)
+
+def test_budgets_are_paid_for_before_the_next_file(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(schedule.os, "getloadavg", lambda: (0.5, 0.5, 0.5))
+    big = tmp_path / "big.log"
+    big.write_bytes(b"x" * 3 * 1024 * 1024)
+    small = tmp_path / "small.log"
+    small.write_bytes(b"x")
+
+    paced = ScanSchedule(cpu_percent=25, read_mbps=1, max_load=4)
+    assert paced.before_file(str(small))
+    # 0.5s of CPU in 1s of wall time needs 2s at 25%
+    clock.cpu += 0.5
+    clock.wall += 1.0
+    assert paced.before_file(str(big))
+    assert clock.sleeps == [1.0]
+    # 3 MB at 1 MB/s
+    clock.wall += 0.5
+    assert paced.before_file(str(small))
+    assert clock.sleeps == [1.0, 2.5]
+
+    usage = paced.report()
+    assert (usage["files"], usage["throttled_seconds"], usage["cpu_seconds"]) == (3, 3.5, 0.5)
+    assert usage["cpu_budget_percent"] == 25
+
+def test_cpu_of_exited_children_counts(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(schedule.os, "getloadavg", lambda: (0.5, 0.5, 0.5))
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"x")
+
+    paced = ScanSchedule(cpu_percent=50, read_mbps=0, max_load=4)
+    assert paced.before_file(str(path))
+    # A pool worker that ran the file and was reaped
+    clock.children_cpu += 1.0
+    clock.wall += 1.0
+    assert paced.before_file(str(path))
+    assert clock.sleeps == [1.0]
+    assert paced.report()["cpu_seconds"] == 1.0
+
+def test_high_load_pauses_until_the_window_closes(tmp_path, monkeypatch, clock):
+    loads = iter([(9.0,), (9.0,), (1.0,), (9.0,)] + [(9.0,)] * 100)
+    monkeypatch.setattr(schedule.os, "getloadavg", lambda: next(loads))
+    path = tmp_path / "a.log"
+    path.write_text("x")
+
+    paced = ScanSchedule(cpu_percent=0, read_mbps=0, max_load=2, window_seconds=60)
+    assert paced.before_file(str(path))
+    assert paced.paused_seconds == 2 * schedule.LOAD_POLL_SECONDS
+    assert not paced.before_file(str(path))
+    assert paced.window_closed and paced.files == 1
+
+def test_scheduled_cli_continues_in_the_next_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(schedule, "lower_priority", lambda nice: [])
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for i in range(3):
+        (tree / f"f{i}.txt").write_text("PAN ABCDE1234F\n")
+    policy = tmp_path / "policy.json"
+    scan = {"allowedExtensions": [".txt"], "schedule": {"windowMinutes": 1e-9}}
+    policy.write_text(json.dumps({"rules": {"pan": {"enabled": True}}, "scan": scan}))
+    args = ["--scan-dir", str(tree), "--policy", str(policy), "--state-dir", str(tmp_path / "state"), "--scheduled"]
+
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0
+    assert "Scanned 0 files" in result.output and "Window over" in result.output
+
+    result = CliRunner().invoke(main, args + ["--window-minutes", "60"])
+    assert "Scanned 3 files" in result.output and "Window over" not in result.output
+    result = CliRunner().invoke(main, args + ["--window-minutes", "60"])
+    assert "Scanned 0 files" in result.output and "skipped 3 unchanged files" in result.output
+
+    result = CliRunner().invoke(main, args + ["--checkpoint", str(tmp_path / "cp.json")])
+    assert "use --state-dir" in result.output
+
+    # Without --state-dir there is nothing to continue from
+    result = CliRunner().invoke(main, args[:4] + ["--scheduled"])
+    assert "without --state-dir, a scan cut short" in result.output
+    assert "so the next run starts over" in result.output and "same --state-dir" not in result.output
@@ -0,0 +1,226 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from dataclasses import asdict, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from dlp_agent.events.model import DetectionEvent
+from dlp_agent.events.sinks import _STOP, JsonSink, WebSink
+
+class _Dashboard:
+    """Local stand-in for the dashboard endpoint."""
+
+    def __init__(self):
+        self.batches = []
+        self.status = 200
+        self.delay = 0.0
+        dashboard = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(dashboard.delay)
+                if dashboard.status == 200:
+                    assert self.headers["Content-Encoding"] == "gzip"
+                    dashboard.batches.append(json.loads(gzip.decompress(body)))
+                self.send_response(dashboard.status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/logs"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def events(self):
+        return [event["masked_value"] for batch in self.batches for event in batch]
+
+@pytest.fixture
+def dashboard():
+    server = _Dashboard()
+    yield server
+    server.server.shutdown()
+
+def _event(i):
+    return DetectionEvent(rule="PAN", masked_value=f"v{i}", hash=str(i), source={"path": "f.txt", "line": i})
+
+def test_web_sink_sends_gzip_batches(dashboard):
+    sink = WebSink(url=dashboard.url, batch_size=100, batch_interval=5.0)
+    for i in range(250):
+        sink.emit(_event(i))
+    sink.flush()
+    assert dashboard.events() == [f"v{i}" for i in range(250)]
+    assert [len(batch) for batch in dashboard.batches] == [100, 100, 50]
+    sink.close()
+    assert sink.delivered == 250
+
+def test_web_sink_sends_partial_batch_after_interval(dashboard):
+    sink = WebSink(url=dashboard.url, batch_size=100, batch_interval=0.05)
+    sink.emit(_event(1))
+    deadline = time.monotonic() + 5
+    while not dashboard.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dashboard.events() == ["v1"]
+    sink.close()
+
+def test_web_sink_journals_while_down_and_replays(dashboard, tmp_path):
+    journal = tmp_path / "web.journal"
+    dashboard.status = 503
+    sink = WebSink(url=dashboard.url, journal_path=str(journal), batch_size=10,
+                   max_retries=2, backoff=0.01, probe_interval=60)
+    for i in range(25):
+        sink.emit(_event(i))
+    sink.close()
+    assert dashboard.batches == []
+    assert sink.spilled == 25
+    assert len(journal.read_text().splitlines()) == 25
+
+    # The next sink replays the journal before anything new
+    dashboard.status = 200
+    sink = WebSink(url=dashboard.url, journal_path=str(journal), batch_size=10)
+    sink.emit(_event(25))
+    sink.close()
+    assert dashboard.events() == [f"v{i}" for i in range(26)]
+    assert not journal.exists()
+
+def test_web_sink_warns_about_a_partly_spilled_event(dashboard, tmp_path, caplog):
+    journal = tmp_path / "web.journal"
+    partial = _event(2).to_json()[:20]
+    journal.write_text(_event(0).to_json() + "\n" + _event(1).to_json() + "\n" + partial)
+    sink = WebSink(url=dashboard.url, journal_path=str(journal))
+    sink.close()
+    assert dashboard.events() == ["v0", "v1"]
+    assert f"Discarding {len(partial)} bytes of a partly written event" in caplog.text
+    assert not journal.exists()
+
+def test_web_sink_close_respects_deadline(dashboard, tmp_path):
+    journal = tmp_path / "web.journal"
+    dashboard.delay = 2.0
+    sink = WebSink(url=dashboard.url, journal_path=str(journal), batch_size=1, timeout=0.2,
+                   max_retries=1, backoff=0.01)
+    for i in range(5):
+        sink.emit(_event(i))
+    start = time.monotonic()
+    sink.close(timeout=0.3)
+    assert time.monotonic() - start < 2.0
+    # Nothing was accepted in time, so everything is journaled
+    assert len(journal.read_text().splitlines()) == 5
+
+def test_web_sink_survives_worker_errors(dashboard, tmp_path):
+    dashboard.status = 503
+    # Journaling fails too: the worker drops those batches and carries on
+    sink = WebSink(url=dashboard.url, journal_path=str(tmp_path / "missing" / "web.journal"), batch_size=2,
+                   queue_size=2, max_retries=0, probe_interval=60)
+    for i in range(10):
+        sink.emit(_event(i))
+    assert sink.flush(timeout=5)
+    assert sink.dropped == 10 and sink.position() == 10
+    sink.close()
+
+def test_web_sink_journals_when_worker_is_gone(dashboard, tmp_path):
+    journal = tmp_path / "web.journal"
+    sink = WebSink(url=dashboard.url, journal_path=str(journal), queue_size=1)
+    sink._queue.put(_STOP)
+    sink._worker.join(timeout=5)
+    # Nothing empties the queue any more, and emit() doesn't wait on it forever
+    for i in range(5):
+        sink.emit(_event(i))
+    assert sink.flush() and sink.position() == 5
+    sink.close()
+    assert _lines(journal) == [f"v{i}" for i in range(5)]
+    assert dashboard.batches == []
+
+def test_checkpoint_waits_for_web_sink_delivery(dashboard, tmp_path):
+    from dlp_agent.scanner.checkpoint import Checkpoint
+
+    dashboard.delay = 0.05
+    sink = WebSink(url=dashboard.url, batch_size=100, batch_interval=60)
+    checkpoint = Checkpoint(str(tmp_path / "scan.ckpt"), str(tmp_path), {}, [sink], interval=0)
+    paths = [str(tmp_path / f"f{i}.txt") for i in range(6)]
+    for i, path in enumerate(paths):
+        checkpoint.started(path)
+        sink.emit(_event(i))
+        checkpoint.completed(path, i + 1, i + 1)
+        # A file is recorded as completed only once its events reached the dashboard
+        assert dashboard.events() == [f"v{n}" for n in range(i + 1)]
+    # Killed with an event still queued: its file is scanned again on resume
+    checkpoint.started(str(tmp_path / "f6.txt"))
+    sink.emit(_event(6))
+    sink._queue.put(_STOP)
+
+    resumed = Checkpoint(checkpoint.path, str(tmp_path), {}, [WebSink(url=dashboard.url)])
+    assert resumed.resume()
+    assert resumed.frontier == paths[-1] and resumed.scanned_files == 6
+    assert resumed.sinks[0].position() == 0
+    resumed.sinks[0].close()
+
+def _lines(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt") as f:
+        return [json.loads(line)["masked_value"] for line in f]
+
+def test_event_json_matches_asdict():
+    event = _event(3)
+    event.context = {"snippet": "x"}
+    assert json.loads(event.to_json()) == asdict(event)
+    assert event.to_json() == json.dumps(asdict(event))
+    # Lazy fields are generated once, whichever way they are first read
+    event = DetectionEvent.create("PAN", "High", "ABCDE1234F", "ABCDE****F", {"path": "f.txt", "line": 3})
+    assert replace(event) == event
+    assert event.to_json() == json.dumps(asdict(event))
+    assert not hasattr(event, "__dict__")
+
+def test_event_json_schema():
+    event = DetectionEvent.create("PAN", "High", "ABCDE1234F", "ABCDE****F", {"path": "f.txt", "line": 3}, "ctx")
+    data = json.loads(event.to_json())
+    assert list(data) == ["event_id", "timestamp", "agent_id", "rule", "severity",
+                          "masked_value", "hash", "source", "context"]
+    assert data["hash"] == hashlib.sha256(b"ABCDE1234F").hexdigest()
+    assert data["timestamp"].endswith("Z") and "T" in data["timestamp"]
+    assert data["source"] == {"path": "f.txt", "line": 3}
+    assert data["context"] == {"snippet": "ctx"}
+    # Generated once, then stable
+    assert json.loads(event.to_json())["event_id"] == data["event_id"]
+
+def test_json_sink_buffers_and_rotates(tmp_path):
+    out = tmp_path / "findings.json"
+    sink = JsonSink(str(out), buffer_size=4096, rotate_bytes=20000)
+    for i in range(300):
+        sink.emit(_event(i))
+    # Nothing reaches the file until the buffer fills
+    assert out.stat().st_size < 300 * 200
+    sink.close()
+    segments = sorted(tmp_path.glob("findings.*.json"), key=lambda p: int(p.name.split(".")[1]))
+    assert len(segments) >= 2
+    assert all(p.stat().st_size < 20000 + 4096 + 300 for p in segments)
+    assert [v for p in segments + [out] for v in _lines(p)] == [f"v{i}" for i in range(300)]
+
+    # Numbering continues after the segments already on disk
+    sink = JsonSink(str(out), rotate_bytes=1)
+    sink.emit(_event(300))
+    sink.close()
+    assert (tmp_path / f"findings.{len(segments) + 1}.json").exists()
+
+def test_json_sink_gzip_rewinds_across_rotation(tmp_path):
+    out = tmp_path / "findings.json.gz"
+    sink = JsonSink(str(out), buffer_size=1, compress="gzip", rotate_bytes=300)
+    for i in range(10):
+        sink.emit(_event(i))
+    position = sink.position()
+    for i in range(10, 3000):
+        sink.emit(_event(i))
+    sink.flush()
+    assert len(list(tmp_path.glob("findings.*.json.gz"))) > position["segment"]
+
+    # As on --resume: a new sink goes back to the checkpoint and carries on
+    sink = JsonSink(str(out), buffer_size=1, compress="gzip")
+    sink.rewind(position)
+    assert len(list(tmp_path.glob("findings.*.json.gz"))) == position["segment"] - 1
+    sink.emit(_event(10))
+    sink.close()
+    segments = [tmp_path / f"findings.{n}.json.gz" for n in range(1, position["segment"])]
+    assert [v for p in segments + [out] for v in _lines(p)] == [f"v{i}" for i in range(11)]
@@ -0,0 +1,56 @@
+import codecs
+import pytest
+from dlp_agent.scanner import ParallelScanner
+from dlp_agent.scanner.sniff import Sniff, sniff
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+CONFIG = {"rules": {"card": {"enabled": True}, "pan": {"enabled": True}}}
+TEXT = "header\r\ncard 4532 0151 1283 0366\r\nnote: déjà vu\r\nPAN ABCDE1234F\r\n" * 3
+
+@pytest.mark.parametrize("data, expected", [
+    (b"", Sniff("utf-8")),
+    (TEXT.encode("utf-8"), Sniff("utf-8")),
+    (b"\x1b[31mERROR\x1b[0m\tdone\f\n", Sniff("utf-8")),
+    (codecs.BOM_UTF8 + TEXT.encode("utf-8"), Sniff("utf-8")),
+    (TEXT.encode("utf-16"), Sniff("utf-16")),
+    (TEXT.encode("utf-32"), Sniff("utf-32")),
+    (TEXT.encode("utf-16-le"), Sniff("utf-16-le")),
+    (TEXT.encode("utf-16-be"), Sniff("utf-16-be")),
+    (b"\x7fELF\x02\x01\x01\x00" + bytes(range(256)), Sniff(None, "binary (NUL bytes)")),
+    (bytes(range(1, 32)) * 4 + b"mostly text " * 20, Sniff(None, "binary (control characters)")),
+])
+def test_sniff(data, expected):
+    assert sniff(data) == expected
+
+@pytest.mark.parametrize("chunked", [True, False])
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-16-le", "utf-16-be", "utf-32"])
+def test_wide_encodings_are_decoded(tmp_path, monkeypatch, chunked, encoding):
+    from dlp_agent.scanner import stream_processor
+
+    # Odd block sizes split code units between reads
+    monkeypatch.setattr(stream_processor, "CHUNK_SIZE", 7)
+    monkeypatch.setattr(stream_processor, "SNIFF_SIZE", 33)
+    utf8 = tmp_path / "a.log"
+    utf8.write_text(TEXT, encoding="utf-8", newline="")
+    wide = tmp_path / "b.log"
+    wide.write_text(TEXT, encoding=encoding, newline="")
+
+    processor = StreamProcessor({**CONFIG, "scan": {"chunkedText": chunked}})
+    expected = [(f.line, f.rule, f.masked_value) for f in processor.scan_file(str(utf8))[0]]
+    assert len(expected) == 6
+    assert [(f.line, f.rule, f.masked_value) for f in processor.scan_file(str(wide))[0]] == expected
+
+def test_binary_files_are_skipped_and_counted(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"f{i}.log"
+        path.write_bytes(b"PAN ABCDE1234F\n\x00\x01\x02" if i % 2 else b"PAN ABCDE1234F\n")
+        paths.append(str(path))
+
+    serial = StreamProcessor(CONFIG)
+    assert [len(serial.scan_file(path)[0]) for path in paths] == [1, 0] * 3
+    assert serial.skipped == {"binary (NUL bytes)": 3}
+
+    parallel = StreamProcessor(CONFIG)
+    assert [len(findings) for _, findings, _ in ParallelScanner(parallel, workers=2).scan(paths)] == [1, 0] * 3
+    assert parallel.skipped == serial.skipped
@@ -0,0 +1,78 @@
+import json
+import os
+import pytest
+from click.testing import CliRunner
+from dlp_agent.main import main
+from dlp_agent.scanner.stats import Histogram, ScanStats
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+TEST_CONFIG = {
+    "scan": {
+        "maxFileSizeMB": 1,
+        "allowedExtensions": [".txt", ".log"],
+        "excludedPaths": []
+    },
+    "rules": {
+        "card": { "enabled": True },
+        "pan": { "enabled": True }
+    }
+}
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for micros in [0.5] * 50 + [3] * 40 + [1000] * 10:
+        histogram.add(micros / 1e6, items=2)
+    assert (histogram.samples, histogram.items) == (100, 200)
+    assert histogram.buckets == {0: 50, 2: 40, 10: 10}
+    assert histogram.percentile(0.5) == pytest.approx(1e-6)
+    assert histogram.percentile(0.9) == pytest.approx(4e-6)
+    # The top bucket is capped at the largest sample
+    assert histogram.percentile(0.99) == pytest.approx(1e-3)
+    assert histogram.to_dict()["max_ms"] == pytest.approx(1.0)
+
+def test_slowest_files_keeps_top_n(tmp_path):
+    stats = ScanStats(top_n=3)
+    for i in range(10):
+        stats.file_scanned(str(tmp_path / f"f{i}.txt"), (i * 7 % 10) / 100, i)
+    report = stats.report()
+    assert [entry["seconds"] for entry in report["slowest_files"]] == [0.09, 0.08, 0.07]
+    assert report["files"]["scanned"] == 10
+    assert report["stages"]["file"][".txt"]["samples"] == 10
+
+def test_instrumented_processor_reports_stages(tmp_path):
+    path = tmp_path / "a.log"
+    path.write_text("card 4532 0151 1283 0366\nPAN ABCDE1234F\nnothing here\n" * 20)
+    processor = StreamProcessor(TEST_CONFIG)
+    expected, _ = processor.scan_file(str(path))
+
+    stats = ScanStats(profile_pattern="*.log")
+    stats.instrument_processor(processor)
+    assert processor.scan_file(str(path)) == (expected, True)
+    report = stats.report()
+
+    detect = report["stages"]["detect"]
+    assert {"all", "match", "validate.card", "validate.pan"} <= set(detect)
+    assert detect["all"]["total_s"] >= detect["validate.card"]["total_s"]
+    assert report["stages"]["extract"][".log"]["samples"] == 1
+    assert report["slowest_files"][0]["findings"] == len(expected)
+    assert report["profile"]["files"] == 1
+    assert report["profile"]["top_cumulative"]
+
+def test_cli_writes_stats(tmp_path):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for i in range(4):
+        (tree / f"f{i}.txt").write_text(f"row {i}\ncard 4532 0151 1283 0366\n")
+    policy = tmp_path / "policy.json"
+    policy.write_text(json.dumps(TEST_CONFIG))
+    stats_path = tmp_path / "stats.json"
+
+    result = CliRunner().invoke(main, ["--scan-dir", str(tree), "--policy", str(policy),
+                                       "--stats", str(stats_path), "--stats-profile-every", "2"])
+    assert result.exit_code == 0
+    report = json.loads(stats_path.read_text())
+    assert report["files"]["scanned"] == 4
+    assert set(report["stages"]) == {"walk", "file", "extract", "detect", "emit"}
+    assert report["stages"]["emit"]["CliSink"]["samples"] == 4
+    assert report["profile"]["files"] == 2
+    assert os.path.exists(str(stats_path) + ".prof")
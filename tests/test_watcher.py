@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+import time
+import pytest
+from dlp_agent.scanner.file_walker import FileWalker
+from dlp_agent.scanner.stream_processor import StreamProcessor
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+
+TEST_CONFIG = {
+    "scan": {
+        "maxFileSizeMB": 1,
+        "allowedExtensions": [".txt", ".log"],
+        "excludedPaths": ["/exclude_me"]
+    },
+    "rules": {
+        "card": { "enabled": True },
+        "aadhaar": { "enabled": True },
+        "pan": { "enabled": True }
+    }
+}
+
+@pytest.fixture
+def watching(tmp_path, collecting_sink):
+    from dlp_agent.scanner.watcher import Watcher
+
+    sink = collecting_sink()
+    watcher = Watcher(FileWalker(TEST_CONFIG), StreamProcessor(TEST_CONFIG, sinks=[sink]), debounce=0.05)
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(str(tmp_path), stop))
+    yield watcher, sink, thread
+    stop.set()
+    thread.join(timeout=5)
+
+def _seen(sink):
+    return [(os.path.basename(event.source["path"]), event.source["line"], event.rule) for event in sink.events]
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the watcher")
+        time.sleep(0.02)
+
+def test_watch_tails_appended_lines(tmp_path, watching):
+    watcher, sink, thread = watching
+    log = tmp_path / "app.log"
+    log.write_text("PAN ABCDE1234F\n")
+    (tmp_path / "exclude_me").mkdir()
+    (tmp_path / "exclude_me" / "secret.log").write_text("PAN ABCDE1234F\n")
+    thread.start()
+    _wait_for(lambda: _seen(sink) == [("app.log", 1, "PAN")])
+
+    scanned = watcher.scanned_bytes
+    appended = "noise\ncard 4532 0151 1283 0368\n"
+    with open(log, "a") as f:
+        f.write(appended)
+    _wait_for(lambda: len(sink.events) == 2)
+    assert _seen(sink)[1] == ("app.log", 3, "Credit Card")
+    assert watcher.scanned_bytes - scanned == len(appended)
+
+    # New directories are picked up, excluded ones never are
+    (tmp_path / "new").mkdir()
+    (tmp_path / "new" / "b.txt").write_text("id 9999 9999 0019\n")
+    (tmp_path / "exclude_me" / "secret.log").write_text("PAN ABCDE1234F\nPAN ABCDE1234F\n")
+    _wait_for(lambda: ("b.txt", 1, "Aadhaar") in _seen(sink))
+    time.sleep(0.2)
+    assert not any(name == "secret.log" for name, _, _ in _seen(sink))
+
+def test_watch_rescans_rotated_and_truncated_files(tmp_path, watching):
+    watcher, sink, thread = watching
+    log = tmp_path / "app.log"
+    log.write_text("one\ntwo\nPAN ABCDE1234F\n")
+    thread.start()
+    _wait_for(lambda: _seen(sink) == [("app.log", 3, "PAN")])
+
+    # Rotation: a new file takes the old name
+    rotated = tmp_path / "app.log.new"
+    rotated.write_text("card 4532 0151 1283 0368\n")
+    os.replace(rotated, log)
+    _wait_for(lambda: ("app.log", 1, "Credit Card") in _seen(sink))
+
+    # Truncation in place
+    with open(log, "w") as f:
+        f.write("id 9999 9999 0019\n")
+    _wait_for(lambda: ("app.log", 1, "Aadhaar") in _seen(sink))
+    assert watcher.full_rescans >= 2
+
+def test_watch_sniffs_tailed_files(tmp_path, watching):
+    watcher, sink, thread = watching
+    wide = tmp_path / "wide.log"
+    wide.write_text("PAN ABCDE1234F\n", encoding="utf-16")
+    (tmp_path / "core.log").write_bytes(b"\0\x01\x02PAN ABCDE1234F\n" * 10)
+    thread.start()
+    _wait_for(lambda: _seen(sink) == [("wide.log", 1, "PAN")])
+
+    with open(wide, "a", encoding="utf-16-le") as f:
+        f.write("card 4532 0151 1283 0368\n")
+    _wait_for(lambda: len(sink.events) == 2)
+    # Scanned whole again; only the new line is reported
+    assert _seen(sink)[1] == ("wide.log", 2, "Credit Card")
+    time.sleep(0.2)
+    assert watcher.processor.skipped == {"binary (NUL bytes)": 1}
+    assert not any(name == "core.log" for name, _, _ in _seen(sink))
+
+def test_watch_rescans_files_whose_scan_was_cut_short(tmp_path, watching, monkeypatch):
+    watcher, sink, thread = watching
+    wide = tmp_path / "wide.log"
+    wide.write_text("PAN ABCDE1234F\n", encoding="utf-16")
+    scan_file = watcher.processor.scan_file
+    monkeypatch.setattr(watcher.processor, "scan_file", lambda path: ([], False))
+    thread.start()
+    _wait_for(lambda: watcher.failed_files == 1)
+    assert watcher.scanned_files == 0 and str(wide) not in watcher._tails
+
+    # The next change scans it in full again
+    monkeypatch.setattr(watcher.processor, "scan_file", scan_file)
+    with open(wide, "a", encoding="utf-16-le") as f:
+        f.write("card 4532 0151 1283 0368\n")
+    _wait_for(lambda: len(sink.events) == 2)
+    assert _seen(sink) == [("wide.log", 1, "PAN"), ("wide.log", 2, "Credit Card")]
+    assert watcher.scanned_files == 1
@@ -17,13 +17,13 @@ class TestCore(unittest.TestCase):
         text = "Card: 4000 0000 0000 0002"
         findings = detect_credit_cards(text)
         self.assertEqual(len(findings), 1)
-        self.assertEqual(findings[0]['type'], 'Credit Card')
+        self.assertEqual(findings[0].rule, 'Credit Card')
         
     def test_pan(self):
         text = "PAN: ABCDE1234F"
         findings = detect_pan(text)
         self.assertEqual(len(findings), 1)
-        self.assertEqual(findings[0]['type'], 'PAN')
+        self.assertEqual(findings[0].rule, 'PAN')
 
     def test_aadhaar(self):
         # 9999 9999 0019 is valid verhoeff